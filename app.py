@@ -1,24 +1,61 @@
-from flask import Flask, render_template, request, redirect, url_for, session, flash
-from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
-from flask_mail import Mail, Message
-from flask_bcrypt import Bcrypt
+from flask import Response, render_template, request, redirect, url_for, session, flash, \
+    send_from_directory, stream_with_context
 from flask_wtf.csrf import CSRFProtect
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+import io
+import json
+import os
 import secrets
-from config import Config
-from models import db, User, Member, PendingRegistration, PasswordResetToken
+from sqlalchemy.exc import IntegrityError
+from models import db, User, Member, PendingRegistration, Trainer
+from pagination import cached_member_page, cached_recent_members, clamp_page_size
+from search import search_members, member_result
+from member_details import member_entries, batch_validators
+from mailer import enqueue_email, enqueue_emails, queue_stats
+from email_templates import render_email, render_email_batch
+from registrations import approve_registrations, reject_registrations, pending_count, \
+    pending_registration_rows, DEFAULT_MEMBER_PASSWORD
+from sequences import next_registration_id
+from stats import dashboard_summary, revenue_series, REVENUE_PERIODS
+from dates import parse_date
+from auth import authenticate, check_login_rate, hash_password, auth_stats, auth_metrics, \
+    login_required, current_principal
+from factory import create_app
+from commands import register_commands
+from instrumentation import init_instrumentation, register_collector
+from assets import init_assets
+from member_csv import import_members_csv, export_members_csv
+from payments import record_payments
+from plans import get_plans, get_plan
+from renewals import renew_memberships
+from reset_tokens import issue_reset_token, find_reset_token
+from archive import archive_members
+from cache import cache_stats, cache_metrics
+from checkins import get_checkin_buffer, record_scans, hourly_occupancy, checkin_metrics
+from scheduling import validate_trainer, create_class_sessions, member_pk_for_user, book_class, \
+    cancel_booking, weekly_schedule, trainer_summaries
 
-# Initialize Flask app
-app = Flask(__name__)
-app.config.from_object(Config)
+# Web-only extensions, bound in init_web(); the rest are set up by factory.create_app()
+csrf = CSRFProtect()
 
-# Initialize extensions
-db.init_app(app)
-migrate = Migrate(app, db)
-mail = Mail(app)
-bcrypt = Bcrypt(app)
-csrf = CSRFProtect(app)
+
+def init_web(app):
+    """Bind what only the web app uses: CSRF protection, static assets and instrumentation"""
+    csrf.init_app(app)
+    init_assets(app)
+    
+    if app.config['INSTRUMENTATION_ENABLED']:
+        with app.app_context():
+            init_instrumentation(app, db.engines.values())
+        register_collector(auth_metrics)
+        register_collector(checkin_metrics)
+        register_collector(cache_metrics)
+
+
+# Initialize Flask app (routes below are registered on this instance)
+app = create_app()
+init_web(app)
+register_commands(app)
 
 # Route: Landing Page
 @app.route('/')
@@ -33,17 +70,21 @@ def login():
         password = request.form.get('password')
         role = request.form.get('role')
         
-        # Query user from database
-        user = User.query.filter_by(username=username).first()
+        # Throttle before touching the database or running bcrypt
+        retry_after = check_login_rate(username, request.remote_addr)
+        if retry_after:
+            flash('Too many login attempts! Please try again later.', 'error')
+            return render_template('login.html', error='Too many attempts'), 429, {'Retry-After': str(retry_after)}
         
         # Validate credentials
-        if user and bcrypt.check_password_hash(user.password_hash, password):
+        user = authenticate(username, password)
+        if user:
             # Check if role matches (optional validation)
-            if user.role == role:
-                session['username'] = user.username
-                session['role'] = user.role
-                session['name'] = user.name
-                session['user_id'] = user.id
+            if user['role'] == role:
+                session['username'] = user['username']
+                session['role'] = user['role']
+                session['name'] = user['name']
+                session['user_id'] = user['id']
                 flash('Login successful!', 'success')
                 return redirect(url_for('dashboard'))
             else:
@@ -69,17 +110,21 @@ def register():
         address = request.form.get('address')
         membership = request.form.get('membership')
         
+        plan = get_plan(membership)
+        if plan is None or not plan['active']:
+            flash('Please choose a membership plan!', 'error')
+            return render_template('register.html', plans=get_plans())
+        
         # Check if email already exists in pending registrations or members
         existing_pending = PendingRegistration.query.filter_by(email=email).first()
         existing_member = Member.query.filter_by(email=email).first()
         
         if existing_pending or existing_member:
             flash('Email already registered! Please use a different email.', 'error')
-            return render_template('register.html')
+            return render_template('register.html', plans=get_plans())
         
         # Generate registration ID
-        count = PendingRegistration.query.count()
-        registration_id = f'REG{count + 1:03d}'
+        registration_id = next_registration_id()
         
         # Create new pending registration
         new_registration = PendingRegistration(
@@ -91,25 +136,26 @@ def register():
             dob=dob,
             gender=gender,
             address=address,
-            membership_type=membership,
-            registration_date=datetime.now().strftime('%Y-%m-%d'),
+            membership_type=plan['code'],
+            registration_date=date.today(),
             status='pending'
         )
         
         db.session.add(new_registration)
-        db.session.commit()
         
-        # Send welcome email
+        # Queue welcome email (committed with the registration, sent by the mail worker)
         try:
             send_welcome_email(new_registration)
         except Exception as e:
             print(f"Error sending welcome email: {e}")
             # Continue even if email fails
         
+        db.session.commit()
+        
         flash('Registration successful! Your application is pending admin approval. You will be notified via email once approved.', 'success')
         return redirect(url_for('register_success'))
     
-    return render_template('register.html')
+    return render_template('register.html', plans=get_plans())
 
 # Route: Registration Success Page
 @app.route('/register-success')
@@ -118,142 +164,326 @@ def register_success():
 
 # Route: Dashboard (requires login)
 @app.route('/dashboard')
+@login_required()
 def dashboard():
-    if 'username' not in session:
-        flash('Please login first!', 'error')
-        return redirect(url_for('login'))
+    principal = current_principal()
     
     # Count pending registrations
-    pending_count = PendingRegistration.query.filter_by(status='pending').count()
+    pending = pending_count()
     
-    # Get approved members for dashboard display
-    members = Member.query.all()
+    # Get the most recent members for dashboard display
+    members = cached_recent_members(app.config['DASHBOARD_RECENT_MEMBERS'])
     
     return render_template('dashboard.html', 
-                         username=session.get('name'),
-                         role=session.get('role'),
-                         pending_count=pending_count,
+                         username=principal['name'],
+                         role=principal['role'],
+                         pending_count=pending,
+                         stats=dashboard_summary(),
                          APPROVED_MEMBERS=members)
 
-# Route: Members Page
+# Route: Dashboard Statistics (JSON for AJAX)
+@app.route('/api/stats/summary')
+@login_required(api=True)
+def stats_summary_api():
+    return dashboard_summary()
+
+# Route: Revenue Chart Data (JSON for AJAX)
+@app.route('/api/stats/revenue')
+@login_required(api=True)
+def stats_revenue_api():
+    period = request.args.get('period', 'week')
+    if period not in REVENUE_PERIODS:
+        return {'error': f'period must be one of: {", ".join(REVENUE_PERIODS)}'}, 400
+    
+    return revenue_series(period)
+
+# Route: Hourly Check-ins (JSON for the dashboard)
+@app.route('/api/stats/occupancy')
+@login_required(api=True)
+def stats_occupancy_api():
+    day = parse_date(request.args.get('date')) if request.args.get('date') else date.today()
+    if day is None:
+        return {'error': 'date must be YYYY-MM-DD'}, 400
+    
+    return hourly_occupancy(day)
+
+# Route: Front-Desk Check-in (JSON, one scan or a batch)
+@app.route('/api/checkin', methods=['POST'])
+@csrf.exempt
+@login_required('admin', api=True, token='CHECKIN_API_TOKEN')
+def checkin_api():
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return {'error': 'Expected a JSON object'}, 400
+    scans = data.get('scans') if 'scans' in data else [data]
+    if not isinstance(scans, list) or not scans:
+        return {'error': 'member_id or scans is required'}, 400
+    if len(scans) > app.config['CHECKIN_MAX_BATCH']:
+        return {'error': f"At most {app.config['CHECKIN_MAX_BATCH']} scans per request"}, 413
+    
+    results, queued = record_scans(scans, get_checkin_buffer(app))
+    if not queued:
+        return {'error': 'Check-in buffer is full, retry shortly', 'results': results}, 503, {'Retry-After': '5'}
+    if 'scans' not in data:
+        return {'result': results[0]}, 202 if results[0] == 'accepted' else 200
+    
+    # Accepted scans are written within CHECKIN_FLUSH_INTERVAL seconds
+    return {'results': results}, 202
+
 @app.route('/members')
+@login_required()
 def members():
-    if 'username' not in session:
-        return redirect(url_for('login'))
+    page_size = clamp_page_size(request.args.get('per_page'),
+                                app.config['MEMBERS_PAGE_SIZE'],
+                                app.config['MEMBERS_MAX_PAGE_SIZE'])
+    status = request.args.get('status')
+    
+    # One page of members, from the query cache until members change
+    page = cached_member_page(status, cursor=request.args.get('cursor'), page_size=page_size)
+    
+    return render_template('members.html', members=page, status=status, plans=get_plans(),
+                           import_rejects=session.pop('import_rejects', None))
+
+# Route: Export Members (CSV, streamed)
+@app.route('/members/export.csv')
+@login_required('admin')
+def export_members():
+    rows = export_members_csv(status=request.args.get('status') or None,
+                              chunk_size=app.config['CSV_CHUNK_SIZE'])
+    filename = f"members-{date.today().isoformat()}.csv"
+    return Response(stream_with_context(rows), mimetype='text/csv',
+                    headers={'Content-Disposition': f'attachment; filename={filename}'})
+
+# Route: Import Members (CSV upload, upserts on email)
+@app.route('/members/import', methods=['POST'])
+@login_required('admin')
+def import_members():
+    upload = request.files.get('file')
+    if not upload or not upload.filename:
+        flash('Choose a CSV file to import!', 'error')
+        return redirect(url_for('members'))
+    
+    rejects_dir = app.config['CSV_REJECTS_DIR']
+    os.makedirs(rejects_dir, exist_ok=True)
+    rejects_name = f"rejects-{datetime.now().strftime('%Y%m%d-%H%M%S')}-{secrets.token_hex(4)}.csv"
+    rejects_path = os.path.join(rejects_dir, rejects_name)
     
-    # Query all members from database
-    all_members = Member.query.all()
+    with open(rejects_path, 'w', newline='', encoding='utf-8') as rejects:
+        try:
+            summary = import_members_csv(io.TextIOWrapper(upload.stream, encoding='utf-8-sig', newline=''),
+                                         chunk_size=app.config['CSV_CHUNK_SIZE'], rejects=rejects)
+        except (ValueError, UnicodeDecodeError) as e:
+            db.session.rollback()
+            summary = None
+            flash(f'Import stopped: {e}. Rows before the error were saved.', 'error')
+        except IntegrityError as e:
+            db.session.rollback()
+            summary = None
+            flash(f'Import stopped: a chunk conflicts with existing members ({e.orig}). '
+                  f'Rows before that chunk were saved.', 'error')
+    
+    if summary is None or not summary['rejected']:
+        os.remove(rejects_path)
+    if summary is None:
+        return redirect(url_for('members'))
+    
+    flash(f"Imported {summary['rows']} rows in {summary['seconds']}s: {summary['inserted']} added, "
+          f"{summary['updated']} updated, {summary['rejected']} rejected", 
+          'warning' if summary['rejected'] else 'success')
+    if summary['rejected']:
+        session['import_rejects'] = rejects_name
+    return redirect(url_for('members'))
+
+# Route: Download Rejected Import Rows
+@app.route('/members/import/rejects/<name>')
+@login_required('admin')
+def import_rejects(name):
+    return send_from_directory(app.config['CSV_REJECTS_DIR'], name, as_attachment=True)
+
+# Route: Record Payments (JSON, idempotent on transaction_id)
+@app.route('/api/payments', methods=['POST'])
+@csrf.exempt
+@login_required('admin', api=True, token='PAYMENTS_API_TOKEN')
+def payments_api():
+    data = request.get_json(silent=True)
+    if data is None:
+        return {'error': 'Expected a JSON payment or list of payments'}, 400
+    items = data if isinstance(data, list) else [data]
+    if len(items) > app.config['PAYMENTS_MAX_BATCH']:
+        return {'error': f"At most {app.config['PAYMENTS_MAX_BATCH']} payments per request"}, 413
+    
+    results = [{'result': result, 'detail': detail} for result, detail in record_payments(items)]
+    if not isinstance(data, list):
+        result = results[0]
+        status = {'created': 201, 'duplicate': 200, 'conflict': 409}.get(result['result'], 400)
+        return result, status
     
-    return render_template('members.html', members=all_members)
+    # Batches always answer 200 with a result per payment
+    return {'results': results}
+
+# Route: Renew Memberships (JSON, one member or a batch)
+@app.route('/api/members/renew', methods=['POST'])
+@csrf.exempt
+@login_required('admin', api=True, token='PAYMENTS_API_TOKEN')
+def renew_members_api():
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return {'error': 'Expected a JSON object'}, 400
+    member_ids = data.get('member_ids') or ([data['member_id']] if data.get('member_id') else [])
+    if not isinstance(member_ids, list) or not member_ids:
+        return {'error': 'member_id or member_ids is required'}, 400
+    if len(member_ids) > app.config['PAYMENTS_MAX_BATCH']:
+        return {'error': f"At most {app.config['PAYMENTS_MAX_BATCH']} members per request"}, 413
+    
+    transaction_ids = data.get('transaction_ids') or {}
+    if data.get('member_id') and data.get('transaction_id'):
+        transaction_ids = {data['member_id']: data['transaction_id']}
+    
+    def renew():
+        results = renew_memberships([str(member_id) for member_id in member_ids], plan=data.get('plan'),
+                                    gateway=data.get('gateway'), transaction_ids=transaction_ids)
+        db.session.commit()
+        return results
+    
+    try:
+        try:
+            results = renew()
+        except IntegrityError:
+            # A concurrent request recorded the same transaction ID first; re-run so it reports 'duplicate'
+            db.session.rollback()
+            results = renew()
+    except ValueError as e:
+        db.session.rollback()
+        return {'error': str(e)}, 400
+    
+    return {'results': results}
 
 # Route: Trainers Page
 @app.route('/trainers')
+@login_required()
 def trainers():
-    if 'username' not in session:
-        return redirect(url_for('login'))
-    return render_template('trainers.html')
+    return render_template('trainers.html', trainers=trainer_summaries())
 
 # Route: Classes Page
 @app.route('/classes')
+@login_required()
 def classes():
-    if 'username' not in session:
-        return redirect(url_for('login'))
-    return render_template('classes.html')
+    day = parse_date(request.args.get('week')) or date.today()
+    return render_template('classes.html', schedule=weekly_schedule(day), role=current_principal()['role'],
+                           previous_week=(day - timedelta(days=7)).isoformat(),
+                           next_week=(day + timedelta(days=7)).isoformat())
+
+# Route: Weekly Class Schedule (JSON)
+@app.route('/api/classes/schedule')
+@login_required(api=True)
+def class_schedule_api():
+    day = parse_date(request.args.get('week')) if request.args.get('week') else date.today()
+    if day is None:
+        return {'error': 'week must be YYYY-MM-DD'}, 400
+    
+    return weekly_schedule(day)
+
+# Route: Add Trainer (Admin Only, JSON)
+@app.route('/api/trainers', methods=['POST'])
+@login_required('admin', api=True)
+def add_trainer_api():
+    try:
+        values = validate_trainer(request.get_json(silent=True))
+    except ValueError as e:
+        return {'error': str(e)}, 400
+    if Trainer.query.filter_by(email=values['email']).first():
+        return {'error': 'A trainer with this email already exists'}, 409
+    
+    trainer = Trainer(**values)
+    db.session.add(trainer)
+    db.session.commit()
+    return {'id': trainer.id, **values}, 201
+
+# Route: Schedule Classes (Admin Only, JSON, one session or a list)
+@app.route('/api/classes', methods=['POST'])
+@login_required('admin', api=True)
+def add_classes_api():
+    data = request.get_json(silent=True)
+    if data is None:
+        return {'error': 'Expected a JSON class session or list of sessions'}, 400
+    
+    try:
+        created = create_class_sessions(data if isinstance(data, list) else [data])
+    except ValueError as e:
+        db.session.rollback()
+        return {'error': str(e)}, 400
+    db.session.commit()
+    return {'created': created}, 201
+
+def _booking_member_pk():
+    """Member booked by the request: an admin names one, a member books for themselves"""
+    principal = current_principal()
+    if principal['role'] == 'admin':
+        member_id = (request.get_json(silent=True) or {}).get('member_id')
+        member = Member.query.filter_by(member_id=member_id).first() if member_id else None
+        return member.id if member else None
+    return member_pk_for_user(principal['id'])
+
+BOOKING_STATUS_CODES = {'booked': 201, 'cancelled': 200, 'not_found': 404, 'not_booked': 404}
+
+# Route: Book a Class
+@app.route('/api/classes/<int:session_id>/book', methods=['POST'])
+@login_required(api=True)
+def book_class_api(session_id):
+    member_pk = _booking_member_pk()
+    if member_pk is None:
+        return {'error': 'Member not found'}, 404
+    
+    result = book_class(session_id, member_pk)
+    return {'result': result}, BOOKING_STATUS_CODES.get(result, 409)
+
+# Route: Cancel a Class Booking
+@app.route('/api/classes/<int:session_id>/cancel', methods=['POST'])
+@login_required(api=True)
+def cancel_class_api(session_id):
+    member_pk = _booking_member_pk()
+    if member_pk is None:
+        return {'error': 'Member not found'}, 404
+    
+    result = cancel_booking(session_id, member_pk)
+    return {'result': result}, BOOKING_STATUS_CODES[result]
 
 # Route: Pending Registrations (Admin Only)
 @app.route('/pending-registrations')
+@login_required('admin')
 def pending_registrations():
-    if 'username' not in session or session.get('role') != 'admin':
-        flash('Unauthorized access!', 'error')
-        return redirect(url_for('dashboard'))
-    
     # Query pending registrations from database
-    registrations = PendingRegistration.query.filter_by(status='pending').all()
+    registrations = pending_registration_rows()
     
     return render_template('pending_registrations.html', 
                          registrations=registrations)
 
 # Route: Approve Registration
 @app.route('/approve-registration/<reg_id>')
+@login_required('admin')
 def approve_registration(reg_id):
-    if 'username' not in session or session.get('role') != 'admin':
-        flash('Unauthorized access!', 'error')
-        return redirect(url_for('dashboard'))
-    
     # Find registration in database
-    registration = PendingRegistration.query.filter_by(registration_id=reg_id).first()
+    registration = PendingRegistration.query.filter_by(registration_id=reg_id, status='pending').first()
     
     if registration:
-        # Generate member ID
-        member_count = Member.query.count()
-        member_id = f"M{member_count + 1:03d}"
-        
-        # Get membership amount
-        membership_amounts = {
-            'basic': 2500,
-            'standard': 4500,
-            'premium': 7500
-        }
-        amount = membership_amounts.get(registration.membership_type, 2500)
-        
-        # Calculate expiry date
-        join_date = datetime.now()
-        if registration.membership_type == 'basic':
-            expiry_date = join_date + timedelta(days=30)
-        elif registration.membership_type == 'standard':
-            expiry_date = join_date + timedelta(days=30)
-        else:  # premium
-            expiry_date = join_date + timedelta(days=365)
-        
-        # Create approved member
-        new_member = Member(
-            member_id=member_id,
-            first_name=registration.first_name,
-            last_name=registration.last_name,
-            email=registration.email,
-            phone=registration.phone,
-            dob=registration.dob,
-            gender=registration.gender,
-            address=registration.address,
-            membership_type=f"{registration.membership_type.title()} Plan",
-            amount=amount,
-            join_date=join_date.strftime('%Y-%m-%d'),
-            expiry_date=expiry_date.strftime('%Y-%m-%d'),
-            status='active',
-            payment_status='pending'
-        )
-        
-        db.session.add(new_member)
-        
-        # Create user account with default password
-        username = registration.email.split('@')[0]
-        default_password = 'member123'
-        hashed_password = bcrypt.generate_password_hash(default_password).decode('utf-8')
-        
-        new_user = User(
-            username=username,
-            email=registration.email,
-            password_hash=hashed_password,
-            role='member',
-            name=f"{registration.first_name} {registration.last_name}"
-        )
-        
-        db.session.add(new_user)
-        
-        # Update registration status
-        registration.status = 'approved'
-        
-        # Commit all changes
-        db.session.commit()
+        # Create approved member and user account
+        try:
+            approved = approve_registrations([registration])
+        except ValueError as e:
+            flash(f'Cannot approve: {e}', 'error')
+            return redirect(url_for('pending_registrations'))
         
-        # Send approval email
+        # Queue approval email
         try:
-            send_approval_email(new_member, username, default_password)
+            send_approval_emails(approved)
         except Exception as e:
             print(f"Error sending approval email: {e}")
             # Continue even if email fails
         
-        flash(f'Registration approved! Member ID: {member_id}. Login credentials sent to {registration.email}', 'success')
+        # Commit all changes
+        db.session.commit()
+        
+        flash(f'Registration approved! Member ID: {approved[0]["member_id"]}. Login credentials sent to {registration.email}', 'success')
     else:
         flash('Registration not found!', 'error')
     
@@ -261,11 +491,8 @@ def approve_registration(reg_id):
 
 # Route: Reject Registration
 @app.route('/reject-registration/<reg_id>')
+@login_required('admin')
 def reject_registration(reg_id):
-    if 'username' not in session or session.get('role') != 'admin':
-        flash('Unauthorized access!', 'error')
-        return redirect(url_for('dashboard'))
-    
     # Find registration in database
     registration = PendingRegistration.query.filter_by(registration_id=reg_id).first()
     
@@ -280,6 +507,47 @@ def reject_registration(reg_id):
     
     return redirect(url_for('pending_registrations'))
 
+# Route: Bulk Approve/Reject Registrations
+@app.route('/registrations/bulk', methods=['POST'])
+@login_required('admin')
+def bulk_registrations():
+    registration_ids = request.form.getlist('registration_ids')
+    action = request.form.get('action')
+    
+    if not registration_ids:
+        flash('No registrations selected!', 'error')
+        return redirect(url_for('pending_registrations'))
+    
+    if action == 'approve':
+        registrations = PendingRegistration.query.filter(
+            PendingRegistration.registration_id.in_(registration_ids),
+            PendingRegistration.status == 'pending'
+        ).order_by(PendingRegistration.id).all()
+        
+        try:
+            approved = approve_registrations(registrations)
+        except ValueError as e:
+            flash(f'Cannot approve: {e}', 'error')
+            return redirect(url_for('pending_registrations'))
+        
+        # Queue all approval emails in one batch
+        try:
+            send_approval_emails(approved)
+        except Exception as e:
+            print(f"Error sending approval emails: {e}")
+            # Continue even if email fails
+        
+        db.session.commit()
+        flash(f'{len(approved)} registrations approved! Login credentials sent by email.', 'success')
+    elif action == 'reject':
+        rejected = reject_registrations(registration_ids)
+        db.session.commit()
+        flash(f'{rejected} registrations rejected', 'warning')
+    else:
+        flash('Unknown action!', 'error')
+    
+    return redirect(url_for('pending_registrations'))
+
 # Route: Logout
 @app.route('/logout')
 def logout():
@@ -290,16 +558,14 @@ def logout():
 
 # Route: Delete Member
 @app.route('/delete-member/<member_id>')
+@login_required('admin')
 def delete_member(member_id):
-    if 'username' not in session or session.get('role') != 'admin':
-        flash('Unauthorized access!', 'error')
-        return redirect(url_for('dashboard'))
-    
     # Find member in database
     member = Member.query.filter_by(member_id=member_id).first()
     
     if member:
-        db.session.delete(member)
+        # Soft delete: the member and their login move to the archive and can be restored
+        archive_members([member.id], 'deleted')
         db.session.commit()
         flash(f'Member {member.first_name} {member.last_name} deleted successfully!', 'success')
     else:
@@ -307,38 +573,68 @@ def delete_member(member_id):
     
     return redirect(url_for('dashboard'))
 
-# Route: View Member Details (JSON for AJAX)
+def _member_json_response(body, etag, last_modified):
+    """JSON response with the member validators, answered with 304 when the client's copy is current"""
+    response = Response(body, mimetype='application/json')
+    response.set_etag(etag, weak=True)
+    if last_modified:
+        response.last_modified = last_modified
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+# Route: View Member Details (JSON for AJAX, cached, conditional GET)
 @app.route('/api/member/<member_id>')
+@login_required(api=True)
 def get_member(member_id):
-    if 'username' not in session:
-        return {'error': 'Unauthorized'}, 401
+    entry = member_entries([member_id])[member_id]
+    if entry is None:
+        return {'error': 'Member not found'}, 404
     
-    # Find member in database
-    member = Member.query.filter_by(member_id=member_id).first()
+    return _member_json_response(entry['json'], entry['etag'], entry['last_modified'])
+
+# Route: Batch Member Details (JSON, ?ids=M001,M002,...)
+@app.route('/api/members')
+@login_required(api=True)
+def get_members_batch():
+    member_ids = list(dict.fromkeys(i.strip() for i in request.args.get('ids', '').split(',') if i.strip()))
+    if not member_ids:
+        return {'error': 'ids is required'}, 400
+    if len(member_ids) > app.config['MEMBER_BATCH_MAX']:
+        return {'error': f"At most {app.config['MEMBER_BATCH_MAX']} ids per request"}, 413
     
-    if member:
-        return {
-            'id': member.member_id,
-            'first_name': member.first_name,
-            'last_name': member.last_name,
-            'email': member.email,
-            'phone': member.phone,
-            'membership': member.membership_type,
-            'amount': member.amount,
-            'join_date': member.join_date,
-            'expiry_date': member.expiry_date,
-            'status': member.status
-        }
-    else:
-        return {'error': 'Member not found'}, 404
+    entries = member_entries(member_ids)
+    ordered = [entries[member_id] for member_id in member_ids]
+    etag, last_modified = batch_validators(ordered)
+    
+    # Members are already serialized, so the body is joined rather than re-encoded
+    found = ','.join(entry['json'] for entry in ordered if entry is not None)
+    missing = json.dumps([member_id for member_id in member_ids if entries[member_id] is None])
+    return _member_json_response(f'{{"members":[{found}],"missing":{missing}}}', etag, last_modified)
+
+# Route: Search Members (JSON for AJAX)
+@app.route('/api/members/search')
+@login_required(api=True)
+def search_members_api():
+    query = request.args.get('q', '').strip()
+    page = request.args.get('page', 1, type=int)
+    per_page = clamp_page_size(request.args.get('per_page'),
+                               app.config['SEARCH_PAGE_SIZE'],
+                               app.config['MEMBERS_MAX_PAGE_SIZE'])
+    
+    results, has_more = search_members(query, page=page, per_page=per_page)
+    
+    return {
+        'query': query,
+        'page': page,
+        'has_more': has_more,
+        'results': [member_result(member) for member in results]
+    }
 
 # Route: Edit Member (Future implementation)
 @app.route('/edit-member/<member_id>', methods=['GET', 'POST'])
+@login_required('admin')
 def edit_member(member_id):
-    if 'username' not in session or session.get('role') != 'admin':
-        flash('Unauthorized access!', 'error')
-        return redirect(url_for('dashboard'))
-    
     # Find member in database
     member = Member.query.filter_by(member_id=member_id).first()
     
@@ -347,12 +643,17 @@ def edit_member(member_id):
         return redirect(url_for('dashboard'))
     
     if request.method == 'POST':
+        plan = get_plan(request.form.get('membership'))
+        if plan is None:
+            flash('Unknown membership plan!', 'error')
+            return render_template('edit_member.html', member=member, plans=get_plans(include_inactive=True))
+        
         # Update member data
         member.first_name = request.form.get('firstName')
         member.last_name = request.form.get('lastName')
         member.email = request.form.get('email')
         member.phone = request.form.get('phone')
-        member.membership_type = request.form.get('membership')
+        member.membership_type = plan['name']
         member.status = request.form.get('status')
         member.updated_at = datetime.utcnow()
         
@@ -361,7 +662,7 @@ def edit_member(member_id):
         flash(f'Member {member.first_name} {member.last_name} updated successfully!', 'success')
         return redirect(url_for('dashboard'))
     
-    return render_template('edit_member.html', member=member)
+    return render_template('edit_member.html', member=member, plans=get_plans(include_inactive=True))
 
 # Route: Forgot Password
 @app.route('/forgot-password', methods=['GET', 'POST'])
@@ -373,26 +674,16 @@ def forgot_password():
         user = User.query.filter_by(email=email).first()
         
         if user:
-            # Generate reset token
-            token = secrets.token_urlsafe(32)
-            expires_at = datetime.utcnow() + timedelta(hours=1)
+            # Generate reset token (replaces any earlier token for this user)
+            token = issue_reset_token(user.id, app.config['RESET_TOKEN_TTL_MINUTES'])
             
-            # Create password reset token
-            reset_token = PasswordResetToken(
-                user_id=user.id,
-                token=token,
-                expires_at=expires_at,
-                used=False
-            )
-            
-            db.session.add(reset_token)
-            db.session.commit()
-            
-            # Send password reset email
+            # Queue password reset email
             try:
                 send_password_reset_email(user, token)
+                db.session.commit()
                 flash('Password reset link has been sent to your email!', 'success')
             except Exception as e:
+                db.session.rollback()
                 print(f"Error sending password reset email: {e}")
                 flash('Error sending email. Please try again later.', 'error')
         else:
@@ -406,8 +697,8 @@ def forgot_password():
 # Route: Reset Password
 @app.route('/reset-password/<token>', methods=['GET', 'POST'])
 def reset_password(token):
-    # Find token in database
-    reset_token = PasswordResetToken.query.filter_by(token=token, used=False).first()
+    # Find token in database (stored as a hash)
+    reset_token = find_reset_token(token)
     
     if not reset_token:
         flash('Invalid or expired reset link!', 'error')
@@ -428,7 +719,7 @@ def reset_password(token):
         
         # Update user password
         user = User.query.get(reset_token.user_id)
-        user.password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+        user.password_hash = hash_password(password)
         
         # Mark token as used
         reset_token.used = True
@@ -441,15 +732,12 @@ def reset_password(token):
     return render_template('reset_password.html', token=token)
 
 # Email helper functions
+# These render the message from its cached template shell and add it to the
+# outbox in the current session; the mail worker delivers it after the caller commits.
 def send_welcome_email(registration):
-    """Send welcome email to new registration"""
+    """Queue welcome email to new registration"""
     try:
-        msg = Message(
-            subject='Welcome to GymFit Bangladesh - Registration Received',
-            recipients=[registration.email]
-        )
-        
-        msg.html = render_template(
+        html = render_email(
             'email/welcome.html',
             first_name=registration.first_name,
             last_name=registration.last_name,
@@ -459,67 +747,78 @@ def send_welcome_email(registration):
             year=datetime.now().year
         )
         
-        mail.send(msg)
+        enqueue_email('Welcome to GymFit Bangladesh - Registration Received',
+                      registration.email, html)
     except Exception as e:
         print(f"Error sending welcome email: {e}")
         raise
 
-def send_approval_email(member, username, password):
-    """Send approval email with login credentials"""
+def send_approval_emails(approved):
+    """Queue approval emails with login credentials for approved members"""
     try:
-        msg = Message(
-            subject='Registration Approved - Welcome to GymFit Bangladesh!',
-            recipients=[member.email]
-        )
-        
         login_url = url_for('login', _external=True)
-        
-        msg.html = render_template(
-            'email/approval.html',
-            first_name=member.first_name,
-            last_name=member.last_name,
-            member_id=member.member_id,
-            membership_type=member.membership_type,
-            join_date=member.join_date,
-            expiry_date=member.expiry_date,
-            amount=member.amount,
-            username=username,
-            password=password,
-            login_url=login_url,
-            year=datetime.now().year
-        )
-        
-        mail.send(msg)
+        year = datetime.now().year
+        
+        htmls = render_email_batch('email/approval.html', [{
+            'first_name': member['first_name'],
+            'last_name': member['last_name'],
+            'member_id': member['member_id'],
+            'membership_type': member['membership_type'],
+            'join_date': member['join_date'],
+            'expiry_date': member['expiry_date'],
+            'amount': member['amount'],
+            'username': member['username'],
+            'password': DEFAULT_MEMBER_PASSWORD,
+            'login_url': login_url,
+            'year': year
+        } for member in approved])
+        
+        enqueue_emails('Registration Approved - Welcome to GymFit Bangladesh!',
+                       [(member['email'], html) for member, html in zip(approved, htmls)])
     except Exception as e:
-        print(f"Error sending approval email: {e}")
+        print(f"Error sending approval emails: {e}")
         raise
 
 def send_password_reset_email(user, token):
-    """Send password reset email"""
+    """Queue password reset email"""
     try:
-        msg = Message(
-            subject='Reset Your Password - GymFit Bangladesh',
-            recipients=[user.email]
-        )
-        
         reset_url = url_for('reset_password', token=token, _external=True)
         
-        msg.html = render_template(
+        html = render_email(
             'email/reset_password.html',
             name=user.name,
             reset_url=reset_url,
             year=datetime.now().year
         )
         
-        mail.send(msg)
+        enqueue_email('Reset Your Password - GymFit Bangladesh', user.email, html)
     except Exception as e:
         print(f"Error sending password reset email: {e}")
         raise
 
+# Route: Mail Queue Stats (Admin Only, JSON)
+@app.route('/api/mail-queue/stats')
+@login_required('admin', api=True)
+def mail_queue_stats_api():
+    return queue_stats()
+
+# Route: Login Throughput Stats (admin only)
+@app.route('/api/auth/stats')
+@login_required('admin', api=True)
+def auth_stats_api():
+    return auth_stats()
+
+# Route: Query Cache Hit/Miss Stats (admin only)
+@app.route('/api/cache/stats')
+@login_required('admin', api=True)
+def cache_stats_api():
+    return cache_stats()
+
 # Context processor for current year
 @app.context_processor
 def inject_now():
     return {'now': datetime.now(), 'year': datetime.now().year}
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    # Development server only, use wsgi.py with gunicorn in production
+    app.run(debug=app.config['DEBUG'], host='0.0.0.0', port=5000)
\ No newline at end of file
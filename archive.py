@@ -0,0 +1,143 @@
+import time
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import and_, delete, insert, literal, select
+
+from models import db, User, Member, PendingRegistration, PasswordResetToken, ArchivedMember, \
+    ArchivedRegistration
+from scheduling import cancel_member_bookings
+from search import index_members, unindex_members
+
+# Columns copied as-is between a table and its archive
+MEMBER_COLUMNS = ('member_id', 'first_name', 'last_name', 'email', 'phone', 'dob', 'gender', 'address',
+                  'membership_type', 'amount', 'join_date', 'expiry_date', 'status', 'payment_status',
+                  'payment_method', 'transaction_id', 'payment_date', 'created_at', 'updated_at')
+REGISTRATION_COLUMNS = ('registration_id', 'first_name', 'last_name', 'email', 'phone', 'dob', 'gender',
+                        'address', 'membership_type', 'registration_date', 'status')
+
+
+def archive_members(member_pks, reason, now=None):
+    """Move members into members_archive and remove their logins.
+
+    The member's username and password hash are kept on the archive row so
+    restore_member() can bring the login back. Bookings for classes that
+    haven't started are cancelled to free the seats. Payments, check-ins,
+    bookings and reminders keep the member's id (members_archive.member_pk),
+    which members.id never hands out again (AUTOINCREMENT). The caller
+    commits; returns the number archived.
+    """
+    if not member_pks:
+        return 0
+    now = now or datetime.utcnow()
+    member_pks = list(member_pks)
+    login = and_(User.email == Member.email, User.role == 'member')
+
+    db.session.execute(insert(ArchivedMember).from_select(
+        ['member_pk', *MEMBER_COLUMNS, 'username', 'password_hash', 'archive_reason', 'archived_at'],
+        select(Member.id, *[getattr(Member, column) for column in MEMBER_COLUMNS], User.username,
+               User.password_hash, literal(reason), literal(now))
+        .outerjoin(User, login).where(Member.id.in_(member_pks))
+    ))
+
+    cancel_member_bookings(member_pks)
+    user_ids = select(User.id).join(Member, login).where(Member.id.in_(member_pks)).scalar_subquery()
+    db.session.execute(delete(PasswordResetToken).where(PasswordResetToken.user_id.in_(user_ids)))
+    db.session.execute(delete(User).where(User.id.in_(user_ids)))
+
+    # Bulk deletes skip the ORM events that maintain the search index
+    unindex_members(member_pks)
+    return db.session.execute(delete(Member).where(Member.id.in_(member_pks))).rowcount
+
+
+def archive_expired_members(older_than_days=365, chunk_size=1000, today=None):
+    """Archive members expired for more than `older_than_days`, committing every chunk.
+
+    Returns the number archived.
+    """
+    cutoff = (today or date.today()) - timedelta(days=older_than_days)
+    archived = 0
+    while True:
+        ids = db.session.execute(
+            select(Member.id).where(Member.status == 'expired', Member.expiry_date < cutoff)
+            .order_by(Member.id).limit(chunk_size)
+        ).scalars().all()
+        if not ids:
+            return archived
+        archived += archive_members(ids, 'expired')
+        db.session.commit()
+
+
+def archive_registrations(older_than_days=30, chunk_size=1000, today=None):
+    """Move approved and rejected registrations older than `older_than_days` to the archive.
+
+    Each chunk is copied and deleted in its own transaction, so the admin
+    queue stays available while a large backlog is cleared. Returns the
+    number archived.
+    """
+    cutoff = (today or date.today()) - timedelta(days=older_than_days)
+    now = datetime.utcnow()
+    archived = 0
+    while True:
+        ids = db.session.execute(
+            select(PendingRegistration.id)
+            .where(PendingRegistration.status.in_(['approved', 'rejected']),
+                   PendingRegistration.registration_date < cutoff)
+            .order_by(PendingRegistration.id).limit(chunk_size)
+        ).scalars().all()
+        if not ids:
+            return archived
+        db.session.execute(insert(ArchivedRegistration).from_select(
+            [*REGISTRATION_COLUMNS, 'archived_at'],
+            select(*[getattr(PendingRegistration, column) for column in REGISTRATION_COLUMNS], literal(now))
+            .where(PendingRegistration.id.in_(ids))
+        ))
+        db.session.execute(delete(PendingRegistration).where(PendingRegistration.id.in_(ids)))
+        db.session.commit()
+        archived += len(ids)
+
+
+def run_archival(member_days=365, registration_days=30, chunk_size=1000):
+    """Archive decided registrations and long-expired members, returns counts and timing"""
+    start = time.perf_counter()
+    registrations = archive_registrations(registration_days, chunk_size)
+    members = archive_expired_members(member_days, chunk_size)
+    elapsed = time.perf_counter() - start
+    return {'registrations': registrations, 'members': members, 'seconds': elapsed,
+            'rows_per_second': (registrations + members) / elapsed if elapsed else 0}
+
+
+def restore_member(member_id):
+    """Move an archived member back into members, with their login if it is still free.
+
+    The member always gets their own id back, so their payments, check-ins
+    and bookings follow them. Returns the restored Member, or None if
+    `member_id` isn't archived. Raises ValueError if the email now belongs
+    to another member, or if the id was given to another member (only
+    possible for members archived before ids stopped being reused). The
+    caller commits.
+    """
+    archived = ArchivedMember.query.filter_by(member_id=member_id).first()
+    if archived is None:
+        return None
+    if Member.query.filter_by(email=archived.email).first() is not None:
+        raise ValueError(f'{archived.email} belongs to another member')
+    if db.session.get(Member, archived.member_pk) is not None:
+        raise ValueError(f'id {archived.member_pk} of {member_id} belongs to another member')
+
+    values = {column: getattr(archived, column) for column in MEMBER_COLUMNS}
+    db.session.execute(insert(Member), [dict(values, id=archived.member_pk)])
+
+    login_taken = User.query.filter(db.or_(User.username == archived.username,
+                                           User.email == archived.email)).first()
+    if archived.username and login_taken is None:
+        db.session.execute(insert(User), [{
+            'username': archived.username,
+            'email': archived.email,
+            'password_hash': archived.password_hash,
+            'role': 'member',
+            'name': f'{archived.first_name} {archived.last_name}'
+        }])
+
+    db.session.delete(archived)
+    index_members([member_id])
+    return Member.query.filter_by(member_id=member_id).one()
@@ -0,0 +1,169 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+
+from flask import current_app, g, request, send_from_directory
+
+try:
+    import brotli
+except ImportError:  # pre-compressed .br files are skipped without it
+    brotli = None
+
+# Static sub-directories that are fingerprinted by `flask assets-build`
+ASSET_DIRS = ('css', 'js')
+DIST_DIR = 'dist'
+MANIFEST_NAME = 'manifest.json'
+COMPRESSIBLE_TYPES = ('.css', '.js', '.svg', '.json', '.txt', '.html')
+
+# Fingerprinted URLs never change content, so browsers may keep them for a year
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+# filename -> (mtime, version) for the query-string fallback
+_versions = {}
+
+
+def _digest(data):
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+def build_assets(static_folder):
+    """Copy css/ and js/ into dist/ under content-hashed names.
+
+    Writes a gzip (and, with the brotli package, a brotli) copy next to each
+    text asset and a manifest.json mapping the original names to the hashed
+    ones. Returns the manifest.
+    """
+    dist = os.path.join(static_folder, DIST_DIR)
+    if os.path.isdir(dist):
+        shutil.rmtree(dist)
+
+    manifest = {}
+    for asset_dir in ASSET_DIRS:
+        for root, _, files in os.walk(os.path.join(static_folder, asset_dir)):
+            for name in sorted(files):
+                source = os.path.join(root, name)
+                relative = os.path.relpath(source, static_folder).replace(os.sep, '/')
+                with open(source, 'rb') as f:
+                    data = f.read()
+
+                stem, ext = os.path.splitext(relative)
+                hashed = f'{DIST_DIR}/{stem}.{_digest(data)}{ext}'
+                target = os.path.join(static_folder, hashed)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                with open(target, 'wb') as f:
+                    f.write(data)
+
+                if ext in COMPRESSIBLE_TYPES:
+                    with open(target + '.gz', 'wb') as f:
+                        f.write(gzip.compress(data, compresslevel=9, mtime=0))
+                    if brotli is not None:
+                        with open(target + '.br', 'wb') as f:
+                            f.write(brotli.compress(data, quality=11))
+
+                manifest[relative] = hashed
+
+    with open(os.path.join(dist, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def load_manifest(static_folder):
+    path = os.path.join(static_folder, DIST_DIR, MANIFEST_NAME)
+    if not os.path.isfile(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def asset_version(static_folder, filename):
+    """Short content hash of a static file, recomputed when its mtime changes"""
+    path = os.path.join(static_folder, filename)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    cached = _versions.get(filename)
+    if cached is None or cached[0] != mtime:
+        with open(path, 'rb') as f:
+            cached = (mtime, _digest(f.read()))
+        _versions[filename] = cached
+    return cached[1]
+
+
+def _fingerprint_static_url(endpoint, values):
+    """url_for('static', ...) points at the built copy, or adds ?v=<hash> without a build"""
+    if endpoint != 'static' or 'filename' not in values or 'v' in values:
+        return
+    app = current_app
+    hashed = app.extensions['asset_manifest'].get(values['filename'])
+    if hashed:
+        values['filename'] = hashed
+    else:
+        version = asset_version(app.static_folder, values['filename'])
+        if version:
+            values['v'] = version
+
+
+def serve_static(filename):
+    """Static files with pre-compressed variants and far-future caching for fingerprinted URLs"""
+    app = current_app
+    fingerprinted = filename.startswith(DIST_DIR + '/') or 'v' in request.args
+    max_age = IMMUTABLE_MAX_AGE if fingerprinted else app.get_send_file_max_age(filename)
+
+    response = None
+    for encoding, suffix in (('br', '.br'), ('gzip', '.gz')):
+        if request.accept_encodings[encoding] and \
+                os.path.isfile(os.path.join(app.static_folder, filename + suffix)):
+            response = send_from_directory(app.static_folder, filename + suffix, max_age=max_age,
+                                           mimetype=mimetypes.guess_type(filename)[0])
+            response.headers['Content-Encoding'] = encoding
+            break
+    if response is None:
+        response = send_from_directory(app.static_folder, filename, max_age=max_age)
+
+    response.vary.add('Accept-Encoding')
+    if fingerprinted:
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+    return response
+
+
+def compress_and_tag_page(response):
+    """gzip rendered pages and JSON, tag them with an ETag and answer If-None-Match with 304.
+
+    Pages depend on the session, so they are marked private and must be
+    revalidated on every visit; an unchanged page then costs one 304.
+    Pages that rendered a CSRF token are not tagged: the signed token
+    changes every second, so their ETag would never match.
+    """
+    config = current_app.config
+    if request.method not in ('GET', 'HEAD') or response.status_code != 200 \
+            or response.direct_passthrough or response.is_streamed or request.endpoint == 'static' \
+            or response.mimetype not in ('text/html', 'application/json'):
+        return response
+
+    if 'Cache-Control' not in response.headers:
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+
+    data = response.get_data()
+    if config['COMPRESS_RESPONSES'] and len(data) >= config['COMPRESS_MIN_SIZE'] \
+            and request.accept_encodings['gzip'] and 'Content-Encoding' not in response.headers:
+        response.set_data(gzip.compress(data, compresslevel=config['COMPRESS_LEVEL'], mtime=0))
+        response.headers['Content-Encoding'] = 'gzip'
+    response.vary.add('Accept-Encoding')
+
+    if g.get(config.get('WTF_CSRF_FIELD_NAME', 'csrf_token')):
+        return response
+    response.add_etag()
+    return response.make_conditional(request)
+
+
+def init_assets(app):
+    app.extensions['asset_manifest'] = load_manifest(app.static_folder)
+    app.url_defaults(_fingerprint_static_url)
+    app.view_functions['static'] = serve_static
+    app.after_request(compress_and_tag_page)
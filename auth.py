@@ -0,0 +1,228 @@
+import secrets
+import threading
+import time
+from collections import deque
+from functools import wraps
+
+from flask import current_app, flash, g, redirect, request, session, url_for
+from flask_bcrypt import generate_password_hash, check_password_hash
+from sqlalchemy import select
+
+from cache import TTLCache, invalidate_on_commit
+from models import db, User
+from ratelimit import RateLimiter
+
+# Login lookups by username (None for unknown usernames). Dropped on any
+# commit that writes to users, and otherwise kept for AUTH_USER_CACHE_TTL.
+_user_cache = TTLCache(ttl=30, maxsize=4096)
+invalidate_on_commit(User, _user_cache.clear)
+
+# Logged-in principals by user id (None once a user is deleted). Dropped on
+# any commit that writes to users, so a role change or deletion takes effect
+# on the next request; other processes see it within PRINCIPAL_CACHE_TTL.
+_principal_cache = TTLCache(ttl=60, maxsize=4096)
+invalidate_on_commit(User, _principal_cache.clear)
+
+login_limiter = RateLimiter()
+
+# Recent login latencies (seconds) seen by this process
+_auth_latencies = deque(maxlen=1000)
+_stats_lock = threading.Lock()
+_counters = {'success': 0, 'failure': 0, 'rate_limited': 0, 'rehashed': 0}
+
+
+def _count(name):
+    with _stats_lock:
+        _counters[name] += 1
+
+
+def hash_password(password):
+    """bcrypt hash using the configured cost (BCRYPT_LOG_ROUNDS)"""
+    return generate_password_hash(password, current_app.config['BCRYPT_LOG_ROUNDS']).decode('utf-8')
+
+
+def needs_rehash(password_hash):
+    """True when a stored hash was made with a different cost than the configured one"""
+    try:
+        return int(password_hash.split('$')[2]) != current_app.config['BCRYPT_LOG_ROUNDS']
+    except (AttributeError, IndexError, ValueError):
+        return False
+
+
+def _load_user(username):
+    user = User.query.filter_by(username=username).first()
+    if user is None:
+        return None
+    return {
+        'id': user.id,
+        'username': user.username,
+        'password_hash': user.password_hash,
+        'role': user.role,
+        'name': user.name
+    }
+
+
+def get_login_user(username):
+    """Fields needed to check a login, cached by username"""
+    ttl = current_app.config['AUTH_USER_CACHE_TTL']
+    if not ttl:
+        return _load_user(username)
+    return _user_cache.get_or_set(username, lambda: _load_user(username), ttl=ttl)
+
+
+def check_login_rate(username, remote_addr):
+    """Count a login attempt against the per-IP and per-username buckets.
+
+    Returns the number of seconds to wait, or 0 if the attempt may go ahead.
+    Runs before any database lookup or hashing, so a burst of bad logins is
+    turned away cheaply.
+    """
+    config = current_app.config
+    if not config['LOGIN_RATE_LIMIT_ENABLED']:
+        return 0
+
+    allowed, retry_after = login_limiter.hit(
+        f'ip:{remote_addr}', config['LOGIN_IP_BURST'], config['LOGIN_IP_PER_MINUTE'])
+    if allowed and username:
+        allowed, retry_after = login_limiter.hit(
+            f'user:{username.lower()}', config['LOGIN_USERNAME_BURST'], config['LOGIN_USERNAME_PER_MINUTE'])
+
+    if not allowed:
+        _count('rate_limited')
+        return max(1, int(retry_after + 0.999))
+    return 0
+
+
+def authenticate(username, password):
+    """Check a username/password, returns the cached user fields or None.
+
+    If the stored hash was made with a different BCRYPT_LOG_ROUNDS it is
+    replaced with a fresh hash of the (now verified) password and committed.
+    """
+    start = time.perf_counter()
+    user = get_login_user(username) if username and password else None
+    valid = user is not None and check_password_hash(user['password_hash'], password)
+
+    if valid and needs_rehash(user['password_hash']):
+        try:
+            User.query.filter_by(id=user['id']).update({'password_hash': hash_password(password)})
+            db.session.commit()
+            _count('rehashed')
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error rehashing password for {username}: {e}")
+
+    with _stats_lock:
+        _auth_latencies.append(time.perf_counter() - start)
+        _counters['success' if valid else 'failure'] += 1
+
+    return user if valid else None
+
+
+def _load_principal(user_id):
+    row = db.session.execute(
+        select(User.id, User.username, User.role, User.name).where(User.id == user_id)
+    ).first()
+    return dict(row._mapping) if row is not None else None
+
+
+def current_principal():
+    """The logged-in user as {'id', 'username', 'role', 'name'}, or None.
+
+    Loaded once per request into g and otherwise served from the principal
+    cache. A session whose user no longer exists is cleared.
+    """
+    if 'principal' in g:
+        return g.principal
+
+    principal = None
+    user_id = session.get('user_id')
+    if user_id is not None:
+        ttl = current_app.config['PRINCIPAL_CACHE_TTL']
+        if ttl:
+            principal = _principal_cache.get_or_set(user_id, lambda: _load_principal(user_id), ttl=ttl)
+        else:
+            principal = _load_principal(user_id)
+    if principal is None and 'username' in session:
+        session.clear()
+    elif principal is not None and session.get('role') != principal['role']:
+        session['role'] = principal['role']
+    g.principal = principal
+    return principal
+
+
+def _bearer_token_valid(setting):
+    token = current_app.config.get(setting)
+    return bool(token) and secrets.compare_digest(request.headers.get('Authorization', '').encode(),
+                                                  f'Bearer {token}'.encode())
+
+
+def login_required(*roles, api=False, token=None):
+    """Route decorator: require a logged-in user, with one of `roles` if given.
+
+    Pages redirect to the login page (or the dashboard for a wrong role),
+    api=True routes answer 401 JSON. `token` names a config setting whose
+    bearer token is accepted in place of a session, for machine clients.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(*args, **kwargs):
+            if token and _bearer_token_valid(token):
+                return view(*args, **kwargs)
+
+            principal = current_principal()
+            if principal is not None and (not roles or principal['role'] in roles):
+                return view(*args, **kwargs)
+
+            if api:
+                return {'error': 'Unauthorized'}, 401
+            if principal is None:
+                flash('Please login first!', 'error')
+                return redirect(url_for('login'))
+            flash('Unauthorized access!', 'error')
+            return redirect(url_for('dashboard'))
+        return wrapped
+    return decorator
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(pct / 100.0 * len(ordered)))]
+
+
+def auth_metrics():
+    """Login counters and auth_latency summary in Prometheus text format"""
+    with _stats_lock:
+        latencies = list(_auth_latencies)
+        counters = dict(_counters)
+
+    lines = [
+        '# HELP gymfit_login_attempts_total Login attempts by outcome.',
+        '# TYPE gymfit_login_attempts_total counter',
+    ]
+    lines += [f'gymfit_login_attempts_total{{result="{name}"}} {count}' for name, count in sorted(counters.items())]
+    lines += [
+        '# HELP gymfit_auth_latency_seconds Credential check time over the last 1000 logins.',
+        '# TYPE gymfit_auth_latency_seconds summary',
+    ]
+    if latencies:
+        for quantile in (0.5, 0.95):
+            lines.append(f'gymfit_auth_latency_seconds{{quantile="{quantile}"}} '
+                         f'{_percentile(latencies, quantile * 100):.6f}')
+    lines.append(f'gymfit_auth_latency_seconds_sum {sum(latencies):.6f}')
+    lines.append(f'gymfit_auth_latency_seconds_count {len(latencies)}')
+    return lines
+
+
+def auth_stats():
+    """Login counters and auth_latency (credential check time) for this process"""
+    with _stats_lock:
+        latencies = list(_auth_latencies)
+        counters = dict(_counters)
+
+    return {
+        'bcrypt_log_rounds': current_app.config['BCRYPT_LOG_ROUNDS'],
+        'auth_latency_p50_ms': round(_percentile(latencies, 50) * 1000, 2) if latencies else None,
+        'auth_latency_p95_ms': round(_percentile(latencies, 95) * 1000, 2) if latencies else None,
+        'counters': counters
+    }
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark the admin registration queue as history piles up, and the archive job.
+
+Seeds a registrations table where almost every row was decided long ago,
+reports p50/p95 latency of /pending-registrations and /dashboard with the
+query cache off, once without the partial pending index, once with it and
+once more after the archive job has moved decided registrations and
+long-expired members out.
+
+Usage: python benchmarks/bench_archive.py [--decided 200000] [--pending 200] [--expired 50000] [--iterations 30]
+"""
+
+import argparse
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import text
+
+import common
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--decided', type=int, default=200000)
+    parser.add_argument('--pending', type=int, default=200)
+    parser.add_argument('--expired', type=int, default=50000)
+    parser.add_argument('--iterations', type=int, default=30)
+    parser.add_argument('--chunk-size', type=int, default=5000)
+    args = parser.parse_args()
+
+    app, db = common.setup_app()
+    app.config['QUERY_CACHE_TTL'] = 0
+    long_ago = date.today() - timedelta(days=800)
+
+    with app.app_context():
+        start = time.perf_counter()
+        common.seed_pending_registrations(db, args.decided + args.pending)
+        db.session.execute(text(
+            "UPDATE pending_registrations SET status = CASE WHEN id % 5 = 0 THEN 'rejected' ELSE 'approved' END, "
+            "registration_date = :long_ago WHERE id <= :decided"), {'long_ago': long_ago, 'decided': args.decided})
+        common.seed_members(db, args.expired)
+        db.session.execute(text("UPDATE members SET status = 'expired', expiry_date = :long_ago"),
+                           {'long_ago': long_ago})
+        db.session.commit()
+        print(f'Seeded {args.decided} decided and {args.pending} pending registrations, '
+              f'{args.expired} long-expired members in {time.perf_counter() - start:.1f}s')
+
+    client = app.test_client()
+    common.login_as_admin(client)
+
+    def run(label):
+        for name, url in [('GET /pending-registrations', '/pending-registrations'), ('GET /dashboard', '/dashboard')]:
+            common.time_requests(client, url, 3)  # warm up
+            common.report(f'{name} ({label})', common.time_requests(client, url, args.iterations))
+
+    with app.app_context():
+        db.session.execute(text('DROP INDEX ix_pending_registrations_pending'))
+        db.session.commit()
+    run('no partial index')
+
+    with app.app_context():
+        db.session.execute(text("CREATE INDEX ix_pending_registrations_pending ON pending_registrations (id) "
+                                "WHERE status = 'pending'"))
+        db.session.commit()
+    run('partial index')
+
+    from archive import run_archival
+    with app.app_context():
+        result = run_archival(member_days=365, registration_days=30, chunk_size=args.chunk_size)
+    print(f"Archived {result['registrations']} registrations and {result['members']} members "
+          f"in {result['seconds']:.1f}s ({result['rows_per_second']:.0f} rows/s)")
+    run('after archive')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Benchmark approving registrations.
+
+Times one bulk approval of N pending registrations through
+/registrations/bulk, and compares it with approving a smaller sample one at
+a time through /approve-registration/<reg_id>.
+
+Usage: python benchmarks/bench_bulk_approve.py [--registrations 1000] [--sequential 50]
+"""
+
+import argparse
+import time
+
+import common
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--registrations', type=int, default=1000)
+    parser.add_argument('--sequential', type=int, default=50)
+    args = parser.parse_args()
+
+    app, db = common.setup_app()
+    client = app.test_client()
+    common.login_as_admin(client)
+
+    from models import Member, OutboxEmail
+
+    # One at a time
+    with app.app_context():
+        common.seed_pending_registrations(db, args.sequential, start=1)
+    start = time.perf_counter()
+    for i in range(1, args.sequential + 1):
+        client.get(f'/approve-registration/REG{i:06d}')
+    sequential = time.perf_counter() - start
+    print(f'Sequential approve x{args.sequential:<6} {sequential:8.2f}s  '
+          f'({sequential / args.sequential * 1000:.1f} ms/registration)')
+
+    # Bulk
+    first = args.sequential + 1
+    with app.app_context():
+        common.seed_pending_registrations(db, args.registrations, start=first)
+    ids = [f'REG{i:06d}' for i in range(first, first + args.registrations)]
+    start = time.perf_counter()
+    response = client.post('/registrations/bulk', data={'action': 'approve', 'registration_ids': ids})
+    bulk = time.perf_counter() - start
+    assert response.status_code == 302
+    print(f'Bulk approve x{args.registrations:<12} {bulk:8.2f}s  '
+          f'({bulk / args.registrations * 1000:.2f} ms/registration)')
+
+    with app.app_context():
+        members = Member.query.count()
+        emails = OutboxEmail.query.count()
+    print(f'Members created: {members}, emails queued: {emails}')
+    print(f'Speed-up per registration: {(sequential / args.sequential) / (bulk / args.registrations):.0f}x')
+
+
+if __name__ == '__main__':
+    main()
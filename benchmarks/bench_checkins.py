@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark front-desk check-in ingestion.
+
+Posts bursts of scans to /api/checkin from several threads (as a row of
+scanners would) and reports request latency, then waits for the buffer
+to drain and checks that every accepted scan reached the checkins table
+and the hourly rollup. For comparison, also times writing the same
+number of check-ins one INSERT and commit per scan, with a Member lookup
+for each.
+
+Usage: python benchmarks/bench_checkins.py [--members 50000] [--scans 20000] [--threads 8]
+"""
+
+import argparse
+import threading
+import time
+from datetime import datetime
+
+import common
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(pct / 100.0 * len(ordered)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--members', type=int, default=50000)
+    parser.add_argument('--scans', type=int, default=20000)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--baseline', type=int, default=2000)
+    args = parser.parse_args()
+
+    app, db = common.setup_app()
+    app.config['CHECKIN_API_TOKEN'] = 'bench-token'
+    app.config['CHECKIN_DEDUPE_SECONDS'] = 0
+    from checkins import get_checkin_buffer
+    from models import CheckIn, CheckInHour, Member
+
+    with app.app_context():
+        common.seed_members(db, args.members)
+        active = [member_id for (member_id,) in db.session.query(Member.member_id)
+                  .filter(Member.status == 'active', Member.expiry_date >= datetime.now().date())]
+    print(f'{len(active)} active, unexpired members')
+
+    headers = {'Authorization': 'Bearer bench-token'}
+    latencies = []
+    results = {}
+    lock = threading.Lock()
+    per_thread = args.scans // args.threads
+
+    def scanner(offset):
+        client = app.test_client()
+        local = []
+        for i in range(per_thread):
+            member_id = active[(offset * per_thread + i) % len(active)]
+            start = time.perf_counter()
+            response = client.post('/api/checkin', json={'member_id': member_id, 'device': f'gate-{offset}'},
+                                   headers=headers)
+            local.append(time.perf_counter() - start)
+            result = response.get_json().get('result', response.status_code)
+            with lock:
+                results[result] = results.get(result, 0) + 1
+        with lock:
+            latencies.extend(local)
+
+    # Warm the member cache so the first scan doesn't pay for loading it
+    app.test_client().post('/api/checkin', json={'member_id': 'warm-up'}, headers=headers)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=scanner, args=(i,)) for i in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    total = per_thread * args.threads
+    print(f'buffered /api/checkin    {total} scans in {elapsed:6.2f}s  {total / elapsed:8.0f} scans/s  '
+          f'p50 {percentile(latencies, 50) * 1000:6.2f} ms  p95 {percentile(latencies, 95) * 1000:6.2f} ms')
+    print(f'  results: {results}')
+
+    buffer = get_checkin_buffer(app)
+    start = time.perf_counter()
+    buffer.flush()
+    print(f'  final flush {time.perf_counter() - start:.3f}s, buffer now {len(buffer)}')
+    with app.app_context():
+        stored = db.session.query(CheckIn).count()
+        rolled_up = db.session.query(db.func.sum(CheckInHour.checkins)).scalar()
+    print(f'  checkins table: {stored} rows, hourly rollup total: {rolled_up}')
+
+    with app.app_context():
+        start = time.perf_counter()
+        for i in range(args.baseline):
+            member = Member.query.filter_by(member_id=active[i % len(active)]).first()
+            db.session.add(CheckIn(member_pk=member.id, checked_in_at=datetime.now(), device='baseline'))
+            db.session.commit()
+        elapsed = time.perf_counter() - start
+    print(f'insert+commit per scan   {args.baseline} scans in {elapsed:6.2f}s  {args.baseline / elapsed:8.0f} scans/s')
+
+
+if __name__ == '__main__':
+    main()
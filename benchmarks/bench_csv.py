@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Benchmark member CSV import and export.
+
+Writes a CSV of synthetic members (with a few invalid rows), imports it,
+imports it again (every row becomes an update), then streams
+/members/export.csv. Reports rows/second for each, and with --trace-memory
+the peak Python memory (tracemalloc slows everything down several times).
+
+Usage: python benchmarks/bench_csv.py [--rows 100000] [--chunk-size 1000] [--trace-memory]
+"""
+
+import argparse
+import csv
+import io
+import os
+import tempfile
+import time
+import tracemalloc
+
+import common
+
+
+def write_csv(path, rows):
+    from member_csv import CSV_COLUMNS
+
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_COLUMNS)
+        for i in range(1, rows + 1):
+            plan = common.PLANS[i % len(common.PLANS)]
+            email = f'import{i}@example.com' if i % 1000 else 'not-an-email'
+            writer.writerow(['', f'First{i}', f'Last{i}', email, f'+8801{i:09d}', '1990-01-01', 'other',
+                             'Dhaka', plan, common.AMOUNTS[plan], '2026-01-01', '2026-12-31', 'active',
+                             'paid', 'cash', '', '2026-01-01'])
+
+
+def measure(label, rows, run, trace_memory):
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    result = run()
+    elapsed = time.perf_counter() - start
+    line = f'{label:<24} {rows} rows in {elapsed:6.2f}s  {rows / elapsed:9.0f} rows/s'
+    if trace_memory:
+        line += f'  peak {tracemalloc.get_traced_memory()[1] / 1024 / 1024:6.1f} MB'
+        tracemalloc.stop()
+    print(line)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    parser.add_argument('--trace-memory', action='store_true')
+    args = parser.parse_args()
+
+    app, db = common.setup_app()
+    from member_csv import import_members_csv
+
+    path = os.path.join(tempfile.mkdtemp(prefix='gymfit-csv-'), 'members.csv')
+    write_csv(path, args.rows)
+
+    for label in ('import (new rows)', 'import (all updates)'):
+        with app.app_context(), open(path, newline='') as source:
+            rejects = io.StringIO()
+            summary = measure(label, args.rows,
+                              lambda: import_members_csv(source, chunk_size=args.chunk_size, rejects=rejects),
+                              args.trace_memory)
+            print(f'  {summary}')
+            print(f'  rejects file: {len(rejects.getvalue().splitlines()) - 1} rows')
+
+    client = app.test_client()
+    common.login_as_admin(client)
+
+    def export():
+        response = client.get('/members/export.csv', buffered=False)
+        size = sum(len(chunk) for chunk in response.response)
+        response.close()
+        return size
+
+    size = measure('export (streamed)', args.rows, export, args.trace_memory)
+    print(f'  {size / 1024 / 1024:.1f} MB of CSV')
+
+
+if __name__ == '__main__':
+    main()
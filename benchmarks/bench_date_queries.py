@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark date range queries on the members table.
+
+Seeds a large members table and times "expiring between X and Y" and
+"joined this month" queries with the date indexes in place, then again
+after dropping them, to show what the range indexes buy.
+
+Usage: python benchmarks/bench_date_queries.py [--members 200000] [--iterations 50]
+"""
+
+import argparse
+import time
+from datetime import date, timedelta
+
+import common
+
+DATE_INDEXES = ['ix_members_expiry_date', 'ix_members_join_date', 'ix_members_status_expiry_date']
+
+
+def time_query(run, iterations):
+    """Run `run()` `iterations` times, returns (latencies in ms, last result)"""
+    samples = []
+    result = None
+    for _ in range(iterations):
+        start = time.perf_counter()
+        result = run()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--members', type=int, default=200000)
+    parser.add_argument('--iterations', type=int, default=50)
+    args = parser.parse_args()
+
+    app, db = common.setup_app()
+
+    from models import Member
+
+    today = date.today()
+    month_start = today.replace(day=1)
+    queries = [
+        ('expiring in next 7 days', lambda: Member.query.filter(
+            Member.expiry_date >= today,
+            Member.expiry_date <= today + timedelta(days=7)).count()),
+        ('active, expiring in next 7 days', lambda: Member.query.filter(
+            Member.status == 'active',
+            Member.expiry_date >= today,
+            Member.expiry_date <= today + timedelta(days=7)).count()),
+        ('joined this month', lambda: Member.query.filter(
+            Member.join_date >= month_start,
+            Member.join_date <= today).count()),
+    ]
+
+    with app.app_context():
+        start = time.perf_counter()
+        common.seed_members(db, args.members)
+        print(f'Seeded {args.members} members in {time.perf_counter() - start:.1f}s')
+
+        for label in ('with indexes', 'without indexes'):
+            if label == 'without indexes':
+                for name in DATE_INDEXES:
+                    db.session.execute(db.text(f'DROP INDEX IF EXISTS {name}'))
+                db.session.commit()
+            print(f'-- {label}')
+            for name, run in queries:
+                time_query(run, 3)  # warm up
+                samples, rows = time_query(run, args.iterations)
+                common.report(f'{name} ({rows} rows)', samples)
+
+
+if __name__ == '__main__':
+    main()
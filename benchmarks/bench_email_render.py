@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark email rendering.
+
+Compares per-message render time of Flask's render_template against the
+cached template shells in email_templates, for single and batch renders.
+
+Usage: python benchmarks/bench_email_render.py [--messages 5000]
+"""
+
+import argparse
+import time
+
+import common
+
+
+def approval_fields(i):
+    return {
+        'first_name': f'First{i}',
+        'last_name': f'Last{i}',
+        'member_id': f'M{i:06d}',
+        'membership_type': 'Premium Plan',
+        'join_date': '2025-10-15',
+        'expiry_date': '2026-10-15',
+        'amount': 7500,
+        'username': f'member{i}',
+        'password': 'member123',
+        'login_url': 'http://localhost:5000/login',
+        'year': 2025,
+    }
+
+
+def timed(label, fn, messages):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f'{label:<45} {elapsed / messages * 1e6:8.1f} us/message')
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--messages', type=int, default=5000)
+    args = parser.parse_args()
+
+    app, db = common.setup_app()
+    from flask import render_template
+    from email_templates import render_email, render_email_batch
+
+    recipients = [approval_fields(i) for i in range(args.messages)]
+
+    with app.test_request_context():
+        # Sanity check: both paths produce the same document
+        assert render_template('email/approval.html', **recipients[0]) == \
+            render_email('email/approval.html', **recipients[0])
+
+        before = timed('render_template (per message)',
+                       lambda: [render_template('email/approval.html', **r) for r in recipients],
+                       args.messages)
+        after = timed('render_email (per message)',
+                      lambda: [render_email('email/approval.html', **r) for r in recipients],
+                      args.messages)
+        timed('render_email_batch',
+              lambda: render_email_batch('email/approval.html', recipients),
+              args.messages)
+
+    print(f'Speed-up: {before / after:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark the login path.
+
+Times successful logins at the configured bcrypt cost, checks that a stored
+hash with a different cost is upgraded on first login, then fires a burst of
+bad passwords and reports how many are turned away by the rate limiter and
+how long those rejections take.
+
+Usage: python benchmarks/bench_login.py [--rounds 12] [--iterations 20] [--burst 200]
+"""
+
+import argparse
+import time
+
+import common
+
+
+def post_login(client, username, password, remote_addr='10.0.0.1'):
+    start = time.perf_counter()
+    response = client.post('/login', data={'username': username, 'password': password, 'role': 'admin'},
+                           environ_base={'REMOTE_ADDR': remote_addr})
+    return response.status_code, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rounds', type=int, default=12)
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--burst', type=int, default=200)
+    args = parser.parse_args()
+
+    app, db = common.setup_app()
+    app.config['BCRYPT_LOG_ROUNDS'] = args.rounds
+
+    from flask_bcrypt import generate_password_hash
+    from models import User
+    from auth import auth_stats, login_limiter
+
+    with app.app_context():
+        # Stored with an older cost so the first login has to rehash it
+        old_rounds = 10 if args.rounds != 10 else 11
+        db.session.add(User(username='benchadmin', email='benchadmin@example.com', role='admin',
+                            name='Bench Admin',
+                            password_hash=generate_password_hash('secret', old_rounds).decode('utf-8')))
+        db.session.commit()
+
+    client = app.test_client()
+    status, elapsed = post_login(client, 'benchadmin', 'secret')
+    with app.app_context():
+        stored = User.query.filter_by(username='benchadmin').one().password_hash
+    print(f'First login (rehash {old_rounds} -> {args.rounds} rounds): {elapsed:.1f} ms, '
+          f'stored cost now {stored.split("$")[2]}')
+
+    # Successful logins, each from its own address so the limiter stays out of the way
+    app.config['LOGIN_RATE_LIMIT_ENABLED'] = False
+    samples = [post_login(client, 'benchadmin', 'secret', f'10.1.0.{i % 250}')[1]
+               for i in range(args.iterations)]
+    common.report(f'POST /login ok (cost {args.rounds})', samples)
+
+    # A burst of bad passwords for one username from one address
+    app.config['LOGIN_RATE_LIMIT_ENABLED'] = True
+    login_limiter.store.clear()
+    accepted, rejected = [], []
+    start = time.perf_counter()
+    for _ in range(args.burst):
+        status, elapsed = post_login(client, 'benchadmin', 'wrong', '10.2.0.1')
+        (rejected if status == 429 else accepted).append(elapsed)
+    total = time.perf_counter() - start
+
+    print(f'Burst of {args.burst} bad logins: {len(accepted)} checked, {len(rejected)} rejected (429) '
+          f'in {total:.2f}s')
+    if accepted:
+        common.report('  checked (bcrypt ran)', accepted)
+    if rejected:
+        common.report('  rejected by rate limiter', rejected)
+
+    with app.app_context():
+        print('auth stats:', auth_stats())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark the member detail API.
+
+Reports p50/p95 of /api/member/<id> with the detail cache off, from the
+cache, and as a conditional GET answered with 304, and compares fetching
+a page of members one request at a time with one /api/members?ids=...
+batch. Also counts the members queries for repeat detail views.
+
+Usage: python benchmarks/bench_member_details.py [--members 100000] [--iterations 500] [--batch 50]
+"""
+
+import argparse
+import random
+import time
+
+import common
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--members', type=int, default=100000)
+    parser.add_argument('--iterations', type=int, default=500)
+    parser.add_argument('--batch', type=int, default=50)
+    args = parser.parse_args()
+
+    app, db = common.setup_app()
+    from sqlalchemy import event
+
+    with app.app_context():
+        common.seed_members(db, args.members)
+        statements = []
+        event.listen(db.engine, 'before_cursor_execute', lambda *a: statements.append(a[2]))
+    client = app.test_client()
+    common.login_as_admin(client)
+
+    member_ids = [f'M{i:06d}' for i in random.sample(range(1, args.members + 1), args.iterations)]
+
+    def run(label, headers_for=lambda member_id: {}):
+        samples = []
+        for member_id in member_ids:
+            start = time.perf_counter()
+            response = client.get(f'/api/member/{member_id}', headers=headers_for(member_id))
+            samples.append((time.perf_counter() - start) * 1000)
+            assert response.status_code in (200, 304), response.status_code
+        common.report(label, samples)
+
+    app.config['MEMBER_DETAIL_CACHE_TTL'] = 0
+    run('/api/member (no cache)')
+    app.config['MEMBER_DETAIL_CACHE_TTL'] = 300
+    run('/api/member (first view, fills cache)')
+    statements.clear()
+    run('/api/member (repeat view, cached)')
+    print(f'  members queries for {args.iterations} repeat views: {sum("FROM members" in sql for sql in statements)}')
+
+    etags = {member_id: client.get(f'/api/member/{member_id}').headers['ETag'] for member_id in member_ids}
+    run('/api/member (If-None-Match -> 304)', lambda member_id: {'If-None-Match': etags[member_id]})
+
+    app.config['MEMBER_DETAIL_CACHE_TTL'] = 0
+    page = member_ids[:args.batch]
+    start = time.perf_counter()
+    for member_id in page:
+        client.get(f'/api/member/{member_id}')
+    singles = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    response = client.get(f"/api/members?ids={','.join(page)}")
+    batch = (time.perf_counter() - start) * 1000
+    assert len(response.get_json()['members']) == len(page)
+    print(f'{len(page)} members, uncached: {len(page)} requests {singles:8.2f} ms   one batch request {batch:8.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
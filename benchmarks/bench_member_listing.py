@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Benchmark the member listing routes.
+
+Seeds a large members table and pending registrations, and reports p50/p95
+latency for /dashboard, /members (first page and a deep keyset page) and
+/pending-registrations, with the query cache off (QUERY_CACHE_TTL=0) and on.
+
+Usage: python benchmarks/bench_member_listing.py [--members 100000] [--pending 500] [--iterations 50]
+       [--backend memory|fake]
+"""
+
+import argparse
+import time
+
+import common
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--members', type=int, default=100000)
+    parser.add_argument('--pending', type=int, default=500)
+    parser.add_argument('--iterations', type=int, default=50)
+    parser.add_argument('--backend', default='memory', choices=['memory', 'fake'])
+    args = parser.parse_args()
+
+    app, db = common.setup_app()
+    app.config['CACHE_BACKEND'] = args.backend
+
+    with app.app_context():
+        start = time.perf_counter()
+        common.seed_members(db, args.members)
+        common.seed_pending_registrations(db, args.pending)
+        print(f'Seeded {args.members} members and {args.pending} pending registrations '
+              f'in {time.perf_counter() - start:.1f}s')
+
+    client = app.test_client()
+    common.login_as_admin(client)
+
+    # Walk a few pages in to get a realistic deep cursor
+    deep_url = '/members'
+    with app.app_context():
+        from pagination import paginate_members
+        cursor = None
+        for _ in range(20):
+            cursor = paginate_members(cursor=cursor, page_size=app.config['MEMBERS_PAGE_SIZE']).next_cursor
+        deep_url = f'/members?cursor={cursor}'
+
+    routes = [('GET /dashboard', '/dashboard'),
+              ('GET /members (first page)', '/members'),
+              ('GET /members (page 21)', deep_url),
+              ('GET /members?status=expired', '/members?status=expired'),
+              ('GET /pending-registrations', '/pending-registrations')]
+    for ttl, mode in [(0, 'no cache'), (120, f'{args.backend} cache')]:
+        app.config['QUERY_CACHE_TTL'] = ttl
+        for label, url in routes:
+            common.time_requests(client, url, 3)  # warm up
+            common.report(f'{label} ({mode})', common.time_requests(client, url, args.iterations))
+
+    with app.app_context():
+        from cache import cache_stats
+        for name, stats in cache_stats()['caches'].items():
+            print(f"{name}: {stats['hits']} hits, {stats['misses']} misses")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Benchmark the member search API.
+
+Reports p50/p95 latency of /api/members/search at growing table sizes so a
+regression back to full scans shows up as latency growing with the table.
+
+Usage: python benchmarks/bench_member_search.py [--sizes 1000,10000,100000] [--iterations 50]
+"""
+
+import argparse
+
+import common
+
+QUERIES = ['first12', 'last99 first9', 'member4', '+8801000', 'M00012']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='1000,10000,100000')
+    parser.add_argument('--iterations', type=int, default=50)
+    args = parser.parse_args()
+
+    app, db = common.setup_app()
+    client = app.test_client()
+
+    for size in [int(s) for s in args.sizes.split(',')]:
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+            common.seed_members(db, size)
+        common.login_as_admin(client)
+
+        samples = []
+        for term in QUERIES:
+            url = f'/api/members/search?q={term}'
+            common.time_requests(client, url, 2)  # warm up
+            samples.extend(common.time_requests(client, url, args.iterations))
+        common.report(f'search @ {size} members', samples)
+
+
+if __name__ == '__main__':
+    main()
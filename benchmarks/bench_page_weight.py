@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Measure bytes transferred per dashboard load.
+
+Loads /dashboard and the local CSS/JS it references the way a browser
+would: a first visit with an empty cache, then a repeat visit that reuses
+immutable assets and revalidates everything else with If-None-Match.
+Reports bytes on the wire with and without compression.
+
+Run `python3 manage.py assets-build` first to measure the built, pre-compressed
+assets; without a build the originals are served with ?v= fingerprints.
+
+Usage: python benchmarks/bench_page_weight.py [--page /dashboard] [--members 500]
+"""
+
+import argparse
+import re
+
+import common
+
+ASSET_RE = re.compile(r'(?:href|src)="(/static/[^"]+)"')
+
+
+def fetch(client, url, encoding, etag=None):
+    headers = {'Accept-Encoding': encoding}
+    if etag:
+        headers['If-None-Match'] = etag
+    response = client.get(url, headers=headers)
+    data = response.get_data()
+    return response, len(data)
+
+
+def visit(client, page, encoding, cache):
+    """Load the page and its assets, returns (requests made, bytes received, statuses)"""
+    requests_made, received, statuses = 0, 0, {}
+
+    response, size = fetch(client, page, encoding, cache.get(page))
+    requests_made += 1
+    received += size
+    statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+    if response.status_code == 200:
+        cache[page] = response.headers.get('ETag')
+        html = response.get_data()
+        if response.headers.get('Content-Encoding') == 'gzip':
+            import gzip
+            html = gzip.decompress(html)
+        cache[page + ':assets'] = ASSET_RE.findall(html.decode('utf-8'))
+
+    for asset in cache.get(page + ':assets', []):
+        if cache.get(asset) == 'immutable':
+            continue  # served from the browser cache without a request
+        response, size = fetch(client, asset, encoding, cache.get(asset))
+        requests_made += 1
+        received += size
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+        if 'immutable' in response.headers.get('Cache-Control', ''):
+            cache[asset] = 'immutable'
+        elif response.headers.get('ETag'):
+            cache[asset] = response.headers['ETag']
+        response.close()
+
+    return requests_made, received, statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--page', default='/dashboard')
+    parser.add_argument('--members', type=int, default=500)
+    args = parser.parse_args()
+
+    app, db = common.setup_app()
+    with app.app_context():
+        common.seed_members(db, args.members)
+
+    client = app.test_client()
+    common.login_as_admin(client)
+    print(f'Asset manifest entries: {len(app.extensions["asset_manifest"])}')
+
+    for label, encoding in [('uncompressed', 'identity'), ('gzip', 'gzip'), ('brotli+gzip', 'br, gzip')]:
+        cache = {}
+        first = visit(client, args.page, encoding, cache)
+        repeat = visit(client, args.page, encoding, cache)
+        print(f'{label:<14} first visit: {first[0]:2d} requests {first[1]:8d} bytes   '
+              f'repeat visit: {repeat[0]:2d} requests {repeat[1]:8d} bytes  {repeat[2]}')
+
+
+if __name__ == '__main__':
+    main()
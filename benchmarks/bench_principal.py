@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Benchmark the per-request authorization check.
+
+Times a cheap protected JSON route (/api/member/<id>) with the principal
+served from the cache and with PRINCIPAL_CACHE_TTL=0 (one users query per
+request), counts the users queries each way, and checks that a demoted
+admin loses access on the very next request.
+
+Usage: python benchmarks/bench_principal.py [--iterations 2000]
+"""
+
+import argparse
+
+import common
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+
+    app, db = common.setup_app()
+    from sqlalchemy import event
+    from models import User
+
+    with app.app_context():
+        common.seed_members(db, 100)
+        statements = []
+        event.listen(db.engine, 'before_cursor_execute', lambda *a: statements.append(a[2]))
+    client = app.test_client()
+    common.login_as_admin(client)
+    url = '/api/member/M000001'
+
+    for label, ttl in [('cached principal', 60), ('query per request', 0)]:
+        app.config['PRINCIPAL_CACHE_TTL'] = ttl
+        common.time_requests(client, url, 10)  # warm up
+        statements.clear()
+        samples = common.time_requests(client, url, args.iterations)
+        users_queries = sum('FROM users' in sql for sql in statements)
+        common.report(f'{url} ({label})', samples)
+        print(f'  users queries: {users_queries} for {args.iterations} requests')
+
+    app.config['PRINCIPAL_CACHE_TTL'] = 60
+    with app.app_context():
+        User.query.filter_by(username='admin').update({'role': 'member'})
+        db.session.commit()
+    status = client.get('/api/mail-queue/stats').status_code
+    print(f'admin-only route after demotion: HTTP {status}')
+    if status != 401:
+        raise SystemExit('FAIL: demoted user kept admin access')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark payment ingestion and settlement reconciliation.
+
+Records synthetic bKash payments through the ledger API code, records
+them again (every row is a duplicate), then writes a bKash-style
+settlement CSV with injected amount/status mismatches, rows missing from
+the ledger and ledger rows missing from the file, and reconciles it.
+For comparison it also times the per-row approach (one query per
+settlement row) on a sample and extrapolates.
+
+Usage: python benchmarks/bench_reconcile.py [--rows 100000] [--sample 5000]
+"""
+
+import argparse
+import csv
+import io
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import common
+
+
+def make_payments(rows, members):
+    start = datetime(2026, 9, 1)
+    return [{
+        'transaction_id': f'BK{i:010d}',
+        'member_id': f'M{i % members + 1:06d}',
+        'gateway': 'bkash',
+        'amount': common.AMOUNTS[common.PLANS[i % len(common.PLANS)]],
+        'paid_at': (start + timedelta(seconds=i * 25)).isoformat(sep=' '),
+    } for i in range(1, rows + 1)]
+
+
+def write_settlements(path, payments):
+    """bKash merchant export; returns the discrepancies injected"""
+    injected = {'amount_mismatch': 0, 'status_mismatch': 0, 'missing_in_ledger': 0, 'missing_in_settlement': 0}
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Date Time', 'TrxID', 'Transaction Type', 'Amount', 'Status'])
+        for i, payment in enumerate(payments, 1):
+            if i % 500 == 0:
+                injected['missing_in_settlement'] += 1
+                continue
+            amount, status = payment['amount'], 'Completed'
+            if i % 400 == 0:
+                amount += 10
+                injected['amount_mismatch'] += 1
+            elif i % 700 == 0:
+                status = 'Failed'
+                injected['status_mismatch'] += 1
+            writer.writerow([payment['paid_at'], payment['transaction_id'], 'Payment', f'{amount:.2f}', status])
+        for i in range(1, len(payments) // 1000 + 1):
+            writer.writerow([payments[-1]['paid_at'], f'BKX{i:08d}', 'Payment', '2500.00', 'Completed'])
+            injected['missing_in_ledger'] += 1
+    return injected
+
+
+def per_row_baseline(path, sample):
+    """One SELECT per settlement row, as a naive reconciliation would do"""
+    from sqlalchemy import select
+    from models import db, Payment
+
+    with open(path, newline='') as f:
+        reader = csv.DictReader(f)
+        start = time.perf_counter()
+        for count, row in enumerate(reader, 1):
+            db.session.execute(select(Payment.id, Payment.amount, Payment.status)
+                               .where(Payment.transaction_id == row['TrxID'])).first()
+            if count >= sample:
+                break
+        return count, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--members', type=int, default=20000)
+    parser.add_argument('--sample', type=int, default=5000)
+    parser.add_argument('--chunk-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    app, db = common.setup_app()
+    from payments import record_payments, reconcile_settlements
+
+    payments = make_payments(args.rows, args.members)
+    with app.app_context():
+        common.seed_members(db, args.members)
+
+        for label in ('ingest (new)', 'ingest (duplicates)'):
+            start = time.perf_counter()
+            results = record_payments(payments, chunk_size=500)
+            elapsed = time.perf_counter() - start
+            counts = {}
+            for result, _ in results:
+                counts[result] = counts.get(result, 0) + 1
+            print(f'{label:<22} {args.rows} payments in {elapsed:6.2f}s  {args.rows / elapsed:9.0f} rows/s  {counts}')
+
+        path = os.path.join(tempfile.mkdtemp(prefix='gymfit-settle-'), 'bkash.csv')
+        injected = write_settlements(path, payments)
+        print(f'injected: {injected}')
+
+        with open(path, newline='') as source:
+            report = io.StringIO()
+            summary = reconcile_settlements(source, report=report, chunk_size=args.chunk_size)
+        print(f"{'reconcile (hash join)':<22} {summary['settlements']} rows in {summary['seconds']:6.2f}s  "
+              f"{summary['rows_per_second']:9.0f} rows/s")
+        print(f'  {summary}')
+        print(f'  report: {len(report.getvalue().splitlines()) - 1} discrepancies')
+
+        count, elapsed = per_row_baseline(path, args.sample)
+        print(f"{'per-row baseline':<22} {count} rows in {elapsed:6.2f}s  {count / elapsed:9.0f} rows/s  "
+              f"(~{summary['settlements'] * elapsed / count:.1f}s for the whole file)")
+
+
+if __name__ == '__main__':
+    main()
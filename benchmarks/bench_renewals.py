@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark membership renewals and plan lookups.
+
+Renews a batch of members with renew_memberships() (chunked reads, one
+executemany for members and one for payments), then renews the same
+number one request at a time through /api/members/renew. Also reports the
+cost of a plan lookup from the in-process cache against a query per
+lookup, and how many plan queries /register makes once the cache is warm.
+
+Usage: python benchmarks/bench_renewals.py [--members 20000] [--batch 5000]
+"""
+
+import argparse
+import time
+
+import common
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--members', type=int, default=20000)
+    parser.add_argument('--batch', type=int, default=5000)
+    parser.add_argument('--single', type=int, default=500)
+    parser.add_argument('--lookups', type=int, default=100000)
+    args = parser.parse_args()
+
+    app, db = common.setup_app()
+    from sqlalchemy import event
+    from models import Plan
+    from plans import get_plan
+    from renewals import renew_memberships
+
+    with app.app_context():
+        common.seed_members(db, args.members)
+        member_ids = [f'M{i:06d}' for i in range(1, args.members + 1)]
+
+        start = time.perf_counter()
+        results = renew_memberships(member_ids[:args.batch], gateway='cash')
+        db.session.commit()
+        elapsed = time.perf_counter() - start
+        renewed = sum(result['result'] == 'renewed' for result in results)
+        print(f'batch renewal          {renewed} members in {elapsed:6.2f}s  {renewed / elapsed:9.0f} members/s')
+
+    client = app.test_client()
+    common.login_as_admin(client)
+    single = member_ids[args.batch:args.batch + args.single]
+    start = time.perf_counter()
+    for member_id in single:
+        client.post('/api/members/renew', json={'member_id': member_id})
+    elapsed = time.perf_counter() - start
+    print(f'one request per member {len(single)} members in {elapsed:6.2f}s  {len(single) / elapsed:9.0f} members/s')
+
+    with app.app_context():
+        names = [plan for plan in common.PLANS]
+        start = time.perf_counter()
+        for i in range(args.lookups):
+            get_plan(names[i % len(names)])
+        cached = time.perf_counter() - start
+        start = time.perf_counter()
+        for i in range(args.lookups // 100):
+            Plan.query.filter_by(name=names[i % len(names)]).first()
+        queried = (time.perf_counter() - start) * 100
+        print(f'plan lookup            cached {cached / args.lookups * 1e6:6.2f} us   '
+              f'query {queried / args.lookups * 1e6:6.2f} us')
+
+        statements = []
+        event.listen(db.engine, 'before_cursor_execute', lambda *a: statements.append(a[2]))
+    for _ in range(10):
+        client.get('/register')
+    print(f'plan queries for 10 x /register: {sum("FROM plans" in sql for sql in statements)}')
+
+
+if __name__ == '__main__':
+    main()
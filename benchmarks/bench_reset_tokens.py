@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark password reset token lookups and the purge job.
+
+Seeds the token table with hashed tokens (90% already expired or used),
+then reports p50/p95 latency of find_reset_token() for valid and unknown
+tokens and of issuing a token (which drops the user's older ones), purges
+the dead rows in batches and measures lookups again on the smaller table.
+
+Usage: python benchmarks/bench_reset_tokens.py [--rows 1000000] [--lookups 5000]
+"""
+
+import argparse
+import random
+import time
+
+import common
+
+
+def timed(label, samples, run):
+    latencies = []
+    for sample in samples:
+        start = time.perf_counter()
+        run(sample)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p95 = latencies[int(len(latencies) * 0.95)] * 1000
+    print(f'{label:<30} p50 {p50:7.3f} ms   p95 {p95:7.3f} ms')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--users', type=int, default=100000)
+    parser.add_argument('--lookups', type=int, default=5000)
+    parser.add_argument('--batch-size', type=int, default=5000)
+    args = parser.parse_args()
+
+    app, db = common.setup_app()
+    from models import PasswordResetToken
+    from reset_tokens import find_reset_token, issue_reset_token, purge_reset_tokens
+
+    with app.app_context():
+        start = time.perf_counter()
+        valid = common.seed_reset_tokens(db, args.rows, args.users)
+        print(f'Seeded {args.rows} tokens in {time.perf_counter() - start:.1f}s')
+
+        def lookups(label):
+            timed(f'{label}: valid token', random.sample(valid, min(args.lookups, len(valid))), find_reset_token)
+            timed(f'{label}: unknown token', [f'missing-{i}' for i in range(args.lookups)], find_reset_token)
+
+        lookups(f'{args.rows} rows')
+
+        def issue(user_id):
+            issue_reset_token(user_id)
+            db.session.commit()
+        timed(f'{args.rows} rows: issue token', random.sample(range(1, args.users + 1), 1000), issue)
+
+        result = purge_reset_tokens(args.batch_size)
+        print(f"Purged {result['deleted']} tokens in {result['seconds']:.1f}s "
+              f"({result['rows_per_second']:.0f} rows/s), {PasswordResetToken.query.count()} left")
+
+        valid = [token for token in valid if find_reset_token(token) is not None]
+        lookups('after purge')
+
+
+if __name__ == '__main__':
+    main()
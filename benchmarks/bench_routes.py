@@ -0,0 +1,90 @@
+"""
+pytest-benchmark scenarios for the main routes, through the Flask test client.
+
+Seeds users, members, pending registrations and reset tokens once (sizes set
+with --bench-members etc., see conftest.py) and times one request per round.
+Needs `pip install pytest pytest-benchmark`.
+
+Usage:
+    python -m pytest benchmarks/bench_routes.py --benchmark-json=benchmarks/results.json
+    python benchmarks/compare_baseline.py benchmarks/baseline.json benchmarks/results.json --threshold 20
+"""
+
+import random
+
+import common
+
+
+def _expect(response, status):
+    assert response.status_code == status, f'{response.request.path} returned {response.status_code}'
+    return response
+
+
+def test_login(benchmark, client, dataset):
+    users = dataset['users']
+
+    def login():
+        username = f'user{random.randint(1, users)}'
+        return client.post('/login', data={'username': username, 'password': 'secret', 'role': 'member'})
+
+    response = benchmark(login)
+    assert response.headers['Location'].endswith('/dashboard')
+
+
+def test_register(benchmark, client, next_number):
+    def register():
+        number = next_number()
+        return client.post('/register', data={
+            'firstName': 'Bench', 'lastName': f'Applicant{number}', 'email': f'bench{number}@example.com',
+            'phone': f'+8801{number:09d}', 'dob': '1995-01-01', 'gender': 'other',
+            'address': 'Dhaka', 'membership': 'basic',
+        })
+
+    response = benchmark(register)
+    assert response.headers['Location'].endswith('/register-success')
+
+
+def test_dashboard(benchmark, admin_client):
+    benchmark(lambda: _expect(admin_client.get('/dashboard'), 200))
+
+
+def test_members(benchmark, admin_client):
+    benchmark(lambda: _expect(admin_client.get('/members'), 200))
+
+
+def test_pending_registrations(benchmark, admin_client):
+    benchmark(lambda: _expect(admin_client.get('/pending-registrations'), 200))
+
+
+def test_approve(benchmark, bench_app, admin_client, next_number):
+    from models import db, PendingRegistration
+
+    def setup():
+        number = next_number()
+        with bench_app.app_context():
+            common.seed_pending_registrations(db, 1, start=number)
+        return (f'REG{number:06d}',), {}
+
+    def approve(reg_id):
+        _expect(admin_client.get(f'/approve-registration/{reg_id}'), 302)
+        return reg_id
+
+    # Each round approves a fresh registration, so rounds are set explicitly
+    reg_id = benchmark.pedantic(approve, setup=setup, rounds=20)
+    with bench_app.app_context():
+        assert PendingRegistration.query.filter_by(registration_id=reg_id).one().status == 'approved'
+
+
+def test_search(benchmark, admin_client, dataset):
+    members = dataset['members']
+
+    def search():
+        response = _expect(admin_client.get(f'/api/members/search?q=Last{random.randint(1, members)}'), 200)
+        return response.get_json()
+
+    assert benchmark(search)['results']
+
+
+def test_reset_password_page(benchmark, client, dataset):
+    tokens = dataset['valid_tokens']
+    benchmark(lambda: _expect(client.get(f'/reset-password/{random.choice(tokens)}'), 200))
@@ -0,0 +1,64 @@
+"""
+Cold-start import budgets for the web worker and the CLI, from `python -X importtime`.
+
+Each round imports the entry point in a fresh interpreter and sums the
+cumulative import time of the top-level modules. The web worker is wsgi.py
+(what gunicorn loads), the CLI is manage.py (batch jobs and maintenance
+commands). Runs with the route benchmarks, so the timings land in the same
+JSON report and are checked by compare_baseline.py; the budgets catch a
+large regression without a baseline.
+
+Usage:
+    python -m pytest benchmarks/bench_startup.py [--web-import-budget-ms 1000] [--cli-import-budget-ms 900]
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from common import BASE_DIR
+
+# Heavy packages only some processes need, and the entry point allowed to load each at import
+LAZY_MODULES = {
+    'flask_mail': (),  # loaded on first send
+    'flask_migrate': (),  # flask db / init_db.py only
+    'flask_wtf': ('wsgi',),
+    'app': ('wsgi',),
+}
+
+
+def import_profile(module):
+    """(total milliseconds, set of module names) for importing `module` in a fresh interpreter"""
+    env = dict(os.environ)
+    env.pop('FLASK_RUN_FROM_CLI', None)
+    env.setdefault('DATABASE_URI', 'sqlite://')
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=BASE_DIR, env=env, capture_output=True, text=True, check=True)
+
+    total_us = 0
+    modules = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        modules.add(name.strip())
+        # Nested imports are indented under their parent and already counted in its cumulative time
+        if not name.startswith('  '):
+            total_us += int(cumulative)
+    return total_us / 1000, modules
+
+
+@pytest.mark.parametrize('entry_point, budget_option', [
+    ('wsgi', '--web-import-budget-ms'),
+    ('manage', '--cli-import-budget-ms'),
+])
+def test_import_budget(benchmark, request, entry_point, budget_option):
+    total_ms, modules = benchmark.pedantic(import_profile, args=(entry_point,), rounds=5)
+
+    for module, allowed in LAZY_MODULES.items():
+        assert module not in modules or entry_point in allowed, f'import {entry_point} loaded {module}'
+
+    budget = request.config.getoption(budget_option)
+    assert total_ms <= budget, f'import {entry_point} took {total_ms:.0f} ms (budget {budget} ms)'
@@ -0,0 +1,231 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Each benchmark runs against a throw-away SQLite database so it never touches
+instance/gymfit.db. Import this module before importing the app.
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+# Point the app at a temporary database before config.py is imported
+_db_dir = tempfile.mkdtemp(prefix='gymfit-bench-')
+os.environ.setdefault('DATABASE_URI', 'sqlite:///' + os.path.join(_db_dir, 'bench.db'))
+
+PLANS = ['Basic Plan', 'Standard Plan', 'Premium Plan']
+AMOUNTS = {'Basic Plan': 2500, 'Standard Plan': 4500, 'Premium Plan': 7500}
+STATUSES = ['active', 'active', 'active', 'expired', 'inactive']
+
+
+def setup_app():
+    """Import the app, create the schema and return (app, db)"""
+    from app import app
+    from models import db
+
+    app.config['WTF_CSRF_ENABLED'] = False
+    app.config['MAIL_SUPPRESS_SEND'] = True
+    app.config['MAIL_QUEUE_INLINE_WORKER'] = False
+    app.config['TESTING'] = True
+
+    with app.app_context():
+        from plans import seed_default_plans
+        db.create_all()
+        seed_default_plans()
+        db.session.commit()
+    return app, db
+
+
+def seed_members(db, count, chunk_size=5000):
+    """Bulk insert `count` synthetic members with executemany"""
+    from models import Member
+    from search import rebuild_search_index
+
+    now = datetime.utcnow()
+    rows = []
+    for i in range(1, count + 1):
+        plan = PLANS[i % len(PLANS)]
+        joined = now - timedelta(days=i % 720, seconds=i)
+        rows.append({
+            'member_id': f'M{i:06d}',
+            'first_name': f'First{i}',
+            'last_name': f'Last{i}',
+            'email': f'member{i}@example.com',
+            'phone': f'+8801{i:09d}',
+            'membership_type': plan,
+            'amount': AMOUNTS[plan],
+            'join_date': joined.date(),
+            'expiry_date': (joined + timedelta(days=30)).date(),
+            'status': STATUSES[i % len(STATUSES)],
+            'payment_status': 'paid',
+            'payment_date': joined.date(),
+            'created_at': joined,
+            'updated_at': joined,
+        })
+        if len(rows) >= chunk_size:
+            db.session.execute(Member.__table__.insert(), rows)
+            rows = []
+    if rows:
+        db.session.execute(Member.__table__.insert(), rows)
+    db.session.commit()
+
+    # Core inserts bypass the ORM events that maintain the search index
+    rebuild_search_index()
+
+
+def seed_pending_registrations(db, count, start=1, chunk_size=5000):
+    """Bulk insert `count` synthetic pending registrations"""
+    from models import PendingRegistration
+
+    today = datetime.utcnow().date()
+    rows = []
+    for i in range(start, start + count):
+        rows.append({
+            'registration_id': f'REG{i:06d}',
+            'first_name': f'Applicant{i}',
+            'last_name': f'Surname{i}',
+            'email': f'applicant{i}@example.com',
+            'phone': f'+8801{i:09d}',
+            'dob': '1995-01-01',
+            'gender': 'other',
+            'membership_type': ['basic', 'standard', 'premium'][i % 3],
+            'registration_date': today,
+            'status': 'pending',
+        })
+        if len(rows) >= chunk_size:
+            db.session.execute(PendingRegistration.__table__.insert(), rows)
+            rows = []
+    if rows:
+        db.session.execute(PendingRegistration.__table__.insert(), rows)
+    db.session.commit()
+
+
+def seed_users(db, count, password='secret', rounds=None, chunk_size=5000):
+    """Bulk insert `count` member users (user1..userN) who all log in with `password`.
+
+    The password is hashed once, at `rounds` (default BCRYPT_LOG_ROUNDS) so
+    logins don't trigger a rehash, and the hash is shared by every row.
+    """
+    from flask import current_app
+    from flask_bcrypt import generate_password_hash
+    from models import User
+
+    rounds = rounds or current_app.config['BCRYPT_LOG_ROUNDS']
+    password_hash = generate_password_hash(password, rounds).decode('utf-8')
+    now = datetime.utcnow()
+    rows = []
+    for i in range(1, count + 1):
+        rows.append({
+            'username': f'user{i}',
+            'email': f'user{i}@example.com',
+            'password_hash': password_hash,
+            'role': 'member',
+            'name': f'User {i}',
+            'created_at': now,
+        })
+        if len(rows) >= chunk_size:
+            db.session.execute(User.__table__.insert(), rows)
+            rows = []
+    if rows:
+        db.session.execute(User.__table__.insert(), rows)
+    db.session.commit()
+
+
+def seed_reset_tokens(db, rows, users, chunk_size=20000):
+    """Bulk insert `rows` tokens for user IDs 1..`users`, returns the raw tokens still valid.
+
+    One in ten tokens is live; the rest are expired, and a third of those used.
+    """
+    from models import PasswordResetToken
+    from reset_tokens import hash_token
+
+    now = datetime.utcnow()
+    valid = []
+    batch = []
+    for i in range(1, rows + 1):
+        token = f'bench-token-{i}'
+        live = i % 10 == 0
+        batch.append({
+            'user_id': i % users + 1,
+            'token_hash': hash_token(token),
+            'expires_at': now + timedelta(hours=1) if live else now - timedelta(hours=i % 720 + 1),
+            'used': not live and i % 3 == 0,
+            'created_at': now,
+        })
+        if live:
+            valid.append(token)
+        if len(batch) >= chunk_size:
+            db.session.execute(PasswordResetToken.__table__.insert(), batch)
+            batch = []
+    if batch:
+        db.session.execute(PasswordResetToken.__table__.insert(), batch)
+    db.session.commit()
+    return valid
+
+
+def seed_dataset(db, users=0, members=0, pending=0, tokens=0):
+    """Seed users, members, pending registrations and reset tokens in one go.
+
+    Returns a dict of the row counts and the raw reset tokens still valid.
+    """
+    if users:
+        seed_users(db, users)
+    if members:
+        seed_members(db, members)
+    if pending:
+        seed_pending_registrations(db, pending)
+    valid_tokens = seed_reset_tokens(db, tokens, max(users, 1)) if tokens else []
+    return {'users': users, 'members': members, 'pending': pending, 'tokens': tokens,
+            'valid_tokens': valid_tokens}
+
+
+def login_as_admin(client):
+    """Create the admin user if needed and put it straight into the test client's session"""
+    from models import db, User
+
+    with client.application.app_context():
+        admin = User.query.filter_by(username='admin').first()
+        if admin is None:
+            admin = User(username='admin', email='admin@example.com', password_hash='!',
+                         role='admin', name='Admin User')
+            db.session.add(admin)
+            db.session.commit()
+        user_id = admin.id
+
+    with client.session_transaction() as sess:
+        sess['username'] = 'admin'
+        sess['role'] = 'admin'
+        sess['name'] = 'Admin User'
+        sess['user_id'] = user_id
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of samples"""
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def time_requests(client, url, iterations):
+    """Issue `iterations` GET requests and return latencies in milliseconds"""
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        response = client.get(url)
+        samples.append((time.perf_counter() - start) * 1000)
+        assert response.status_code == 200, f'{url} returned {response.status_code}'
+    return samples
+
+
+def report(label, samples):
+    """Print p50/p95 for a set of latency samples"""
+    print(f'{label:<40} p50={percentile(samples, 50):8.2f} ms  '
+          f'p95={percentile(samples, 95):8.2f} ms  n={len(samples)}')
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Compare a pytest-benchmark JSON report against a saved baseline.
+
+Prints each benchmark's median in both reports and the change, and exits
+with status 1 if any benchmark got slower by more than --threshold percent
+(or is missing from the current report), so it can gate CI.
+
+Usage: python benchmarks/compare_baseline.py baseline.json current.json [--threshold 20] [--stat median]
+"""
+
+import argparse
+import json
+import sys
+
+
+def load_stats(path, stat):
+    """Benchmark name -> the chosen statistic (seconds) from a pytest-benchmark JSON report"""
+    with open(path) as f:
+        report = json.load(f)
+    return {bench['name']: bench['stats'][stat] for bench in report['benchmarks']}
+
+
+def compare(baseline, current, threshold):
+    """Rows of (name, baseline, current, change %, failed) for every baseline benchmark"""
+    rows = []
+    for name, before in sorted(baseline.items()):
+        after = current.get(name)
+        if after is None:
+            rows.append((name, before, None, None, True))
+            continue
+        change = (after - before) / before * 100 if before else 0.0
+        rows.append((name, before, after, change, change > threshold))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('baseline')
+    parser.add_argument('current')
+    parser.add_argument('--threshold', type=float, default=20.0, help='Allowed slow-down in percent')
+    parser.add_argument('--stat', default='median', choices=['min', 'median', 'mean', 'max'])
+    args = parser.parse_args()
+
+    rows = compare(load_stats(args.baseline, args.stat), load_stats(args.current, args.stat), args.threshold)
+    for name, before, after, change, failed in rows:
+        if after is None:
+            print(f'{name:<32} {before * 1000:9.2f} ms  {"missing":>12}  FAIL')
+            continue
+        print(f'{name:<32} {before * 1000:9.2f} ms  {after * 1000:9.2f} ms  {change:+7.1f}%'
+              f'{"  FAIL" if failed else ""}')
+
+    failures = sum(failed for *_, failed in rows)
+    if failures:
+        print(f'{failures} benchmark(s) regressed by more than {args.threshold:g}% ({args.stat})')
+        sys.exit(1)
+    print(f'No regressions above {args.threshold:g}% ({args.stat})')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+pytest options and fixtures for bench_routes.py and bench_startup.py.
+
+The app runs against a throw-away SQLite database (see common.py) with mail
+delivery suppressed and the mail worker off, seeded once per session.
+"""
+
+import itertools
+
+import pytest
+
+import common
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('gymfit', 'GymFit benchmark data set')
+    group.addoption('--bench-users', type=int, default=10000, help='Synthetic login users')
+    group.addoption('--bench-members', type=int, default=50000, help='Synthetic members')
+    group.addoption('--bench-pending', type=int, default=1000, help='Synthetic pending registrations')
+    group.addoption('--bench-tokens', type=int, default=100000, help='Synthetic password reset tokens')
+    group.addoption('--bench-bcrypt-rounds', type=int, default=None,
+                    help='bcrypt cost for seeded users and logins (default BCRYPT_LOG_ROUNDS)')
+    group.addoption('--web-import-budget-ms', type=float, default=1000, help='Import budget for wsgi.py (ms)')
+    group.addoption('--cli-import-budget-ms', type=float, default=900, help='Import budget for manage.py (ms)')
+
+
+@pytest.fixture(scope='session')
+def bench_app(request):
+    app, db = common.setup_app()
+    option = request.config.getoption
+    if option('--bench-bcrypt-rounds'):
+        app.config['BCRYPT_LOG_ROUNDS'] = option('--bench-bcrypt-rounds')
+    # Every login comes from the same test client address
+    app.config['LOGIN_RATE_LIMIT_ENABLED'] = False
+
+    with app.app_context():
+        dataset = common.seed_dataset(db, users=option('--bench-users'), members=option('--bench-members'),
+                                      pending=option('--bench-pending'), tokens=option('--bench-tokens'))
+    app.config['BENCH_DATASET'] = dataset
+    return app
+
+
+@pytest.fixture(scope='session')
+def dataset(bench_app):
+    return bench_app.config['BENCH_DATASET']
+
+
+@pytest.fixture
+def client(bench_app):
+    return bench_app.test_client()
+
+
+@pytest.fixture
+def admin_client(client):
+    common.login_as_admin(client)
+    return client
+
+
+# Registration numbers above the seeded ones, shared by the register and approve benchmarks
+_next_number = itertools.count(10 ** 6)
+
+
+@pytest.fixture(scope='session')
+def next_number():
+    return lambda: next(_next_number)
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Load test a running GymFit server over HTTP.
+
+Each client thread logs in as the admin, then loops over a weighted mix of
+dashboard, member list and registration requests until the time is up.
+Reports requests per second, latency percentiles and errors per route,
+including any "database is locked" failures (HTTP 500).
+
+Start the server first, with mail delivery left to a separate worker, e.g.
+
+    MAIL_QUEUE_INLINE_WORKER=False gunicorn -w 4 -b 127.0.0.1:8000 wsgi:app
+
+Usage: python benchmarks/load_test.py [--url http://127.0.0.1:8000] [--threads 16] [--duration 30]
+"""
+
+import argparse
+import http.cookiejar
+import itertools
+import random
+import re
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+
+from common import percentile
+
+CSRF_RE = re.compile(r'name="csrf_token" value="([^"]+)"')
+
+# (route label, weight)
+MIX = [('GET /dashboard', 5), ('GET /members', 3), ('POST /register', 2)]
+
+_registration_numbers = itertools.count(1)
+
+
+class Client:
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+
+    def request(self, path, data=None):
+        """Returns (status, body)"""
+        body = urllib.parse.urlencode(data).encode() if data is not None else None
+        try:
+            with self.opener.open(self.base_url + path, data=body, timeout=30) as response:
+                return response.status, response.read().decode('utf-8', 'replace')
+        except urllib.error.HTTPError as e:
+            return e.code, e.read().decode('utf-8', 'replace')
+
+    def csrf_token(self, path):
+        status, body = self.request(path)
+        match = CSRF_RE.search(body)
+        return match.group(1) if match else ''
+
+    def login(self, username, password):
+        token = self.csrf_token('/login')
+        status, body = self.request('/login', {'csrf_token': token, 'username': username,
+                                               'password': password, 'role': 'admin'})
+        return status == 200 and 'Invalid' not in body and 'Too many' not in body
+
+    def register(self, run_id):
+        number = next(_registration_numbers)
+        token = self.csrf_token('/register')
+        return self.request('/register', {
+            'csrf_token': token,
+            'firstName': 'Load',
+            'lastName': f'Test{number}',
+            'email': f'load-{run_id}-{number}@example.com',
+            'phone': f'+8801{number:09d}',
+            'dob': '1995-05-05',
+            'gender': 'other',
+            'address': 'Load test',
+            'membership': random.choice(['basic', 'standard', 'premium']),
+            'terms': 'on'
+        })
+
+
+def worker(args, run_id, deadline, results, lock):
+    client = Client(args.url)
+    if not client.login(args.username, args.password):
+        with lock:
+            results['login failed']['errors'] += 1
+        return
+
+    routes = [label for label, weight in MIX for _ in range(weight)]
+    while time.monotonic() < deadline:
+        label = random.choice(routes)
+        start = time.perf_counter()
+        if label == 'POST /register':
+            status, _ = client.register(run_id)
+        elif label == 'GET /dashboard':
+            status, _ = client.request('/dashboard')
+        else:
+            status, _ = client.request('/members')
+        elapsed = (time.perf_counter() - start) * 1000
+
+        with lock:
+            results[label]['samples'].append(elapsed)
+            if status >= 400:
+                results[label]['errors'] += 1
+                results[label]['statuses'][status] += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--duration', type=float, default=30)
+    parser.add_argument('--username', default='rakib')
+    parser.add_argument('--password', default='admin123')
+    args = parser.parse_args()
+
+    run_id = int(time.time())
+    results = defaultdict(lambda: {'samples': [], 'errors': 0, 'statuses': defaultdict(int)})
+    lock = threading.Lock()
+    deadline = time.monotonic() + args.duration
+
+    threads = [threading.Thread(target=worker, args=(args, run_id, deadline, results, lock))
+               for _ in range(args.threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    total = sum(len(result['samples']) for result in results.values())
+    errors = sum(result['errors'] for result in results.values())
+    print(f'{args.threads} threads, {elapsed:.1f}s: {total} requests, '
+          f'{total / elapsed:.1f} req/s, {errors} errors')
+    for label, result in sorted(results.items()):
+        samples = result['samples']
+        statuses = ', '.join(f'{code}x{count}' for code, count in sorted(result['statuses'].items()))
+        print(f'{label:<20} n={len(samples):<6} {len(samples) / elapsed:7.1f} req/s  '
+              f'p50={percentile(samples, 50):8.2f} ms  p95={percentile(samples, 95):8.2f} ms  '
+              f'errors={result["errors"]}' + (f' ({statuses})' if statuses else ''))
+
+
+if __name__ == '__main__':
+    main()
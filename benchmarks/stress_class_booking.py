@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Concurrency check for class bookings and timing of the weekly schedule.
+
+Schedules a class with a few places, then has many threads book it at
+once (each member twice, to exercise double-booking), cancel some of
+the bookings and rebook, and verifies the class never went over capacity,
+booked_count matches the booking rows and no member holds two bookings.
+Then reports the weekly schedule latency with and without the cache.
+
+Usage: python benchmarks/stress_class_booking.py [--threads 16] [--members 400] [--capacity 20]
+"""
+
+import argparse
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+import common
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--members', type=int, default=400)
+    parser.add_argument('--capacity', type=int, default=20)
+    parser.add_argument('--classes', type=int, default=300)
+    parser.add_argument('--views', type=int, default=500)
+    args = parser.parse_args()
+
+    app, db = common.setup_app()
+    from models import Booking, ClassSession, Trainer
+    from scheduling import book_class, cancel_booking, create_class_sessions, weekly_schedule
+
+    week_start = date.today() - timedelta(days=date.today().weekday())
+    with app.app_context():
+        common.seed_members(db, args.members)
+        db.session.add(Trainer(name='Bench Trainer', email='trainer@example.com', status='active'))
+        db.session.flush()
+        trainer_id = Trainer.query.first().id
+        start_of_week = datetime.combine(week_start, datetime.min.time())
+        create_class_sessions([{
+            'title': f'Class {i}',
+            'trainer_id': trainer_id,
+            'starts_at': (start_of_week + timedelta(days=i % 7, hours=6 + i % 14)).isoformat(),
+            'capacity': 30,
+        } for i in range(args.classes)])
+        create_class_sessions([{
+            'title': 'Stress class',
+            'starts_at': (datetime.now() + timedelta(days=1)).isoformat(),
+            'capacity': args.capacity,
+        }])
+        db.session.commit()
+        session_id = db.session.query(db.func.max(ClassSession.id)).scalar()
+
+    results = {}
+    lock = threading.Lock()
+    barrier = threading.Barrier(args.threads)
+
+    def count(result):
+        with lock:
+            results[result] = results.get(result, 0) + 1
+
+    def worker(offset):
+        barrier.wait()
+        for member_pk in range(offset + 1, args.members + 1, args.threads):
+            with app.app_context():
+                for _ in range(2):
+                    count(book_class(session_id, member_pk))
+                if member_pk % 5 == 0:
+                    count(cancel_booking(session_id, member_pk))
+                    count(book_class(session_id, member_pk))
+                db.session.remove()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    print(f'{args.threads} threads, {args.members} members booking {args.capacity} places in {elapsed:.2f}s')
+    print(f'  results: {results}')
+
+    failed = False
+    with app.app_context():
+        booked_count, capacity = db.session.query(ClassSession.booked_count, ClassSession.capacity) \
+            .filter(ClassSession.id == session_id).one()
+        booked = [member_pk for (member_pk,) in db.session.query(Booking.member_pk)
+                  .filter(Booking.session_id == session_id, Booking.status == 'booked')]
+        rows = db.session.query(Booking.member_pk).filter(Booking.session_id == session_id).count()
+        distinct = db.session.query(Booking.member_pk).filter(Booking.session_id == session_id).distinct().count()
+    print(f'  booked_count {booked_count}, capacity {capacity}, booked rows {len(booked)}')
+    if booked_count > capacity:
+        failed = True
+        print(f'FAIL: class overfilled ({booked_count} > {capacity})')
+    if booked_count != len(booked):
+        failed = True
+        print(f'FAIL: booked_count {booked_count} != {len(booked)} booking rows')
+    if rows != distinct:
+        failed = True
+        print(f'FAIL: {rows - distinct} duplicate bookings')
+    if booked_count != min(capacity, args.members):
+        failed = True
+        print(f'FAIL: expected {min(capacity, args.members)} places taken, got {booked_count}')
+
+    def time_views(label):
+        start = time.perf_counter()
+        for _ in range(args.views):
+            weekly_schedule(week_start)
+        elapsed = time.perf_counter() - start
+        print(f'{label:<28} {elapsed / args.views * 1000:7.3f} ms per call')
+
+    with app.app_context():
+        classes = sum(len(day['sessions']) for day in weekly_schedule(week_start)['days'])
+        print(f'weekly schedule ({classes} classes)')
+        time_views('  cached layout')
+        app.config['SCHEDULE_CACHE_TTL'] = 0
+        time_views('  built per call')
+
+    if failed:
+        raise SystemExit(1)
+    print('OK: no overbooking or double booking')
+
+
+if __name__ == '__main__':
+    main()
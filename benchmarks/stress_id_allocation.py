@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Concurrency check for member and registration ID allocation.
+
+Fires parallel POST /register requests from many threads and allocates
+member IDs from many threads at once, then verifies that every request
+succeeded and no ID was issued twice.
+
+Usage: python benchmarks/stress_id_allocation.py [--threads 16] [--per-thread 25]
+"""
+
+import argparse
+import threading
+import time
+
+import common
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--per-thread', type=int, default=25)
+    parser.add_argument('--block-size', type=int, default=1)
+    args = parser.parse_args()
+
+    app, db = common.setup_app()
+    app.config['ID_BLOCK_SIZE'] = args.block_size
+
+    from models import PendingRegistration
+    from sequences import allocate_ids
+
+    errors = []
+    member_ids = []
+    ids_lock = threading.Lock()
+    barrier = threading.Barrier(args.threads)
+
+    def register(worker):
+        client = app.test_client()
+        barrier.wait()
+        for i in range(args.per_thread):
+            response = client.post('/register', data={
+                'firstName': f'Worker{worker}',
+                'lastName': f'Request{i}',
+                'email': f'w{worker}-r{i}@example.com',
+                'phone': '+8801700000000',
+                'dob': '1990-01-01',
+                'gender': 'other',
+                'address': '',
+                'membership': 'basic',
+            })
+            if response.status_code != 302:
+                errors.append(f'register w{worker}-r{i}: HTTP {response.status_code}')
+
+    def allocate(worker):
+        barrier.wait()
+        for _ in range(args.per_thread):
+            with app.app_context():
+                ids = allocate_ids('member', 3)
+            with ids_lock:
+                member_ids.extend(ids)
+
+    for label, target in [('parallel registrations', register), ('parallel member ID blocks', allocate)]:
+        threads = [threading.Thread(target=target, args=(w,)) for w in range(args.threads)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        print(f'{label:<28} {args.threads} threads x {args.per_thread} in {elapsed:.2f}s')
+
+    expected = args.threads * args.per_thread
+    with app.app_context():
+        registration_ids = [row.registration_id for row in PendingRegistration.query.all()]
+
+    failed = False
+    if errors:
+        failed = True
+        print(f'FAIL: {len(errors)} failed requests, first: {errors[0]}')
+    if len(registration_ids) != expected or len(set(registration_ids)) != expected:
+        failed = True
+        print(f'FAIL: expected {expected} unique registrations, got {len(set(registration_ids))}')
+    if len(set(member_ids)) != len(member_ids):
+        failed = True
+        print(f'FAIL: {len(member_ids) - len(set(member_ids))} duplicate member IDs')
+
+    if failed:
+        raise SystemExit(1)
+    print(f'OK: {expected} unique registration IDs, {len(member_ids)} unique member IDs')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,307 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+try:
+    import redis
+except ImportError:  # CACHE_BACKEND=redis falls back to the in-process backend without it
+    redis = None
+
+
+class TTLCache:
+    """Thread-safe in-process cache with per-entry expiry and LRU eviction"""
+
+    def __init__(self, ttl=60, maxsize=1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_set(self, key, loader, ttl=None):
+        """Return the cached value for key, calling loader() to fill it on a miss"""
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = loader()
+            self.set(key, value, ttl)
+        return value
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+# Model class -> callbacks to run after a commit that wrote to that model's table
+_commit_callbacks = {}
+
+
+def invalidate_on_commit(model, callback):
+    """Call callback() after any commit that inserted, updated or deleted `model` rows.
+
+    Catches unit-of-work changes (session.add/delete, attribute edits) as well
+    as bulk statements such as session.execute(insert(Model), rows) and
+    Query.update(), which bypass per-object mapper events.
+    """
+    _commit_callbacks.setdefault(model.__table__.name, []).append(callback)
+
+
+def _mark_changed(session, table_name):
+    if table_name in _commit_callbacks:
+        session.info.setdefault('changed_tables', set()).add(table_name)
+
+
+@event.listens_for(Session, 'after_flush')
+def _track_flushed_changes(session, flush_context):
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        table = getattr(obj, '__table__', None)
+        if table is not None:
+            _mark_changed(session, table.name)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _track_bulk_statements(orm_execute_state):
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    table = getattr(orm_execute_state.statement, 'table', None)
+    if table is not None:
+        _mark_changed(orm_execute_state.session, table.name)
+
+
+@event.listens_for(Session, 'after_commit')
+def _run_commit_callbacks(session):
+    for table_name in session.info.pop('changed_tables', ()):
+        for callback in _commit_callbacks.get(table_name, ()):
+            callback()
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_tracked_changes(session):
+    session.info.pop('changed_tables', None)
+
+
+class MemoryBackend:
+    """Query cache backend holding results in this process (a TTLCache of Python objects)"""
+
+    name = 'memory'
+
+    def __init__(self, maxsize=2048):
+        self._entries = TTLCache(maxsize=maxsize)
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        return self._entries.get(key)
+
+    def set(self, key, value, ttl):
+        self._entries.set(key, value, ttl)
+
+    def generation(self, namespace):
+        return self._generations.get(namespace, 0)
+
+    def bump(self, namespace):
+        with self._lock:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+
+
+class ExternalBackend:
+    """Query cache backend on a shared key-value store, so every worker sees the same entries.
+
+    `client` needs get(key), set(key, value, ex=seconds) and incr(key), the
+    subset of redis.Redis used here. Values are pickled. Invalidation bumps a
+    generation counter in the store, which reaches all processes at once.
+    """
+
+    name = 'external'
+
+    def __init__(self, client, prefix='gymfit:cache:'):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key):
+        data = self.client.get(self.prefix + key)
+        return pickle.loads(data) if data is not None else None
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, pickle.dumps(value), ex=max(1, int(ttl)))
+
+    def generation(self, namespace):
+        value = self.client.get(f'{self.prefix}generation:{namespace}')
+        return int(value) if value is not None else 0
+
+    def bump(self, namespace):
+        self.client.incr(f'{self.prefix}generation:{namespace}')
+
+
+class FakeExternalClient:
+    """In-memory stand-in for a Redis client (get/set with expiry/incr), for tests and benchmarks"""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key, value, ex=None):
+        if not isinstance(value, bytes):
+            value = str(value).encode()
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + ex if ex else None)
+
+    def incr(self, key):
+        with self._lock:
+            value = int(self._data.get(key, (b'0', None))[0]) + 1
+            self._data[key] = (str(value).encode(), None)
+            return value
+
+
+def create_cache_backend(config):
+    """Query cache backend named by CACHE_BACKEND: 'memory' (default), 'redis' or 'fake'"""
+    kind = (config.get('CACHE_BACKEND') or 'memory').lower()
+    if kind == 'fake':
+        return ExternalBackend(FakeExternalClient())
+    if kind == 'redis':
+        if redis is None:
+            print("CACHE_BACKEND=redis but the redis package is not installed, using the in-process cache")
+        else:
+            return ExternalBackend(redis.Redis.from_url(config['CACHE_REDIS_URL']))
+    return MemoryBackend(config.get('QUERY_CACHE_MAXSIZE') or 2048)
+
+
+def cache_backend():
+    """The current app's query cache backend, created from its config on first use"""
+    backend = current_app.extensions.get('query_cache_backend')
+    if backend is None:
+        backend = current_app.extensions['query_cache_backend'] = create_cache_backend(current_app.config)
+    return backend
+
+
+# Every QueryCache, for cache_stats() and cache_metrics()
+_query_caches = []
+
+
+class QueryCache:
+    """Read-through cache for one family of query results, with hit/miss counters.
+
+    Results live in the app's cache backend under this cache's name and the
+    current generation. A commit that writes to any of `models` bumps the
+    generation, so every entry is dropped together. A result loaded while
+    that commit was in flight is stored under the old generation and never
+    served. Backend errors are counted and fall through to the query.
+    """
+
+    def __init__(self, name, models=()):
+        self.name = name
+        self._counts = {'hits': 0, 'misses': 0, 'errors': 0}
+        self._lock = threading.Lock()
+        _query_caches.append(self)
+        for model in models:
+            invalidate_on_commit(model, self.invalidate)
+
+    def _count(self, name):
+        with self._lock:
+            self._counts[name] += 1
+
+    def get_or_load(self, key, loader, ttl=None):
+        """Cached result for key, calling loader() to run the query on a miss"""
+        ttl = current_app.config['QUERY_CACHE_TTL'] if ttl is None else ttl
+        if not ttl:
+            return loader()
+
+        backend = cache_backend()
+        try:
+            full_key = f'{self.name}:{backend.generation(self.name)}:{key}'
+            entry = backend.get(full_key)
+        except Exception as e:
+            print(f"Query cache error ({self.name}): {e}")
+            self._count('errors')
+            return loader()
+        if entry is not None:
+            self._count('hits')
+            return entry[0]
+
+        self._count('misses')
+        value = loader()
+        try:
+            # Wrapped so a cached None is told apart from a miss
+            backend.set(full_key, (value,), ttl)
+        except Exception as e:
+            print(f"Query cache error ({self.name}): {e}")
+            self._count('errors')
+        return value
+
+    def invalidate(self):
+        try:
+            cache_backend().bump(self.name)
+        except Exception as e:
+            print(f"Query cache invalidation error ({self.name}): {e}")
+            self._count('errors')
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self._counts)
+        lookups = counts['hits'] + counts['misses']
+        counts['hit_ratio'] = round(counts['hits'] / lookups, 3) if lookups else None
+        return counts
+
+
+def cache_stats():
+    """Hit/miss counters of every query cache in this process"""
+    return {
+        'backend': cache_backend().name,
+        'caches': {cache.name: cache.stats() for cache in _query_caches}
+    }
+
+
+def cache_metrics():
+    """Query cache counters in Prometheus text format"""
+    lines = [
+        '# HELP gymfit_query_cache_requests_total Query cache lookups by cache and result.',
+        '# TYPE gymfit_query_cache_requests_total counter',
+    ]
+    for cache in _query_caches:
+        stats = cache.stats()
+        for result in ('hits', 'misses', 'errors'):
+            lines.append(f'gymfit_query_cache_requests_total{{cache="{cache.name}",result="{result}"}} '
+                         f'{stats[result]}')
+    return lines
@@ -0,0 +1,342 @@
+import atexit
+import json
+import os
+import threading
+from collections import Counter
+from datetime import date, datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from cache import TTLCache, invalidate_on_commit
+from models import db, Member, CheckIn, CheckInHour
+from payments import parse_datetime
+
+# Active members as member_id -> (member pk, expiry date), loaded in one
+# query and reused until a commit writes to members or CHECKIN_MEMBER_CACHE_TTL
+# passes, so a scan never queries the members table.
+_member_cache = TTLCache(ttl=60, maxsize=1)
+invalidate_on_commit(Member, _member_cache.clear)
+
+# member_id -> time of the last accepted scan, to drop double scans
+_recent_scans = TTLCache(ttl=120, maxsize=100000)
+
+_buffer = None
+_buffer_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_counters = {'accepted': 0, 'duplicate': 0, 'unknown': 0, 'expired': 0, 'rejected': 0,
+             'flushed': 0, 'flush_errors': 0, 'dead_lettered': 0}
+
+
+def _count(name, amount=1):
+    with _stats_lock:
+        _counters[name] += amount
+
+
+def _load_active_members():
+    rows = db.session.execute(
+        select(Member.member_id, Member.id, Member.expiry_date).where(Member.status == 'active')
+    )
+    return {member_id: (member_pk, expiry_date) for member_id, member_pk, expiry_date in rows}
+
+
+def active_members():
+    """member_id -> (member pk, expiry date) for active members, from the in-process cache"""
+    ttl = current_app.config['CHECKIN_MEMBER_CACHE_TTL']
+    if not ttl:
+        return _load_active_members()
+    return _member_cache.get_or_set('active', _load_active_members, ttl=ttl)
+
+
+def _hour(moment):
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def write_checkins(rows):
+    """Insert check-ins with one executemany and add them to the hourly rollup, then commit"""
+    db.session.execute(insert(CheckIn), rows)
+
+    hours = Counter(_hour(row['checked_in_at']) for row in rows)
+    existing = set(db.session.execute(
+        select(CheckInHour.hour).where(CheckInHour.hour.in_(list(hours)))
+    ).scalars())
+    for hour in existing:
+        db.session.execute(update(CheckInHour).where(CheckInHour.hour == hour)
+                           .values(checkins=CheckInHour.checkins + hours[hour]))
+    new_hours = [{'hour': hour, 'checkins': count} for hour, count in hours.items() if hour not in existing]
+    if new_hours:
+        db.session.execute(insert(CheckInHour), new_hours)
+    db.session.commit()
+
+
+class CheckInBuffer:
+    """Accepted check-ins held in memory and written in batches.
+
+    A background thread flushes every `flush_interval` seconds, or as soon
+    as `flush_size` rows are waiting, so scans never wait on the database.
+    Rows from a failed flush are put back and retried. After `max_attempts`
+    failed flushes those rows are written one at a time, and rows that still
+    fail for a reason other than the database being unavailable are appended
+    to `dead_letter_path` (JSON lines) so they stop blocking the rest.
+    `add()` refuses new rows once `max_rows` are waiting (the database is
+    down or too slow).
+    """
+
+    def __init__(self, app, flush_size=200, flush_interval=2.0, max_rows=10000, max_attempts=3,
+                 dead_letter_path=None):
+        self.app = app
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.max_rows = max_rows
+        self.max_attempts = max_attempts
+        self.dead_letter_path = dead_letter_path
+        self._rows = []
+        self._failed_attempts = 0
+        self._failed_rows = 0  # Rows at the head of the buffer that were in the failed flushes
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='checkin-flusher', daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.flush()
+
+    def __len__(self):
+        return len(self._rows)
+
+    def add(self, rows):
+        """Queue rows for the next flush, returns False if the buffer is full"""
+        with self._lock:
+            if len(self._rows) + len(rows) > self.max_rows:
+                return False
+            self._rows.extend(rows)
+            full = len(self._rows) >= self.flush_size
+        if full:
+            self._wake.set()
+        return True
+
+    def flush(self):
+        """Write everything waiting, returns the number of rows written"""
+        with self._flush_lock:
+            with self._lock:
+                rows, self._rows = self._rows, []
+            if not rows:
+                return 0
+            written = 0
+            with self.app.app_context():
+                try:
+                    if self._failed_attempts >= self.max_attempts:
+                        suspects, rows = rows[:self._failed_rows], rows[self._failed_rows:]
+                        written, retry = self._write_one_by_one(suspects)
+                        if retry:
+                            # The database is unavailable, keep everything for the next flush
+                            rows = retry + rows
+                        else:
+                            self._failed_attempts = self._failed_rows = 0
+                    if rows and self._failed_attempts < self.max_attempts and self._write_batch(rows):
+                        written += len(rows)
+                        rows = []
+                finally:
+                    db.session.remove()
+            if rows:
+                with self._lock:
+                    self._rows[:0] = rows
+            _count('flushed', written)
+            return written
+
+    def _write(self, rows):
+        try:
+            write_checkins(rows)
+        except IntegrityError:
+            # Another process created the same hour bucket first
+            db.session.rollback()
+            write_checkins(rows)
+
+    def _write_batch(self, rows):
+        """Write rows in one transaction, returns False if the flush failed"""
+        try:
+            self._write(rows)
+        except Exception as e:
+            print(f"Check-in flush error: {e}")
+            db.session.rollback()
+            _count('flush_errors')
+            if not isinstance(e, OperationalError):
+                # Only failures that may be caused by the rows count towards max_attempts
+                self._failed_attempts += 1
+                self._failed_rows = len(rows)
+            return False
+        self._failed_attempts = self._failed_rows = 0
+        return True
+
+    def _write_one_by_one(self, rows):
+        """Write rows from repeatedly failed flushes singly and dead-letter the ones that fail.
+
+        Returns (written, rows to retry). Stops and returns the remaining
+        rows if the database itself is unavailable.
+        """
+        written = 0
+        dead = []
+        for index, row in enumerate(rows):
+            try:
+                self._write([row])
+            except OperationalError as e:
+                print(f"Check-in flush error: {e}")
+                db.session.rollback()
+                _count('flush_errors')
+                self._dead_letter(dead)
+                return written, rows[index:]
+            except Exception as e:
+                db.session.rollback()
+                dead.append(dict(row, error=str(e).splitlines()[0]))
+            else:
+                written += 1
+        self._dead_letter(dead)
+        return written, []
+
+    def _dead_letter(self, rows):
+        if not rows:
+            return
+        print(f"Check-in flush: {len(rows)} rows could not be written"
+              + (f", see {self.dead_letter_path}" if self.dead_letter_path else ''))
+        _count('dead_lettered', len(rows))
+        if self.dead_letter_path:
+            os.makedirs(os.path.dirname(self.dead_letter_path) or '.', exist_ok=True)
+            with open(self.dead_letter_path, 'a', encoding='utf-8') as f:
+                for row in rows:
+                    f.write(json.dumps(row, default=str) + '\n')
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+
+def get_checkin_buffer(app):
+    """The process-wide check-in buffer, started on first use"""
+    global _buffer
+    if _buffer is not None:
+        return _buffer
+    with _buffer_lock:
+        if _buffer is None:
+            _buffer = CheckInBuffer(
+                app,
+                flush_size=app.config['CHECKIN_FLUSH_SIZE'],
+                flush_interval=app.config['CHECKIN_FLUSH_INTERVAL'],
+                max_rows=app.config['CHECKIN_BUFFER_MAX'],
+                max_attempts=app.config['CHECKIN_FLUSH_ATTEMPTS'],
+                dead_letter_path=app.config['CHECKIN_DEAD_LETTER_FILE']
+            )
+            _buffer.start()
+    return _buffer
+
+
+def record_scans(scans, buffer):
+    """Validate scans against the active member cache and queue the accepted ones.
+
+    Each scan is a dict with member_id and optionally device and scanned_at.
+    Returns (results, queued): one result per scan ('accepted', 'duplicate',
+    'unknown', 'expired' or 'rejected') and False if the buffer was full,
+    in which case nothing from this call was queued.
+    """
+    config = current_app.config
+    members = active_members()
+    now = datetime.now()
+    today = now.date()
+    dedupe_seconds = config['CHECKIN_DEDUPE_SECONDS']
+
+    results = []
+    rows = []
+    accepted_ids = set()
+    for scan in scans:
+        member_id = str(scan.get('member_id') or '').strip() if isinstance(scan, dict) else ''
+        scanned_at = parse_datetime(scan.get('scanned_at')) if member_id and scan.get('scanned_at') else None
+        if not member_id or (scanned_at and scanned_at > now + timedelta(minutes=5)):
+            results.append('rejected')
+            continue
+        member = members.get(member_id)
+        if member is None:
+            results.append('unknown')
+            continue
+        if member[1] is not None and member[1] < today:
+            results.append('expired')
+            continue
+        if dedupe_seconds and (_recent_scans.get(member_id) or member_id in accepted_ids):
+            results.append('duplicate')
+            continue
+        rows.append({'member_pk': member[0], 'checked_in_at': scanned_at or now,
+                     'device': (str(scan.get('device') or '')[:50]) or None})
+        accepted_ids.add(member_id)
+        results.append('accepted')
+
+    if rows and not buffer.add(rows):
+        return ['rejected' if result == 'accepted' else result for result in results], False
+    if dedupe_seconds:
+        for member_id in accepted_ids:
+            _recent_scans.set(member_id, now, ttl=dedupe_seconds)
+    for result in results:
+        _count(result)
+    return results, True
+
+
+def hourly_occupancy(day=None):
+    """Check-ins per hour for one day from the rollup table (flushed scans only)"""
+    day = day or date.today()
+    start = datetime.combine(day, datetime.min.time())
+    counts = dict(db.session.execute(
+        select(CheckInHour.hour, CheckInHour.checkins)
+        .where(CheckInHour.hour >= start, CheckInHour.hour < start + timedelta(days=1))
+    ).all())
+
+    points = []
+    for hour in range(24):
+        moment = start + timedelta(hours=hour)
+        points.append({'label': moment.strftime('%H:00'), 'checkins': counts.get(moment, 0)})
+    peak = max(points, key=lambda point: point['checkins'])
+    return {
+        'date': day.isoformat(),
+        'total': sum(point['checkins'] for point in points),
+        'peak_hour': peak['label'] if peak['checkins'] else None,
+        'points': points
+    }
+
+
+def checkin_metrics():
+    """Check-in counters and buffer depth in Prometheus text format"""
+    with _stats_lock:
+        counters = dict(_counters)
+    flushed = counters.pop('flushed')
+    flush_errors = counters.pop('flush_errors')
+    dead_lettered = counters.pop('dead_lettered')
+
+    lines = [
+        '# HELP gymfit_checkin_scans_total Check-in scans by result.',
+        '# TYPE gymfit_checkin_scans_total counter',
+    ]
+    lines += [f'gymfit_checkin_scans_total{{result="{name}"}} {count}' for name, count in sorted(counters.items())]
+    lines += [
+        '# HELP gymfit_checkins_flushed_total Check-ins written to the database.',
+        '# TYPE gymfit_checkins_flushed_total counter',
+        f'gymfit_checkins_flushed_total {flushed}',
+        '# HELP gymfit_checkin_flush_errors_total Failed check-in flushes (rows are retried).',
+        '# TYPE gymfit_checkin_flush_errors_total counter',
+        f'gymfit_checkin_flush_errors_total {flush_errors}',
+        '# HELP gymfit_checkins_dead_lettered_total Check-ins that could not be written, see CHECKIN_DEAD_LETTER_FILE.',
+        '# TYPE gymfit_checkins_dead_lettered_total counter',
+        f'gymfit_checkins_dead_lettered_total {dead_lettered}',
+        '# HELP gymfit_checkin_buffer_rows Check-ins waiting to be flushed.',
+        '# TYPE gymfit_checkin_buffer_rows gauge',
+        f'gymfit_checkin_buffer_rows {len(_buffer) if _buffer is not None else 0}',
+    ]
+    return lines
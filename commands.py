@@ -0,0 +1,194 @@
+"""
+CLI commands (batch jobs and maintenance), registered on both the web app
+and the lighter CLI app in manage.py.
+
+Each command imports the modules it uses when it runs, so starting one job
+doesn't load what the others (or the web routes) need.
+"""
+
+import os
+import time
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+
+# CLI: rebuild the member search index
+@click.command('search-reindex')
+@with_appcontext
+def search_reindex_command():
+    """Rebuild the member full-text search index"""
+    from search import rebuild_search_index
+    count = rebuild_search_index()
+    print(f"✓ Indexed {count} members")
+
+# CLI: build fingerprinted, pre-compressed static assets
+@click.command('assets-build')
+@with_appcontext
+def assets_build_command():
+    """Copy css/js into static/dist with content-hashed names plus .gz/.br variants"""
+    from assets import build_assets
+    manifest = build_assets(current_app.static_folder)
+    print(f"✓ Built {len(manifest)} assets into static/dist (restart the app to pick them up)")
+
+# CLI: run the mail worker as a separate process
+@click.command('mail-worker')
+@click.option('--threads', default=None, type=int, help='Number of sender threads')
+@click.option('--once', is_flag=True, help='Send one batch and exit')
+@with_appcontext
+def mail_worker_command(threads, once):
+    """Deliver queued emails from the outbox"""
+    from mailer import process_batch, MailWorker
+    if once:
+        sent = process_batch()
+        print(f"✓ Processed {sent} emails")
+        return
+
+    app = current_app._get_current_object()
+    worker = MailWorker(app,
+                        threads=threads or app.config['MAIL_WORKER_THREADS'],
+                        poll_interval=app.config['MAIL_QUEUE_POLL_INTERVAL'])
+    worker.start()
+    print(f"Mail worker running with {worker.threads} threads (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        worker.stop()
+
+# CLI: expire lapsed memberships and queue expiry reminders
+@click.command('expiry-reminders')
+@click.option('--days', default=None, type=int, help='Remind members expiring within this many days')
+@click.option('--chunk-size', default=None, type=int, help='Members read and emailed per batch')
+@with_appcontext
+def expiry_reminders_command(days, chunk_size):
+    """Mark lapsed memberships expired and email members whose membership expires soon"""
+    from reminders import send_expiry_reminders
+    config = current_app.config
+    # The CLI app has no routes to build the link from, so it is joined onto the public URL
+    result = send_expiry_reminders(
+        renewal_url=config['APP_BASE_URL'].rstrip('/') + '/login',
+        days=days or config['EXPIRY_REMINDER_DAYS'],
+        chunk_size=chunk_size or config['EXPIRY_REMINDER_CHUNK_SIZE']
+    )
+
+    print(f"✓ Marked {result['expired']} memberships as expired in {result['expire_seconds']:.2f}s")
+    print(f"✓ Queued {result['reminded']} expiry reminders in {result['remind_seconds']:.2f}s "
+          f"({result['rows_per_second']:.0f} rows/s)")
+
+# CLI: import members from a CSV file
+@click.command('members-import')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--rejects', default=None, help='Where to write rejected rows (default: <path>.rejects.csv)')
+@click.option('--chunk-size', default=None, type=int, help='Rows per executemany/commit')
+@with_appcontext
+def members_import_command(path, rejects, chunk_size):
+    """Import members from CSV, adding new emails and updating existing ones"""
+    from member_csv import import_members_csv
+    rejects = rejects or f"{path}.rejects.csv"
+    with open(path, newline='', encoding='utf-8-sig') as source, \
+            open(rejects, 'w', newline='', encoding='utf-8') as rejects_file:
+        summary = import_members_csv(source, chunk_size=chunk_size or current_app.config['CSV_CHUNK_SIZE'],
+                                     rejects=rejects_file)
+
+    if not summary['rejected']:
+        os.remove(rejects)
+    print(f"✓ {summary['rows']} rows in {summary['seconds']}s ({summary['rows_per_second']} rows/s): "
+          f"{summary['inserted']} added, {summary['updated']} updated, {summary['rejected']} rejected")
+    if summary['rejected']:
+        print(f"  Rejected rows written to {rejects}")
+
+# CLI: reconcile a gateway settlement file against the payments ledger
+@click.command('payments-reconcile')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--gateway', default=None, help='bkash or sslcommerz (detected from the header by default)')
+@click.option('--report', default=None, help='Where to write discrepancies (default: <path>.report.csv)')
+@with_appcontext
+def payments_reconcile_command(path, gateway, report):
+    """Match a bKash/SSLCommerz settlement CSV against the payments ledger"""
+    from payments import reconcile_settlements
+    report = report or f"{path}.report.csv"
+    with open(path, newline='', encoding='utf-8-sig') as source, \
+            open(report, 'w', newline='', encoding='utf-8') as report_file:
+        summary = reconcile_settlements(source, gateway=gateway and gateway.lower(), report=report_file,
+                                        chunk_size=current_app.config['RECONCILE_CHUNK_SIZE'],
+                                        window_days=current_app.config['RECONCILE_WINDOW_DAYS'])
+
+    print(f"✓ {summary['settlements']} {summary['gateway']} settlements in {summary['seconds']}s "
+          f"({summary['rows_per_second']} rows/s): {summary['matched']} matched")
+    issues = [key for key in ('amount_mismatch', 'status_mismatch', 'missing_in_ledger',
+                              'missing_in_settlement', 'unreadable_rows') if summary[key]]
+    for key in issues:
+        print(f"  {key}: {summary[key]}")
+    if issues:
+        print(f"  Discrepancies written to {report}")
+    else:
+        os.remove(report)
+
+# CLI: delete expired and used password reset tokens
+@click.command('reset-tokens-purge')
+@click.option('--batch-size', default=None, type=int, help='Rows deleted per transaction')
+@with_appcontext
+def reset_tokens_purge_command(batch_size):
+    """Delete expired and used password reset tokens (run periodically, e.g. hourly from cron)"""
+    from reset_tokens import purge_reset_tokens
+    result = purge_reset_tokens(batch_size or current_app.config['RESET_TOKEN_PURGE_BATCH'])
+    print(f"✓ Deleted {result['deleted']} reset tokens in {result['seconds']:.2f}s "
+          f"({result['rows_per_second']:.0f} rows/s)")
+
+# CLI: move decided registrations and long-expired members into the archive tables
+@click.command('archive')
+@click.option('--registration-days', default=None, type=int,
+              help='Archive approved/rejected registrations older than this many days')
+@click.option('--member-days', default=None, type=int, help='Archive members expired for more than this many days')
+@click.option('--chunk-size', default=None, type=int, help='Rows moved per transaction')
+@with_appcontext
+def archive_command(registration_days, member_days, chunk_size):
+    """Archive old approved/rejected registrations and long-expired members (run daily from cron)"""
+    from archive import run_archival
+    config = current_app.config
+    result = run_archival(
+        member_days=config['ARCHIVE_EXPIRED_MEMBER_DAYS'] if member_days is None else member_days,
+        registration_days=config['ARCHIVE_REGISTRATION_DAYS'] if registration_days is None else registration_days,
+        chunk_size=chunk_size or config['ARCHIVE_CHUNK_SIZE']
+    )
+    print(f"✓ Archived {result['registrations']} registrations and {result['members']} members "
+          f"in {result['seconds']:.2f}s ({result['rows_per_second']:.0f} rows/s)")
+
+# CLI: bring a deleted or archived member back
+@click.command('members-restore')
+@click.argument('member_id')
+@with_appcontext
+def members_restore_command(member_id):
+    """Restore an archived member (and their login) by member ID"""
+    from archive import restore_member
+    from models import db
+    try:
+        member = restore_member(member_id)
+    except ValueError as e:
+        raise click.ClickException(f'Cannot restore {member_id}: {e}')
+    if member is None:
+        raise click.ClickException(f'{member_id} is not in the archive')
+    db.session.commit()
+    print(f"✓ Restored {member.member_id} ({member.first_name} {member.last_name})")
+
+# CLI: show mail queue depth and send latency
+@click.command('mail-queue-stats')
+@with_appcontext
+def mail_queue_stats_command():
+    """Show outbox depth by status and send latency"""
+    from mailer import queue_stats
+    for key, value in queue_stats().items():
+        print(f"{key}: {value}")
+
+
+COMMANDS = [search_reindex_command, assets_build_command, mail_worker_command, expiry_reminders_command,
+            members_import_command, payments_reconcile_command, reset_tokens_purge_command,
+            archive_command, members_restore_command, mail_queue_stats_command]
+
+
+def register_commands(app):
+    """Add the CLI commands to app.cli"""
+    for command in COMMANDS:
+        app.cli.add_command(command)
@@ -1,8 +1,10 @@
 import os
-from dotenv import load_dotenv
 
-# Load environment variables from .env file
-load_dotenv()
+# Load environment variables from .env file, unless the flask command
+# already has (it does so before importing the app)
+if os.environ.get('FLASK_RUN_FROM_CLI') != 'true':
+    from dotenv import load_dotenv
+    load_dotenv()
 
 # Get the base directory
 basedir = os.path.abspath(os.path.dirname(__file__))
@@ -18,15 +20,139 @@ class Config:
         'sqlite:///' + os.path.join(basedir, 'instance', 'gymfit.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
-    # Email configuration (Gmail SMTP)
-    MAIL_SERVER = 'smtp.gmail.com'
-    MAIL_PORT = 587
-    MAIL_USE_TLS = True
-    MAIL_USE_SSL = False
+    # Connection pool for server databases (PostgreSQL/MySQL)
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE') or 10)
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW') or 20)
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT') or 30)
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE') or 1800)
+    
+    # SQLite tuning, applied to every new connection
+    SQLITE_WAL = (os.environ.get('SQLITE_WAL') or 'True').lower() == 'true'
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS') or 'NORMAL'
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS') or 5000)
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE') or 256 * 1024 * 1024)
+    
+    # Debug mode for `python3 app.py` (never enable in production)
+    DEBUG = (os.environ.get('FLASK_DEBUG') or 'False').lower() in ('1', 'true')
+    
+    # Password hashing cost (log2 bcrypt rounds). Existing hashes are
+    # upgraded to the new cost the next time their user logs in.
+    BCRYPT_LOG_ROUNDS = int(os.environ.get('BCRYPT_LOG_ROUNDS') or 12)
+    
+    # Login throttling: token buckets per client IP and per username
+    LOGIN_RATE_LIMIT_ENABLED = (os.environ.get('LOGIN_RATE_LIMIT_ENABLED') or 'True').lower() == 'true'
+    LOGIN_IP_BURST = int(os.environ.get('LOGIN_IP_BURST') or 20)
+    LOGIN_IP_PER_MINUTE = float(os.environ.get('LOGIN_IP_PER_MINUTE') or 10)
+    LOGIN_USERNAME_BURST = int(os.environ.get('LOGIN_USERNAME_BURST') or 5)
+    LOGIN_USERNAME_PER_MINUTE = float(os.environ.get('LOGIN_USERNAME_PER_MINUTE') or 2)
+    AUTH_USER_CACHE_TTL = int(os.environ.get('AUTH_USER_CACHE_TTL') or 30)
+    PRINCIPAL_CACHE_TTL = int(os.environ.get('PRINCIPAL_CACHE_TTL') or 60)
+    
+    # gzip rendered pages and JSON responses of at least COMPRESS_MIN_SIZE bytes
+    COMPRESS_RESPONSES = (os.environ.get('COMPRESS_RESPONSES') or 'True').lower() == 'true'
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE') or 1024)
+    COMPRESS_LEVEL = int(os.environ.get('COMPRESS_LEVEL') or 6)
+    
+    # Request instrumentation: /metrics, Server-Timing headers, N+1 warnings
+    INSTRUMENTATION_ENABLED = (os.environ.get('INSTRUMENTATION_ENABLED') or 'False').lower() == 'true'
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    SQL_REPEAT_THRESHOLD = int(os.environ.get('SQL_REPEAT_THRESHOLD') or 5)
+    # Profile every request with cProfile and keep those slower than this (0 = off)
+    PROFILE_SLOW_REQUEST_MS = int(os.environ.get('PROFILE_SLOW_REQUEST_MS') or 0)
+    PROFILE_DIR = os.environ.get('PROFILE_DIR') or os.path.join(basedir, 'instance', 'profiles')
+    
+    # Member/registration IDs reserved per counter update (1 = strictly sequential)
+    ID_BLOCK_SIZE = int(os.environ.get('ID_BLOCK_SIZE') or 1)
+    
+    # Member listing pagination
+    MEMBERS_PAGE_SIZE = int(os.environ.get('MEMBERS_PAGE_SIZE') or 25)
+    MEMBERS_MAX_PAGE_SIZE = int(os.environ.get('MEMBERS_MAX_PAGE_SIZE') or 100)
+    DASHBOARD_RECENT_MEMBERS = int(os.environ.get('DASHBOARD_RECENT_MEMBERS') or 5)
+    SEARCH_PAGE_SIZE = int(os.environ.get('SEARCH_PAGE_SIZE') or 20)
+    
+    # Read-through cache for admin page queries (member pages, pending registrations).
+    # CACHE_BACKEND is 'memory' (per process), 'redis' (shared, needs the redis package) or 'fake'.
+    # A commit only clears the memory backend of the process that made it: with several
+    # gunicorn workers the others serve stale pages for up to QUERY_CACHE_TTL, so use
+    # 'redis' for multi-worker deployments (or set QUERY_CACHE_TTL=0).
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND') or 'memory'
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL') or 'redis://localhost:6379/0'
+    QUERY_CACHE_TTL = int(os.environ.get('QUERY_CACHE_TTL') or 120)
+    QUERY_CACHE_MAXSIZE = int(os.environ.get('QUERY_CACHE_MAXSIZE') or 2048)
+    
+    # Member detail JSON (/api/member/<id>, /api/members?ids=...), cached per process
+    MEMBER_DETAIL_CACHE_TTL = int(os.environ.get('MEMBER_DETAIL_CACHE_TTL') or 300)
+    MEMBER_BATCH_MAX = int(os.environ.get('MEMBER_BATCH_MAX') or 200)
+    
+    # CSV import/export of members
+    CSV_CHUNK_SIZE = int(os.environ.get('CSV_CHUNK_SIZE') or 1000)
+    CSV_REJECTS_DIR = os.environ.get('CSV_REJECTS_DIR') or os.path.join(basedir, 'instance', 'imports')
+    MAX_CONTENT_LENGTH = int(os.environ.get('MAX_UPLOAD_MB') or 50) * 1024 * 1024
+    
+    # Password reset tokens (flask reset-tokens-purge deletes expired/used ones)
+    RESET_TOKEN_TTL_MINUTES = int(os.environ.get('RESET_TOKEN_TTL_MINUTES') or 60)
+    RESET_TOKEN_PURGE_BATCH = int(os.environ.get('RESET_TOKEN_PURGE_BATCH') or 5000)
+    
+    # Archival job (archive command): moves decided registrations and long-expired members out
+    ARCHIVE_REGISTRATION_DAYS = int(os.environ.get('ARCHIVE_REGISTRATION_DAYS') or 30)
+    ARCHIVE_EXPIRED_MEMBER_DAYS = int(os.environ.get('ARCHIVE_EXPIRED_MEMBER_DAYS') or 365)
+    ARCHIVE_CHUNK_SIZE = int(os.environ.get('ARCHIVE_CHUNK_SIZE') or 1000)
+    
+    # Membership plans are cached in-process; commits that change plans clear the cache
+    PLAN_CACHE_TTL = int(os.environ.get('PLAN_CACHE_TTL') or 300)
+    
+    # Payments ledger (POST /api/payments) and settlement reconciliation
+    PAYMENTS_API_TOKEN = os.environ.get('PAYMENTS_API_TOKEN')
+    PAYMENTS_MAX_BATCH = int(os.environ.get('PAYMENTS_MAX_BATCH') or 1000)
+    RECONCILE_CHUNK_SIZE = int(os.environ.get('RECONCILE_CHUNK_SIZE') or 1000)
+    RECONCILE_WINDOW_DAYS = int(os.environ.get('RECONCILE_WINDOW_DAYS') or 1)
+    
+    # Front-desk check-ins (POST /api/checkin), buffered and written in batches
+    CHECKIN_API_TOKEN = os.environ.get('CHECKIN_API_TOKEN')
+    CHECKIN_FLUSH_SIZE = int(os.environ.get('CHECKIN_FLUSH_SIZE') or 200)
+    CHECKIN_FLUSH_INTERVAL = float(os.environ.get('CHECKIN_FLUSH_INTERVAL') or 2.0)
+    CHECKIN_BUFFER_MAX = int(os.environ.get('CHECKIN_BUFFER_MAX') or 10000)
+    # Failed flushes before their rows are retried one by one; rows that still fail go to the file
+    CHECKIN_FLUSH_ATTEMPTS = int(os.environ.get('CHECKIN_FLUSH_ATTEMPTS') or 3)
+    CHECKIN_DEAD_LETTER_FILE = os.environ.get('CHECKIN_DEAD_LETTER_FILE') or \
+        os.path.join(basedir, 'instance', 'checkins-dead-letter.jsonl')
+    CHECKIN_MAX_BATCH = int(os.environ.get('CHECKIN_MAX_BATCH') or 500)
+    CHECKIN_MEMBER_CACHE_TTL = int(os.environ.get('CHECKIN_MEMBER_CACHE_TTL') or 60)
+    CHECKIN_DEDUPE_SECONDS = int(os.environ.get('CHECKIN_DEDUPE_SECONDS') or 120)
+    
+    # Class schedule (weekly view cached in-process; seat counts are always live)
+    SCHEDULE_CACHE_TTL = int(os.environ.get('SCHEDULE_CACHE_TTL') or 300)
+    
+    # Expiry reminders (flask expiry-reminders)
+    EXPIRY_REMINDER_DAYS = int(os.environ.get('EXPIRY_REMINDER_DAYS') or 7)
+    EXPIRY_REMINDER_CHUNK_SIZE = int(os.environ.get('EXPIRY_REMINDER_CHUNK_SIZE') or 500)
+    
+    # Dashboard statistics
+    STATS_CACHE_TTL = int(os.environ.get('STATS_CACHE_TTL') or 60)
+    STATS_EXPIRY_WINDOW_DAYS = int(os.environ.get('STATS_EXPIRY_WINDOW_DAYS') or 7)
+    
+    # Email configuration (Gmail SMTP by default, override for a local SMTP server)
+    MAIL_SERVER = os.environ.get('MAIL_SERVER') or 'smtp.gmail.com'
+    MAIL_PORT = int(os.environ.get('MAIL_PORT') or 587)
+    MAIL_USE_TLS = (os.environ.get('MAIL_USE_TLS') or 'True').lower() == 'true'
+    MAIL_USE_SSL = (os.environ.get('MAIL_USE_SSL') or 'False').lower() == 'true'
     MAIL_USERNAME = os.environ.get('MAIL_USERNAME')
     MAIL_PASSWORD = os.environ.get('MAIL_PASSWORD')
     MAIL_DEFAULT_SENDER = os.environ.get('MAIL_USERNAME') or 'noreply@gymfit.com'
     
+    # Outbound mail queue
+    MAIL_QUEUE_INLINE_WORKER = (os.environ.get('MAIL_QUEUE_INLINE_WORKER') or 'True').lower() == 'true'
+    MAIL_WORKER_THREADS = int(os.environ.get('MAIL_WORKER_THREADS') or 2)
+    MAIL_QUEUE_POLL_INTERVAL = float(os.environ.get('MAIL_QUEUE_POLL_INTERVAL') or 1.0)
+    MAIL_QUEUE_BATCH_SIZE = int(os.environ.get('MAIL_QUEUE_BATCH_SIZE') or 20)
+    MAIL_QUEUE_MAX_ATTEMPTS = int(os.environ.get('MAIL_QUEUE_MAX_ATTEMPTS') or 6)
+    MAIL_QUEUE_BACKOFF_BASE = float(os.environ.get('MAIL_QUEUE_BACKOFF_BASE') or 30)
+    MAIL_QUEUE_BACKOFF_MAX = float(os.environ.get('MAIL_QUEUE_BACKOFF_MAX') or 3600)
+    MAIL_QUEUE_LEASE_SECONDS = int(os.environ.get('MAIL_QUEUE_LEASE_SECONDS') or 300)
+    
+    # Public URL of the site, used for links in emails sent outside a request
+    APP_BASE_URL = os.environ.get('APP_BASE_URL') or 'http://localhost:5000'
+    
     # Admin configuration
     ADMIN_EMAIL = os.environ.get('ADMIN_EMAIL') or 'rakibalshahriar@gmail.com'
     ADMIN_USERNAME = os.environ.get('ADMIN_USERNAME') or 'rakib'
@@ -0,0 +1,53 @@
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+SYNCHRONOUS_MODES = ('OFF', 'NORMAL', 'FULL', 'EXTRA')
+
+
+def is_sqlite(uri):
+    return make_url(uri).get_backend_name() == 'sqlite'
+
+
+def engine_options(config):
+    """SQLALCHEMY_ENGINE_OPTIONS for the configured database.
+
+    Server databases get a bounded pool that is recycled and pre-pinged so
+    connections dropped by the server or a proxy are replaced rather than
+    handed to a request. SQLite keeps SQLAlchemy's default pool; its tuning
+    happens per connection in install_sqlite_pragmas().
+    """
+    if is_sqlite(config['SQLALCHEMY_DATABASE_URI']):
+        return {'connect_args': {'timeout': config['SQLITE_BUSY_TIMEOUT_MS'] / 1000.0}}
+    return {
+        'pool_size': config['DB_POOL_SIZE'],
+        'max_overflow': config['DB_MAX_OVERFLOW'],
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+        'pool_pre_ping': True
+    }
+
+
+def install_sqlite_pragmas(engine, config):
+    """Tune every new connection of a SQLite engine.
+
+    WAL lets readers carry on while one writer commits, synchronous=NORMAL
+    only syncs at checkpoints (safe in WAL mode, a crash can lose at most the
+    last transactions, never corrupt the file), busy_timeout makes a writer
+    wait for the lock instead of failing with "database is locked", and
+    mmap_size serves reads straight from the page cache.
+    """
+    if engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, 'connect')
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            if config['SQLITE_WAL']:
+                cursor.execute('PRAGMA journal_mode=WAL')
+            if config['SQLITE_SYNCHRONOUS'].upper() in SYNCHRONOUS_MODES:
+                cursor.execute(f"PRAGMA synchronous={config['SQLITE_SYNCHRONOUS'].upper()}")
+            cursor.execute(f"PRAGMA busy_timeout={int(config['SQLITE_BUSY_TIMEOUT_MS'])}")
+            cursor.execute(f"PRAGMA mmap_size={int(config['SQLITE_MMAP_SIZE'])}")
+        finally:
+            cursor.close()
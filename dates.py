@@ -0,0 +1,29 @@
+from datetime import date, datetime
+
+# Formats accepted for dates typed into forms or imported from files
+DATE_FORMATS = ('%Y-%m-%d', '%d-%m-%Y', '%d/%m/%Y', '%Y/%m/%d')
+
+
+def parse_date(value):
+    """Parse a date string (ISO first), returns None for empty or invalid input"""
+    if value is None or isinstance(value, date):
+        return value
+    value = str(value).strip()[:10]
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        pass
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def format_date(value):
+    """ISO format a date for JSON, None stays None"""
+    return value.isoformat() if value else None
+
@@ -0,0 +1,78 @@
+import re
+import threading
+
+from flask import current_app
+from jinja2 import meta
+from markupsafe import escape
+
+# Placeholder rendered in place of every per-recipient field when the shell is built
+_PLACEHOLDER = '@@EMAIL_FIELD:{}@@'
+_PLACEHOLDER_RE = re.compile(r'@@EMAIL_FIELD:(\w+)@@')
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+class EmailTemplate:
+    """An email template rendered once into a static shell with field slots.
+
+    The email templates only substitute plain values (no per-recipient
+    conditionals or loops), so the whole inline-CSS document can be rendered
+    a single time with placeholders and then filled in by string joins.
+    """
+
+    def __init__(self, name, template, fields, parts):
+        self.name = name
+        self.template = template
+        self.fields = fields
+        # Alternating literal chunks and field names: [str, field, str, field, ..., str]
+        self.parts = parts
+
+    @classmethod
+    def compile(cls, env, name):
+        source = env.loader.get_source(env, name)[0]
+        # Globals such as url_for are resolved once while building the shell
+        fields = frozenset(meta.find_undeclared_variables(env.parse(source)) - set(env.globals))
+        template = env.get_template(name)
+        shell = template.render(**{field: _PLACEHOLDER.format(field) for field in fields})
+        return cls(name, template, fields, _PLACEHOLDER_RE.split(shell))
+
+    def render(self, **values):
+        missing = self.fields.difference(values)
+        if missing:
+            raise KeyError(f"{self.name} is missing fields: {', '.join(sorted(missing))}")
+
+        parts = self.parts
+        out = [parts[0]]
+        for i in range(1, len(parts), 2):
+            out.append(str(escape(values[parts[i]])))
+            out.append(parts[i + 1])
+        return ''.join(out)
+
+
+def get_email_template(name):
+    """Return the compiled EmailTemplate for `name`, compiling it on first use"""
+    env = current_app.jinja_env
+    compiled = _cache.get(name)
+    # Recompile when templates are edited during development
+    if compiled is None or (env.auto_reload and not compiled.template.is_up_to_date):
+        with _cache_lock:
+            compiled = EmailTemplate.compile(env, name)
+            _cache[name] = compiled
+    return compiled
+
+
+def render_email(template_name, **values):
+    """Render one email from its cached shell"""
+    return get_email_template(template_name).render(**values)
+
+
+def render_email_batch(template_name, recipients):
+    """Render one email per dict of field values in `recipients`"""
+    template = get_email_template(template_name)
+    return [template.render(**values) for values in recipients]
+
+
+def clear_email_template_cache():
+    with _cache_lock:
+        _cache.clear()
@@ -0,0 +1,42 @@
+import os
+
+from flask import Flask
+
+from config import Config
+from database import engine_options, install_sqlite_pragmas
+from models import db
+
+
+def running_flask_cli():
+    """True inside the `flask` command, which sets FLASK_RUN_FROM_CLI before loading the app"""
+    return os.environ.get('FLASK_RUN_FROM_CLI') == 'true'
+
+
+def init_migrate(app):
+    """Bind Flask-Migrate (and so alembic) for `flask db ...` and init_db.py"""
+    from flask_migrate import Migrate
+    Migrate(app, db, render_as_batch=True)
+
+
+def create_app(config_object=Config, migrations=None, **overrides):
+    """Build the Flask app with its config and database, and nothing else.
+
+    This is all the CLI commands and batch jobs need. The web app (app.py)
+    adds CSRF protection, static assets, instrumentation and its routes on
+    top. Flask-Mail is created on first send (mailer.get_mail). Flask-Migrate
+    is bound when `migrations` is true, by default only under the flask CLI.
+    """
+    app = Flask(__name__)
+    app.config.from_object(config_object)
+    app.config.update(overrides)
+    if not app.config.get('SQLALCHEMY_ENGINE_OPTIONS'):
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config)
+
+    db.init_app(app)
+    with app.app_context():
+        for engine in db.engines.values():
+            install_sqlite_pragmas(engine, app.config)
+
+    if running_flask_cli() if migrations is None else migrations:
+        init_migrate(app)
+    return app
@@ -1,24 +1,34 @@
 #!/usr/bin/env python3
 """
 Database initialization script
-Creates the database and adds the admin account
+Creates the database, the default membership plans and the admin account
 """
 
-from app import app, db
-from models import User
-from flask_bcrypt import Bcrypt
+from flask_migrate import stamp
+from factory import create_app
+from models import db, User
+from auth import hash_password
+from plans import seed_default_plans
 from config import Config
 
-bcrypt = Bcrypt()
-
 def init_database():
     """Initialize the database and create admin account"""
     
+    # Only the database and migrations are needed, not the web app
+    app = create_app(migrations=True)
     with app.app_context():
         # Create all tables
         print("Creating database tables...")
         db.create_all()
         print("✓ Database tables created successfully!")
+
+        # Tables are already at the latest schema, mark them so `flask db upgrade` skips ahead
+        stamp()
+        
+        # Membership plans (prices can be changed in the plans table afterwards)
+        added = seed_default_plans()
+        db.session.commit()
+        print(f"✓ Membership plans ready ({added} added)")
         
         # Check if admin already exists
         admin = User.query.filter_by(username=Config.ADMIN_USERNAME).first()
@@ -28,7 +38,7 @@ def init_database():
         else:
             # Create admin account
             print("Creating admin account...")
-            hashed_password = bcrypt.generate_password_hash(Config.ADMIN_PASSWORD).decode('utf-8')
+            hashed_password = hash_password(Config.ADMIN_PASSWORD)
             
             admin_user = User(
                 username=Config.ADMIN_USERNAME,
@@ -0,0 +1,220 @@
+import cProfile
+import os
+import secrets
+import threading
+import time
+from collections import Counter
+
+from flask import Response, current_app, g, has_request_context, request
+from sqlalchemy import event
+
+# Request latency histogram buckets (seconds)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class RequestMetrics:
+    """Per-endpoint request and SQL totals for this worker process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = Counter()       # (endpoint, method, status) -> count
+        self.latency = {}               # endpoint -> [bucket counts..., +Inf], sum
+        self.queries = Counter()        # endpoint -> statements executed
+        self.sql_seconds = Counter()    # endpoint -> time spent in SQL
+        self.repeated = Counter()       # endpoint -> requests with an N+1 pattern
+        self.slow_profiles = 0
+
+    def observe(self, endpoint, method, status, seconds, queries, sql_seconds, repeated):
+        with self._lock:
+            self.requests[(endpoint, method, status)] += 1
+            buckets, total = self.latency.get(endpoint, ([0] * (len(LATENCY_BUCKETS) + 1), 0.0))
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    buckets[i] += 1
+            buckets[-1] += 1
+            self.latency[endpoint] = (buckets, total + seconds)
+            self.queries[endpoint] += queries
+            self.sql_seconds[endpoint] += sql_seconds
+            if repeated:
+                self.repeated[endpoint] += 1
+
+    def render(self):
+        """Prometheus text exposition format"""
+        with self._lock:
+            lines = [
+                '# HELP gymfit_http_requests_total HTTP requests by endpoint, method and status.',
+                '# TYPE gymfit_http_requests_total counter',
+            ]
+            for (endpoint, method, status), count in sorted(self.requests.items()):
+                lines.append(f'gymfit_http_requests_total{{endpoint="{endpoint}",method="{method}",'
+                             f'status="{status}"}} {count}')
+
+            lines += [
+                '# HELP gymfit_http_request_duration_seconds Request latency by endpoint.',
+                '# TYPE gymfit_http_request_duration_seconds histogram',
+            ]
+            for endpoint, (buckets, total) in sorted(self.latency.items()):
+                for bound, count in zip(LATENCY_BUCKETS, buckets):
+                    lines.append(f'gymfit_http_request_duration_seconds_bucket{{endpoint="{endpoint}",'
+                                 f'le="{bound}"}} {count}')
+                lines.append(f'gymfit_http_request_duration_seconds_bucket{{endpoint="{endpoint}",'
+                             f'le="+Inf"}} {buckets[-1]}')
+                lines.append(f'gymfit_http_request_duration_seconds_sum{{endpoint="{endpoint}"}} {total:.6f}')
+                lines.append(f'gymfit_http_request_duration_seconds_count{{endpoint="{endpoint}"}} {buckets[-1]}')
+
+            lines += [
+                '# HELP gymfit_db_queries_total SQL statements executed while handling requests.',
+                '# TYPE gymfit_db_queries_total counter',
+            ]
+            lines += [f'gymfit_db_queries_total{{endpoint="{endpoint}"}} {count}'
+                      for endpoint, count in sorted(self.queries.items())]
+
+            lines += [
+                '# HELP gymfit_db_query_seconds_total Time spent in SQL while handling requests.',
+                '# TYPE gymfit_db_query_seconds_total counter',
+            ]
+            lines += [f'gymfit_db_query_seconds_total{{endpoint="{endpoint}"}} {seconds:.6f}'
+                      for endpoint, seconds in sorted(self.sql_seconds.items())]
+
+            lines += [
+                '# HELP gymfit_db_repeated_query_requests_total Requests that ran one statement '
+                'at least SQL_REPEAT_THRESHOLD times (likely N+1).',
+                '# TYPE gymfit_db_repeated_query_requests_total counter',
+            ]
+            lines += [f'gymfit_db_repeated_query_requests_total{{endpoint="{endpoint}"}} {count}'
+                      for endpoint, count in sorted(self.repeated.items())]
+
+            lines += [
+                '# HELP gymfit_slow_request_profiles_total Profiles written for slow requests.',
+                '# TYPE gymfit_slow_request_profiles_total counter',
+                f'gymfit_slow_request_profiles_total {self.slow_profiles}',
+            ]
+        return lines
+
+
+metrics = RequestMetrics()
+
+# Extra metric sources (callables returning lines of exposition text)
+_collectors = []
+
+
+def register_collector(collector):
+    if collector not in _collectors:
+        _collectors.append(collector)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['query_start'].pop()
+    if not has_request_context() or 'instrumentation' not in g:
+        return
+    state = g.instrumentation
+    state['queries'] += 1
+    state['sql_seconds'] += time.perf_counter() - started
+    state['statements'][statement] += 1
+
+
+def _discard_query_timer(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get('query_start'):
+        connection.info['query_start'].pop()
+
+
+def _start_request():
+    g.instrumentation = {
+        'start': time.perf_counter(),
+        'queries': 0,
+        'sql_seconds': 0.0,
+        'statements': Counter(),
+        'profiler': None
+    }
+    if current_app.config['PROFILE_SLOW_REQUEST_MS']:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+            g.instrumentation['profiler'] = profiler
+        except ValueError:
+            # Another profiler is already active in this thread
+            pass
+
+
+def _dump_profile(profiler, endpoint, elapsed_ms):
+    directory = current_app.config['PROFILE_DIR']
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f'{time.strftime("%Y%m%d-%H%M%S")}-{endpoint}-{elapsed_ms:.0f}ms.prof')
+    profiler.dump_stats(path)
+    with metrics._lock:
+        metrics.slow_profiles += 1
+    print(f"Slow request {request.method} {request.path} took {elapsed_ms:.0f} ms, profile saved to {path}")
+
+
+def _finish_request(response):
+    state = g.pop('instrumentation', None)
+    if state is None:
+        return response
+
+    elapsed = time.perf_counter() - state['start']
+    endpoint = request.endpoint or 'unmatched'
+    config = current_app.config
+
+    repeated = [(statement, count) for statement, count in state['statements'].items()
+                if count >= config['SQL_REPEAT_THRESHOLD']]
+    for statement, count in repeated:
+        print(f"Possible N+1 in {endpoint}: statement ran {count} times: {' '.join(statement.split())[:200]}")
+
+    profiler = state['profiler']
+    if profiler is not None:
+        profiler.disable()
+        if elapsed * 1000 >= config['PROFILE_SLOW_REQUEST_MS']:
+            _dump_profile(profiler, endpoint, elapsed * 1000)
+
+    if endpoint != 'metrics':
+        metrics.observe(endpoint, request.method, response.status_code, elapsed,
+                        state['queries'], state['sql_seconds'], bool(repeated))
+
+    response.headers.add('Server-Timing', f'app;dur={elapsed * 1000:.1f}')
+    response.headers.add('Server-Timing',
+                         f'db;dur={state["sql_seconds"] * 1000:.1f};desc="{state["queries"]} queries"')
+    return response
+
+
+def _teardown_request(exc):
+    # after_request is skipped when a view raises, make sure the profiler stops
+    state = g.pop('instrumentation', None)
+    if state is not None and state['profiler'] is not None:
+        state['profiler'].disable()
+
+
+def metrics_view():
+    """Prometheus scrape endpoint (optionally protected by METRICS_TOKEN)"""
+    token = current_app.config['METRICS_TOKEN']
+    if token and not secrets.compare_digest(request.headers.get('Authorization', '').encode(),
+                                            f'Bearer {token}'.encode()):
+        return {'error': 'Unauthorized'}, 401
+
+    lines = metrics.render()
+    for collector in _collectors:
+        lines += collector()
+    return Response('\n'.join(lines) + '\n', mimetype='text/plain; version=0.0.4')
+
+
+def init_instrumentation(app, engines):
+    """Record per-request latency and SQL usage, serve it on /metrics.
+
+    Adds a Server-Timing header (total and SQL time) to every response,
+    logs statements repeated SQL_REPEAT_THRESHOLD times within one request,
+    and, when PROFILE_SLOW_REQUEST_MS is set, profiles each request with
+    cProfile and keeps the profile of any request slower than that.
+    """
+    for engine in engines:
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(engine, 'handle_error', _discard_query_timer)
+
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.teardown_request(_teardown_request)
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
@@ -0,0 +1,262 @@
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import func, insert
+
+from models import db, OutboxEmail
+
+# Recent send latencies (seconds) observed by workers in this process
+_send_latencies = deque(maxlen=1000)
+_stats_lock = threading.Lock()
+_counters = {'sent': 0, 'failed': 0, 'dead': 0}
+
+_worker = None
+_worker_lock = threading.Lock()
+_mail_lock = threading.Lock()
+
+
+def enqueue_email(subject, recipient, html, start_worker=True):
+    """Add an email to the outbox.
+
+    The row joins the caller's session, so it is committed (and later sent)
+    together with whatever the request is saving. Nothing talks to SMTP here.
+    With MAIL_QUEUE_INLINE_WORKER the web process starts its sending thread;
+    CLI and batch callers pass start_worker=False and leave the outbox to
+    `mail-worker`, as their process exits before the thread could send.
+    """
+    email = OutboxEmail(
+        recipient=recipient,
+        subject=subject,
+        html=html,
+        status='pending',
+        attempts=0,
+        next_attempt_at=datetime.utcnow()
+    )
+    db.session.add(email)
+
+    if start_worker and current_app.config['MAIL_QUEUE_INLINE_WORKER']:
+        ensure_worker_started(current_app._get_current_object())
+
+    return email
+
+
+def enqueue_emails(subject, messages, start_worker=True):
+    """Add many emails to the outbox with one executemany insert.
+
+    `messages` is a list of (recipient, html) pairs. Like enqueue_email, the
+    rows are committed by the caller.
+    """
+    if not messages:
+        return 0
+    now = datetime.utcnow()
+    db.session.execute(insert(OutboxEmail), [{
+        'recipient': recipient,
+        'subject': subject,
+        'html': html,
+        'status': 'pending',
+        'attempts': 0,
+        'next_attempt_at': now
+    } for recipient, html in messages])
+
+    if start_worker and current_app.config['MAIL_QUEUE_INLINE_WORKER']:
+        ensure_worker_started(current_app._get_current_object())
+
+    return len(messages)
+
+
+def _claim_batch(batch_size, lease_seconds):
+    """Claim up to batch_size due emails for this worker.
+
+    The claim is a conditional UPDATE so two workers (or two processes) never
+    send the same row. A claimed row is leased: if the worker dies, the row
+    becomes due again once the lease runs out.
+    """
+    now = datetime.utcnow()
+    candidates = [row.id for row in db.session.query(OutboxEmail.id).filter(
+        OutboxEmail.status.in_(['pending', 'sending']),
+        OutboxEmail.next_attempt_at <= now
+    ).order_by(OutboxEmail.next_attempt_at).limit(batch_size)]
+
+    if not candidates:
+        return []
+
+    lease_until = now + timedelta(seconds=lease_seconds)
+    claimed = []
+    for email_id in candidates:
+        updated = OutboxEmail.query.filter(
+            OutboxEmail.id == email_id,
+            OutboxEmail.status.in_(['pending', 'sending']),
+            OutboxEmail.next_attempt_at <= now
+        ).update({'status': 'sending', 'next_attempt_at': lease_until}, synchronize_session=False)
+        if updated:
+            claimed.append(email_id)
+    db.session.commit()
+
+    if not claimed:
+        return []
+    return OutboxEmail.query.filter(OutboxEmail.id.in_(claimed)).all()
+
+
+def _backoff(attempts, config):
+    """Exponential backoff delay before the next attempt"""
+    delay = config['MAIL_QUEUE_BACKOFF_BASE'] * (2 ** (attempts - 1))
+    return timedelta(seconds=min(delay, config['MAIL_QUEUE_BACKOFF_MAX']))
+
+
+def _record_failure(email, error, config):
+    email.attempts += 1
+    email.last_error = str(error)
+    if email.attempts >= config['MAIL_QUEUE_MAX_ATTEMPTS']:
+        # Dead letter: keep the row for inspection but stop retrying
+        email.status = 'dead'
+        with _stats_lock:
+            _counters['dead'] += 1
+        print(f"Email {email.id} to {email.recipient} dead-lettered after {email.attempts} attempts: {error}")
+    else:
+        email.status = 'pending'
+        email.next_attempt_at = datetime.utcnow() + _backoff(email.attempts, config)
+        with _stats_lock:
+            _counters['failed'] += 1
+
+
+def get_mail(app):
+    """The app's Flask-Mail instance, created on first send so processes that never send skip it"""
+    mail = app.extensions.get('mail')
+    if mail is None:
+        with _mail_lock:
+            mail = app.extensions.get('mail')
+            if mail is None:
+                from flask_mail import Mail
+                mail = Mail().init_app(app)
+    return mail
+
+
+def process_batch():
+    """Send one batch of due emails over a single SMTP connection.
+
+    Returns the number of emails claimed. Must run inside an app context.
+    """
+    config = current_app.config
+    batch = _claim_batch(config['MAIL_QUEUE_BATCH_SIZE'], config['MAIL_QUEUE_LEASE_SECONDS'])
+    if not batch:
+        return 0
+
+    from flask_mail import Message
+    mail = get_mail(current_app)
+    try:
+        with mail.connect() as connection:
+            for email in batch:
+                start = time.perf_counter()
+                try:
+                    connection.send(Message(
+                        subject=email.subject,
+                        recipients=[email.recipient],
+                        html=email.html
+                    ))
+                except Exception as e:
+                    _record_failure(email, e, config)
+                    continue
+
+                with _stats_lock:
+                    _send_latencies.append(time.perf_counter() - start)
+                    _counters['sent'] += 1
+                email.status = 'sent'
+                email.attempts += 1
+                email.sent_at = datetime.utcnow()
+                email.last_error = None
+    except Exception as e:
+        # Could not connect at all: every unsent email in the batch backs off
+        print(f"Error connecting to mail server: {e}")
+        for email in batch:
+            if email.status == 'sending':
+                _record_failure(email, e, config)
+
+    db.session.commit()
+    return len(batch)
+
+
+class MailWorker:
+    """Pool of threads draining the outbox in the background"""
+
+    def __init__(self, app, threads=2, poll_interval=1.0):
+        self.app = app
+        self.threads = threads
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        for i in range(self.threads):
+            thread = threading.Thread(target=self._run, name=f'mail-worker-{i}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.is_set():
+            with self.app.app_context():
+                try:
+                    sent = process_batch()
+                except Exception as e:
+                    print(f"Mail worker error: {e}")
+                    db.session.rollback()
+                    sent = 0
+                finally:
+                    db.session.remove()
+            # Keep draining while there is work, otherwise wait for the next poll
+            if not sent:
+                self._stop.wait(self.poll_interval)
+
+
+def ensure_worker_started(app):
+    """Start the in-process mail worker once per process"""
+    global _worker
+    if _worker is not None:
+        return _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = MailWorker(
+                app,
+                threads=app.config['MAIL_WORKER_THREADS'],
+                poll_interval=app.config['MAIL_QUEUE_POLL_INTERVAL']
+            )
+            _worker.start()
+    return _worker
+
+
+def _percentile(samples, pct):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(pct / 100.0 * len(ordered)))]
+
+
+def queue_stats():
+    """Queue depth by status plus send latency seen by this process's workers"""
+    depth = dict(db.session.query(OutboxEmail.status, func.count(OutboxEmail.id))
+                 .group_by(OutboxEmail.status).all())
+    oldest = db.session.query(func.min(OutboxEmail.created_at)).filter(
+        OutboxEmail.status.in_(['pending', 'sending'])
+    ).scalar()
+
+    with _stats_lock:
+        latencies = list(_send_latencies)
+        counters = dict(_counters)
+
+    return {
+        'pending': depth.get('pending', 0),
+        'sending': depth.get('sending', 0),
+        'sent': depth.get('sent', 0),
+        'dead': depth.get('dead', 0),
+        'oldest_pending_age_seconds': (datetime.utcnow() - oldest).total_seconds() if oldest else 0,
+        'send_latency_p50_ms': round(_percentile(latencies, 50) * 1000, 2) if latencies else None,
+        'send_latency_p95_ms': round(_percentile(latencies, 95) * 1000, 2) if latencies else None,
+        'worker_counters': counters
+    }
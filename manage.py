@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""
+Entry point for CLI commands and batch jobs, without the web routes,
+CSRF, static assets or instrumentation, e.g.
+
+    python3 manage.py expiry-reminders
+    flask --app manage db upgrade
+
+Run directly, it also skips the plugins the flask command loads on start
+(Flask-Migrate and alembic), so cron jobs start faster.
+"""
+
+from flask.cli import ScriptInfo
+
+from commands import register_commands
+from factory import create_app
+
+app = create_app()
+register_commands(app)
+
+if __name__ == '__main__':
+    app.cli.main(obj=ScriptInfo(create_app=lambda: app))
@@ -0,0 +1,214 @@
+import csv
+import io
+import re
+import time
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import func, insert, select, update
+
+from dates import parse_date
+from models import db, Member
+from payments import _amount
+from plans import get_plan
+from search import index_members
+from sequences import next_member_ids
+
+# Columns written by the export and understood by the import, in order.
+# member_id is informational on import: rows are matched on email and new
+# members always get an ID from the member sequence.
+CSV_COLUMNS = [
+    'member_id', 'first_name', 'last_name', 'email', 'phone', 'dob', 'gender', 'address',
+    'membership_type', 'amount', 'join_date', 'expiry_date', 'status',
+    'payment_status', 'payment_method', 'transaction_id', 'payment_date'
+]
+REQUIRED_COLUMNS = ('first_name', 'last_name', 'email', 'phone', 'membership_type', 'amount')
+
+STATUSES = ('active', 'inactive', 'expired')
+PAYMENT_STATUSES = ('pending', 'paid', 'failed')
+GENDERS = ('male', 'female', 'other')
+EMAIL_RE = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+
+# Maximum length of each string column, checked before the insert
+_LENGTHS = {column.name: column.type.length for column in Member.__table__.columns
+            if getattr(column.type, 'length', None)}
+
+
+def validate_row(row):
+    """Clean one CSV row into Member column values, raises ValueError with the reason"""
+    row = {key.strip().lower(): (value or '').strip() for key, value in row.items() if key}
+
+    missing = [column for column in REQUIRED_COLUMNS if not row.get(column)]
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
+
+    email = row['email'].lower()
+    if not EMAIL_RE.match(email):
+        raise ValueError(f'invalid email {email!r}')
+
+    plan = get_plan(row['membership_type'])
+    if plan is None:
+        raise ValueError(f"unknown membership_type {row['membership_type']!r}")
+
+    try:
+        amount = _amount(row['amount'])
+    except ValueError:
+        raise ValueError(f"invalid amount {row['amount']!r}")
+    if amount < 0:
+        raise ValueError('amount must not be negative')
+
+    dates = {}
+    for column in ('dob', 'join_date', 'expiry_date', 'payment_date'):
+        dates[column] = parse_date(row.get(column))
+        if row.get(column) and dates[column] is None:
+            raise ValueError(f'invalid {column} {row[column]!r}')
+
+    join_date = dates['join_date'] or date.today()
+    expiry_date = dates['expiry_date'] or join_date + timedelta(days=plan['duration_days'])
+    if expiry_date < join_date:
+        raise ValueError('expiry_date is before join_date')
+
+    status = (row.get('status') or 'active').lower()
+    if status not in STATUSES:
+        raise ValueError(f'invalid status {status!r}')
+    payment_status = (row.get('payment_status') or 'pending').lower()
+    if payment_status not in PAYMENT_STATUSES:
+        raise ValueError(f'invalid payment_status {payment_status!r}')
+    gender = row.get('gender', '').lower() or None
+    if gender and gender not in GENDERS:
+        raise ValueError(f'invalid gender {gender!r}')
+
+    values = {
+        'first_name': row['first_name'],
+        'last_name': row['last_name'],
+        'email': email,
+        'phone': row['phone'],
+        'dob': dates['dob'],
+        'gender': gender,
+        'address': row.get('address') or None,
+        'membership_type': plan['name'],
+        'amount': amount,
+        'join_date': join_date,
+        'expiry_date': expiry_date,
+        'status': status,
+        'payment_status': payment_status,
+        'payment_method': row.get('payment_method') or None,
+        'transaction_id': row.get('transaction_id') or None,
+        'payment_date': dates['payment_date']
+    }
+    for column, value in values.items():
+        if isinstance(value, str) and column in _LENGTHS and len(value) > _LENGTHS[column]:
+            raise ValueError(f'{column} longer than {_LENGTHS[column]} characters')
+    return values
+
+
+def _write_chunk(rows):
+    """Upsert one chunk of validated rows on email, returns (inserted, updated)"""
+    # Later rows for the same email win
+    by_email = {}
+    for values in rows:
+        by_email[values['email']] = values
+
+    # Emails are lowercased by validate_row, but members may have been stored in mixed case
+    existing = dict(db.session.execute(
+        select(func.lower(Member.email), Member.id).where(func.lower(Member.email).in_(list(by_email)))
+    ).all())
+
+    now = datetime.utcnow()
+    updates = []
+    inserts = []
+    for email, values in by_email.items():
+        if email in existing:
+            updates.append(dict(values, id=existing[email], updated_at=now))
+        else:
+            inserts.append(dict(values, created_at=now, updated_at=now))
+
+    if updates:
+        db.session.execute(update(Member), updates)
+    if inserts:
+        for values, member_id in zip(inserts, next_member_ids(len(inserts))):
+            values['member_id'] = member_id
+        db.session.execute(insert(Member), inserts)
+
+    # Bulk statements skip the ORM events that maintain the search index
+    member_ids = [values['member_id'] for values in inserts]
+    if updates:
+        member_ids += db.session.execute(
+            select(Member.member_id).where(Member.id.in_([values['id'] for values in updates]))
+        ).scalars().all()
+    index_members(member_ids)
+    db.session.commit()
+    return len(inserts), len(updates)
+
+
+def import_members_csv(text_stream, chunk_size=1000, rejects=None):
+    """Import members from a CSV text stream, upserting on email.
+
+    Rows are read and validated one at a time and written in chunks of
+    `chunk_size` with executemany (one commit per chunk), so the file is
+    never held in memory. Invalid rows are written to `rejects` (a text
+    stream) with an extra `error` column. Returns a summary dict.
+    """
+    start = time.perf_counter()
+    reader = csv.DictReader(text_stream)
+    if not reader.fieldnames or not set(REQUIRED_COLUMNS) <= {name.strip().lower() for name in reader.fieldnames if name}:
+        raise ValueError(f"CSV header must include: {', '.join(REQUIRED_COLUMNS)}")
+
+    rejects_writer = None
+    if rejects is not None:
+        rejects_writer = csv.DictWriter(rejects, fieldnames=reader.fieldnames + ['line', 'error'],
+                                        extrasaction='ignore')
+        rejects_writer.writeheader()
+
+    summary = {'rows': 0, 'inserted': 0, 'updated': 0, 'rejected': 0}
+    chunk = []
+    for row in reader:
+        summary['rows'] += 1
+        try:
+            chunk.append(validate_row(row))
+        except ValueError as e:
+            summary['rejected'] += 1
+            if rejects_writer is not None:
+                rejects_writer.writerow(dict(row, line=reader.line_num, error=str(e)))
+            continue
+
+        if len(chunk) >= chunk_size:
+            inserted, updated = _write_chunk(chunk)
+            summary['inserted'] += inserted
+            summary['updated'] += updated
+            chunk = []
+
+    if chunk:
+        inserted, updated = _write_chunk(chunk)
+        summary['inserted'] += inserted
+        summary['updated'] += updated
+
+    elapsed = time.perf_counter() - start
+    summary['seconds'] = round(elapsed, 3)
+    summary['rows_per_second'] = round(summary['rows'] / elapsed, 1) if elapsed else None
+    return summary
+
+
+def export_members_csv(status=None, chunk_size=1000):
+    """Yield the members table as CSV text, a chunk of rows at a time.
+
+    Rows are streamed from the database with yield_per, so memory use stays
+    flat regardless of table size.
+    """
+    columns = [getattr(Member, name) for name in CSV_COLUMNS]
+    query = select(*columns).order_by(Member.id)
+    if status:
+        query = query.where(Member.status == status)
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+
+    result = db.session.execute(query.execution_options(yield_per=chunk_size))
+    for partition in result.partitions():
+        writer.writerows(partition)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
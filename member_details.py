@@ -0,0 +1,71 @@
+import hashlib
+import json
+
+from flask import current_app
+from sqlalchemy import select
+
+from cache import TTLCache, invalidate_on_commit
+from models import db, Member
+from search import member_result
+
+# member_id -> serialized detail entry (None for unknown IDs). Dropped on any
+# commit that writes to members, so edits and deletes are never served stale.
+_detail_cache = TTLCache(ttl=300, maxsize=10000)
+invalidate_on_commit(Member, _detail_cache.clear)
+
+# Keep IN lists under SQLite's bound parameter limit
+LOOKUP_CHUNK_SIZE = 500
+
+
+def _entry(member):
+    """Member JSON serialized once, with validators derived from updated_at"""
+    changed_at = member.updated_at or member.created_at
+    version = changed_at.isoformat() if changed_at else ''
+    return {
+        'json': json.dumps(member_result(member), separators=(',', ':')),
+        'etag': hashlib.sha1(f'{member.member_id}:{version}'.encode()).hexdigest()[:20],
+        'last_modified': changed_at
+    }
+
+
+def _load_entries(member_ids):
+    entries = dict.fromkeys(member_ids)
+    for start in range(0, len(member_ids), LOOKUP_CHUNK_SIZE):
+        chunk = member_ids[start:start + LOOKUP_CHUNK_SIZE]
+        for member in db.session.execute(select(Member).where(Member.member_id.in_(chunk))).scalars():
+            entries[member.member_id] = _entry(member)
+    return entries
+
+
+def member_entries(member_ids):
+    """member_id -> detail entry (or None if unknown) from the cache, loading misses in one IN query.
+
+    Each entry holds the member's JSON ('json'), a weak ETag ('etag') and
+    'last_modified', both taken from Member.updated_at.
+    """
+    ttl = current_app.config['MEMBER_DETAIL_CACHE_TTL']
+    missing = object()
+    entries = {}
+    misses = []
+    for member_id in dict.fromkeys(member_ids):
+        entry = _detail_cache.get(member_id, missing) if ttl else missing
+        if entry is missing:
+            misses.append(member_id)
+        else:
+            entries[member_id] = entry
+
+    if misses:
+        loaded = _load_entries(misses)
+        if ttl:
+            for member_id, entry in loaded.items():
+                _detail_cache.set(member_id, entry, ttl=ttl)
+        entries.update(loaded)
+    return entries
+
+
+def batch_validators(entries):
+    """Combined ETag and Last-Modified for a batch of entries (in request order)"""
+    found = [entry for entry in entries if entry is not None]
+    digest = hashlib.sha1('|'.join(entry['etag'] if entry else '-' for entry in entries).encode())
+    last_modified = max((entry['last_modified'] for entry in found if entry['last_modified']), default=None)
+    return digest.hexdigest()[:20], last_modified
@@ -0,0 +1,108 @@
+"""initial schema
+
+Tables as created by init_db.py before migrations were introduced. Tables
+that already exist are left alone, so databases created with db.create_all()
+can simply run `flask db upgrade`.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 09:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if 'users' not in existing:
+        op.create_table(
+            'users',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('username', sa.String(length=80), nullable=False),
+            sa.Column('email', sa.String(length=120), nullable=False),
+            sa.Column('password_hash', sa.String(length=255), nullable=False),
+            sa.Column('role', sa.String(length=20), nullable=False),
+            sa.Column('name', sa.String(length=100), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('email'),
+            sa.UniqueConstraint('username')
+        )
+
+    if 'members' not in existing:
+        op.create_table(
+            'members',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('member_id', sa.String(length=20), nullable=False),
+            sa.Column('first_name', sa.String(length=50), nullable=False),
+            sa.Column('last_name', sa.String(length=50), nullable=False),
+            sa.Column('email', sa.String(length=120), nullable=False),
+            sa.Column('phone', sa.String(length=20), nullable=False),
+            sa.Column('dob', sa.String(length=20), nullable=True),
+            sa.Column('gender', sa.String(length=10), nullable=True),
+            sa.Column('address', sa.Text(), nullable=True),
+            sa.Column('membership_type', sa.String(length=50), nullable=False),
+            sa.Column('amount', sa.Float(), nullable=False),
+            sa.Column('join_date', sa.String(length=20), nullable=False),
+            sa.Column('expiry_date', sa.String(length=20), nullable=False),
+            sa.Column('status', sa.String(length=20), nullable=False),
+            sa.Column('payment_status', sa.String(length=20), nullable=True),
+            sa.Column('payment_method', sa.String(length=50), nullable=True),
+            sa.Column('transaction_id', sa.String(length=100), nullable=True),
+            sa.Column('payment_date', sa.String(length=20), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('email'),
+            sa.UniqueConstraint('member_id')
+        )
+
+    if 'pending_registrations' not in existing:
+        op.create_table(
+            'pending_registrations',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('registration_id', sa.String(length=20), nullable=False),
+            sa.Column('first_name', sa.String(length=50), nullable=False),
+            sa.Column('last_name', sa.String(length=50), nullable=False),
+            sa.Column('email', sa.String(length=120), nullable=False),
+            sa.Column('phone', sa.String(length=20), nullable=False),
+            sa.Column('dob', sa.String(length=20), nullable=True),
+            sa.Column('gender', sa.String(length=10), nullable=True),
+            sa.Column('address', sa.Text(), nullable=True),
+            sa.Column('membership_type', sa.String(length=50), nullable=False),
+            sa.Column('registration_date', sa.String(length=20), nullable=False),
+            sa.Column('status', sa.String(length=20), nullable=False),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('email'),
+            sa.UniqueConstraint('registration_id')
+        )
+
+    if 'password_reset_tokens' not in existing:
+        op.create_table(
+            'password_reset_tokens',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('token', sa.String(length=100), nullable=False),
+            sa.Column('expires_at', sa.DateTime(), nullable=False),
+            sa.Column('used', sa.Boolean(), nullable=True),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('token')
+        )
+
+
+def downgrade():
+    op.drop_table('password_reset_tokens')
+    op.drop_table('pending_registrations')
+    op.drop_table('members')
+    op.drop_table('users')
@@ -0,0 +1,81 @@
+"""email outbox, id sequences, expiry reminders and member listing indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 09:10:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+MEMBER_INDEXES = [
+    ('ix_members_created_at_id', ['created_at', 'id']),
+    ('ix_members_status_created_at', ['status', 'created_at', 'id']),
+    ('ix_members_status_expiry_date', ['status', 'expiry_date']),
+    ('ix_members_payment_date', ['payment_date']),
+    ('ix_members_status_membership_type', ['status', 'membership_type']),
+]
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    existing = set(inspector.get_table_names())
+
+    if 'email_outbox' not in existing:
+        op.create_table(
+            'email_outbox',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('recipient', sa.String(length=120), nullable=False),
+            sa.Column('subject', sa.String(length=255), nullable=False),
+            sa.Column('html', sa.Text(), nullable=False),
+            sa.Column('status', sa.String(length=20), nullable=False),
+            sa.Column('attempts', sa.Integer(), nullable=False),
+            sa.Column('last_error', sa.Text(), nullable=True),
+            sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+            sa.Column('created_at', sa.DateTime(), nullable=True),
+            sa.Column('sent_at', sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('ix_email_outbox_status_next_attempt', 'email_outbox',
+                        ['status', 'next_attempt_at'])
+
+    if 'id_sequences' not in existing:
+        op.create_table(
+            'id_sequences',
+            sa.Column('name', sa.String(length=50), nullable=False),
+            sa.Column('next_value', sa.Integer(), nullable=False),
+            sa.PrimaryKeyConstraint('name')
+        )
+
+    if 'expiry_reminders' not in existing:
+        op.create_table(
+            'expiry_reminders',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('member_pk', sa.Integer(), nullable=False),
+            sa.Column('expiry_date', sa.String(length=20), nullable=False),
+            sa.Column('sent_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['member_pk'], ['members.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id'),
+            sa.UniqueConstraint('member_pk', 'expiry_date', name='uq_expiry_reminders_member_expiry')
+        )
+
+    member_indexes = {index['name'] for index in inspector.get_indexes('members')}
+    for name, columns in MEMBER_INDEXES:
+        if name not in member_indexes:
+            op.create_index(name, 'members', columns)
+
+
+def downgrade():
+    for name, columns in reversed(MEMBER_INDEXES):
+        op.drop_index(name, table_name='members')
+    op.drop_table('expiry_reminders')
+    op.drop_table('id_sequences')
+    op.drop_index('ix_email_outbox_status_next_attempt', table_name='email_outbox')
+    op.drop_table('email_outbox')
@@ -0,0 +1,144 @@
+"""native date columns for members, registrations and expiry reminders
+
+Converts the YYYY-MM-DD string columns to DATE. Values are copied into new
+columns in chunks of BACKFILL_CHUNK rows (so large tables are never loaded
+at once), then the old columns are dropped and the new ones renamed.
+Adds indexes for expiry-window and join-date range queries.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 09:20:00
+
+"""
+from datetime import date, datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+BACKFILL_CHUNK = 5000
+
+# table -> [(column, nullable)]
+DATE_COLUMNS = {
+    'members': [('join_date', False), ('expiry_date', False), ('payment_date', True), ('dob', True)],
+    'pending_registrations': [('registration_date', False)],
+    'expiry_reminders': [('expiry_date', False)],
+}
+
+DATE_FORMATS = ('%Y-%m-%d', '%d-%m-%Y', '%d/%m/%Y', '%Y/%m/%d')
+
+
+def _parse_date(value):
+    if value is None or isinstance(value, date):
+        return value
+    value = str(value).strip()[:10]
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def _format_date(value):
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return value[:10]
+    return value.isoformat()
+
+
+def _backfill(table_name, columns, new_type, convert, fallback):
+    """Copy each column into <column>_new, converting values chunk by chunk"""
+    bind = op.get_bind()
+    table = sa.table(table_name, sa.column('id', sa.Integer),
+                     *[sa.column(name) for name, _ in columns],
+                     *[sa.column(f'{name}_new', new_type) for name, _ in columns])
+
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(table.c.id, *[table.c[name] for name, _ in columns])
+            .where(table.c.id > last_id).order_by(table.c.id).limit(BACKFILL_CHUNK)
+        ).fetchall()
+        if not rows:
+            break
+
+        params = []
+        for row in rows:
+            values = {'row_id': row[0]}
+            for i, (name, nullable) in enumerate(columns, start=1):
+                value = convert(row[i])
+                if value is None and not nullable:
+                    value = fallback
+                values[f'{name}_new'] = value
+            params.append(values)
+
+        bind.execute(
+            table.update().where(table.c.id == sa.bindparam('row_id'))
+            .values({f'{name}_new': sa.bindparam(f'{name}_new') for name, _ in columns}),
+            params
+        )
+        last_id = rows[-1][0]
+
+
+def _convert_table(table_name, columns, new_type, convert, fallback):
+    with op.batch_alter_table(table_name) as batch_op:
+        for name, _ in columns:
+            batch_op.add_column(sa.Column(f'{name}_new', new_type, nullable=True))
+
+    _backfill(table_name, columns, new_type, convert, fallback)
+
+    with op.batch_alter_table(table_name) as batch_op:
+        for name, nullable in columns:
+            batch_op.drop_column(name)
+            batch_op.alter_column(f'{name}_new', new_column_name=name,
+                                  existing_type=new_type, nullable=nullable)
+
+
+def _drop_date_indexes():
+    op.drop_index('ix_members_status_expiry_date', table_name='members')
+    op.drop_index('ix_members_payment_date', table_name='members')
+    with op.batch_alter_table('expiry_reminders') as batch_op:
+        batch_op.drop_constraint('uq_expiry_reminders_member_expiry', type_='unique')
+
+
+def _create_date_indexes():
+    op.create_index('ix_members_status_expiry_date', 'members', ['status', 'expiry_date'])
+    op.create_index('ix_members_payment_date', 'members', ['payment_date'])
+    with op.batch_alter_table('expiry_reminders') as batch_op:
+        batch_op.create_unique_constraint('uq_expiry_reminders_member_expiry', ['member_pk', 'expiry_date'])
+
+
+def upgrade():
+    _drop_date_indexes()
+
+    today = date.today()
+    for table_name, columns in DATE_COLUMNS.items():
+        _convert_table(table_name, columns, sa.Date(), _parse_date, today)
+
+    _create_date_indexes()
+    # "Expiring between X and Y" and "joined this month" range scans
+    op.create_index('ix_members_expiry_date', 'members', ['expiry_date'])
+    op.create_index('ix_members_join_date', 'members', ['join_date'])
+    op.create_index('ix_pending_registrations_registration_date', 'pending_registrations',
+                    ['registration_date'])
+
+
+def downgrade():
+    op.drop_index('ix_pending_registrations_registration_date', table_name='pending_registrations')
+    op.drop_index('ix_members_join_date', table_name='members')
+    op.drop_index('ix_members_expiry_date', table_name='members')
+    _drop_date_indexes()
+
+    today = date.today().isoformat()
+    for table_name, columns in DATE_COLUMNS.items():
+        _convert_table(table_name, columns, sa.String(length=20), _format_date, today)
+
+    _create_date_indexes()
@@ -0,0 +1,56 @@
+"""payments ledger
+
+Creates the payments table and seeds it with the one payment each member
+row currently records (members with a transaction_id and payment_date).
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 16:10:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'payments',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('transaction_id', sa.String(length=100), nullable=False),
+        sa.Column('member_pk', sa.Integer(), nullable=True),
+        sa.Column('gateway', sa.String(length=30), nullable=False),
+        sa.Column('amount', sa.Float(), nullable=False),
+        sa.Column('currency', sa.String(length=3), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('paid_at', sa.DateTime(), nullable=False),
+        sa.Column('reconciliation_status', sa.String(length=20), nullable=False),
+        sa.Column('reconciled_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['member_pk'], ['members.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('transaction_id')
+    )
+    op.create_index('ix_payments_member_paid_at', 'payments', ['member_pk', 'paid_at'])
+    op.create_index('ix_payments_gateway_paid_at', 'payments', ['gateway', 'paid_at'])
+
+    op.execute(
+        "INSERT INTO payments (transaction_id, member_pk, gateway, amount, currency, status, paid_at, "
+        "reconciliation_status, created_at) "
+        "SELECT transaction_id, id, lower(coalesce(payment_method, 'unknown')), amount, 'BDT', 'completed', "
+        "payment_date, 'unreconciled', CURRENT_TIMESTAMP "
+        "FROM members WHERE transaction_id IS NOT NULL AND payment_date IS NOT NULL "
+        "AND payment_status = 'paid'"
+    )
+
+
+def downgrade():
+    op.drop_index('ix_payments_gateway_paid_at', table_name='payments')
+    op.drop_index('ix_payments_member_paid_at', table_name='payments')
+    op.drop_table('payments')
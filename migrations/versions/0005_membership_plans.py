@@ -0,0 +1,51 @@
+"""membership plans
+
+Moves plan pricing and duration out of the code into a plans table,
+seeded with the values that used to be hard-coded.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 18:40:00
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+DEFAULT_PLANS = [
+    {'code': 'basic', 'name': 'Basic Plan', 'price': 2500, 'duration_days': 30, 'sort_order': 1},
+    {'code': 'standard', 'name': 'Standard Plan', 'price': 4500, 'duration_days': 30, 'sort_order': 2},
+    {'code': 'premium', 'name': 'Premium Plan', 'price': 7500, 'duration_days': 365, 'sort_order': 3},
+]
+
+
+def upgrade():
+    plans = op.create_table(
+        'plans',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('code', sa.String(length=20), nullable=False),
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('price', sa.Float(), nullable=False),
+        sa.Column('duration_days', sa.Integer(), nullable=False),
+        sa.Column('active', sa.Boolean(), nullable=False),
+        sa.Column('sort_order', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('code'),
+        sa.UniqueConstraint('name')
+    )
+    now = datetime.utcnow()
+    op.bulk_insert(plans, [dict(plan, active=True, created_at=now, updated_at=now) for plan in DEFAULT_PLANS])
+
+
+def downgrade():
+    op.drop_table('plans')
@@ -0,0 +1,76 @@
+"""hashed password reset tokens
+
+Replaces the plain token column with token_hash (SHA-256 hex), hashing
+outstanding tokens so links already emailed keep working, and adds the
+indexes used to drop a user's older tokens and to purge expired ones.
+Used and expired tokens are deleted first, there's no point converting them.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 20:15:00
+
+"""
+import hashlib
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+BACKFILL_CHUNK = 5000
+
+tokens = sa.table(
+    'password_reset_tokens',
+    sa.column('id', sa.Integer),
+    sa.column('token', sa.String),
+    sa.column('token_hash', sa.String),
+    sa.column('used', sa.Boolean),
+    sa.column('expires_at', sa.DateTime),
+)
+
+
+def upgrade():
+    bind = op.get_bind()
+    bind.execute(tokens.delete().where(sa.or_(tokens.c.used.is_(True), tokens.c.expires_at < datetime.utcnow())))
+
+    op.add_column('password_reset_tokens', sa.Column('token_hash', sa.String(length=64), nullable=True))
+
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(tokens.c.id, tokens.c.token)
+            .where(tokens.c.id > last_id).order_by(tokens.c.id).limit(BACKFILL_CHUNK)
+        ).fetchall()
+        if not rows:
+            break
+        bind.execute(
+            tokens.update().where(tokens.c.id == sa.bindparam('row_id')).values(token_hash=sa.bindparam('hash')),
+            [{'row_id': row_id, 'hash': hashlib.sha256(token.encode('utf-8')).hexdigest()} for row_id, token in rows]
+        )
+        last_id = rows[-1][0]
+
+    with op.batch_alter_table('password_reset_tokens') as batch_op:
+        batch_op.drop_column('token')
+        batch_op.alter_column('token_hash', existing_type=sa.String(length=64), nullable=False)
+        batch_op.create_unique_constraint('uq_password_reset_tokens_token_hash', ['token_hash'])
+        batch_op.create_index('ix_password_reset_tokens_user_id_used', ['user_id', 'used'])
+        batch_op.create_index('ix_password_reset_tokens_expires_at', ['expires_at'])
+
+
+def downgrade():
+    # Hashes can't be turned back into tokens, so outstanding reset links stop working
+    bind = op.get_bind()
+    bind.execute(tokens.delete())
+    with op.batch_alter_table('password_reset_tokens') as batch_op:
+        batch_op.drop_index('ix_password_reset_tokens_expires_at')
+        batch_op.drop_index('ix_password_reset_tokens_user_id_used')
+        batch_op.drop_constraint('uq_password_reset_tokens_token_hash', type_='unique')
+        batch_op.drop_column('token_hash')
+        batch_op.add_column(sa.Column('token', sa.String(length=100), nullable=False))
+        batch_op.create_unique_constraint('uq_password_reset_tokens_token', ['token'])
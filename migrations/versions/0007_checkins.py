@@ -0,0 +1,43 @@
+"""check-ins and hourly check-in rollup
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 22:05:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'checkins',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('member_pk', sa.Integer(), nullable=False),
+        sa.Column('checked_in_at', sa.DateTime(), nullable=False),
+        sa.Column('device', sa.String(length=50), nullable=True),
+        sa.ForeignKeyConstraint(['member_pk'], ['members.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_checkins_member_checked_in_at', 'checkins', ['member_pk', 'checked_in_at'])
+    op.create_index('ix_checkins_checked_in_at', 'checkins', ['checked_in_at'])
+    op.create_table(
+        'checkin_hours',
+        sa.Column('hour', sa.DateTime(), nullable=False),
+        sa.Column('checkins', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('hour')
+    )
+
+
+def downgrade():
+    op.drop_table('checkin_hours')
+    op.drop_index('ix_checkins_checked_in_at', table_name='checkins')
+    op.drop_index('ix_checkins_member_checked_in_at', table_name='checkins')
+    op.drop_table('checkins')
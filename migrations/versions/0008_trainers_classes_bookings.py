@@ -0,0 +1,73 @@
+"""trainers, class sessions and bookings
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 09:30:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008'
+down_revision = '0007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'trainers',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('email', sa.String(length=120), nullable=False),
+        sa.Column('phone', sa.String(length=20), nullable=True),
+        sa.Column('specialty', sa.String(length=100), nullable=True),
+        sa.Column('experience_years', sa.Integer(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('email')
+    )
+    op.create_table(
+        'class_sessions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(length=100), nullable=False),
+        sa.Column('trainer_id', sa.Integer(), nullable=True),
+        sa.Column('room', sa.String(length=50), nullable=True),
+        sa.Column('starts_at', sa.DateTime(), nullable=False),
+        sa.Column('ends_at', sa.DateTime(), nullable=False),
+        sa.Column('capacity', sa.Integer(), nullable=False),
+        sa.Column('booked_count', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.CheckConstraint('booked_count >= 0 AND booked_count <= capacity', name='ck_class_sessions_booked_count'),
+        sa.ForeignKeyConstraint(['trainer_id'], ['trainers.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_class_sessions_starts_at', 'class_sessions', ['starts_at'])
+    op.create_index('ix_class_sessions_trainer_starts_at', 'class_sessions', ['trainer_id', 'starts_at'])
+    op.create_table(
+        'bookings',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('session_id', sa.Integer(), nullable=False),
+        sa.Column('member_pk', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('cancelled_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['member_pk'], ['members.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['session_id'], ['class_sessions.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('session_id', 'member_pk', name='uq_bookings_session_member')
+    )
+    op.create_index('ix_bookings_member_pk_status', 'bookings', ['member_pk', 'status'])
+
+
+def downgrade():
+    op.drop_index('ix_bookings_member_pk_status', table_name='bookings')
+    op.drop_table('bookings')
+    op.drop_index('ix_class_sessions_trainer_starts_at', table_name='class_sessions')
+    op.drop_index('ix_class_sessions_starts_at', table_name='class_sessions')
+    op.drop_table('class_sessions')
+    op.drop_table('trainers')
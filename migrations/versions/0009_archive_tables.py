@@ -0,0 +1,94 @@
+"""archive tables for members and registrations, partial pending index
+
+Adds members_archive and pending_registrations_archive (filled by the
+archive job and by deleting a member) and a partial index over the
+registrations still waiting for approval.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 14:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0009'
+down_revision = '0008'
+branch_labels = None
+depends_on = None
+
+PENDING = sa.text("status = 'pending'")
+
+
+def upgrade():
+    op.create_table(
+        'members_archive',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('member_pk', sa.Integer(), nullable=False),
+        sa.Column('member_id', sa.String(length=20), nullable=False),
+        sa.Column('first_name', sa.String(length=50), nullable=False),
+        sa.Column('last_name', sa.String(length=50), nullable=False),
+        sa.Column('email', sa.String(length=120), nullable=False),
+        sa.Column('phone', sa.String(length=20), nullable=False),
+        sa.Column('dob', sa.Date(), nullable=True),
+        sa.Column('gender', sa.String(length=10), nullable=True),
+        sa.Column('address', sa.Text(), nullable=True),
+        sa.Column('membership_type', sa.String(length=50), nullable=False),
+        sa.Column('amount', sa.Float(), nullable=False),
+        sa.Column('join_date', sa.Date(), nullable=False),
+        sa.Column('expiry_date', sa.Date(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('payment_status', sa.String(length=20), nullable=True),
+        sa.Column('payment_method', sa.String(length=50), nullable=True),
+        sa.Column('transaction_id', sa.String(length=100), nullable=True),
+        sa.Column('payment_date', sa.Date(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.Column('username', sa.String(length=80), nullable=True),
+        sa.Column('password_hash', sa.String(length=255), nullable=True),
+        sa.Column('archive_reason', sa.String(length=20), nullable=False),
+        sa.Column('archived_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('member_id')
+    )
+    op.create_index('ix_members_archive_member_pk', 'members_archive', ['member_pk'])
+    op.create_index('ix_members_archive_email', 'members_archive', ['email'])
+    op.create_index('ix_members_archive_archived_at', 'members_archive', ['archived_at'])
+
+    op.create_table(
+        'pending_registrations_archive',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('registration_id', sa.String(length=20), nullable=False),
+        sa.Column('first_name', sa.String(length=50), nullable=False),
+        sa.Column('last_name', sa.String(length=50), nullable=False),
+        sa.Column('email', sa.String(length=120), nullable=False),
+        sa.Column('phone', sa.String(length=20), nullable=False),
+        sa.Column('dob', sa.String(length=20), nullable=True),
+        sa.Column('gender', sa.String(length=10), nullable=True),
+        sa.Column('address', sa.Text(), nullable=True),
+        sa.Column('membership_type', sa.String(length=50), nullable=False),
+        sa.Column('registration_date', sa.Date(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('archived_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('registration_id')
+    )
+    op.create_index('ix_pending_registrations_archive_email', 'pending_registrations_archive', ['email'])
+    op.create_index('ix_pending_registrations_archive_archived_at', 'pending_registrations_archive',
+                    ['archived_at'])
+
+    op.create_index('ix_pending_registrations_pending', 'pending_registrations', ['id'],
+                    sqlite_where=PENDING, postgresql_where=PENDING)
+
+
+def downgrade():
+    op.drop_index('ix_pending_registrations_pending', table_name='pending_registrations')
+    op.drop_index('ix_pending_registrations_archive_archived_at', table_name='pending_registrations_archive')
+    op.drop_index('ix_pending_registrations_archive_email', table_name='pending_registrations_archive')
+    op.drop_table('pending_registrations_archive')
+    op.drop_index('ix_members_archive_archived_at', table_name='members_archive')
+    op.drop_index('ix_members_archive_email', table_name='members_archive')
+    op.drop_index('ix_members_archive_member_pk', table_name='members_archive')
+    op.drop_table('members_archive')
@@ -0,0 +1,85 @@
+"""never reuse member ids, keep history when a member is archived
+
+Archiving deletes the members row, so on SQLite (which hands out
+max(id) + 1 without AUTOINCREMENT) the next new member got the archived
+member's id, and with it their payments, check-ins, bookings and expiry
+reminders. members is rebuilt with AUTOINCREMENT, seeded past every id
+already in members_archive. The foreign keys from those history tables to
+members are dropped: their rows outlive the members row and keep pointing
+at members_archive.member_pk, instead of being cascaded away (or set to
+NULL) on databases that enforce foreign keys.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18 16:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0010'
+down_revision = '0009'
+branch_labels = None
+depends_on = None
+
+# Names unnamed foreign keys on SQLite so batch mode can drop them
+NAMING_CONVENTION = {'fk': 'fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s'}
+
+# table -> ondelete of its member_pk foreign key before this revision
+HISTORY_TABLES = {
+    'expiry_reminders': 'CASCADE',
+    'payments': 'SET NULL',
+    'checkins': 'CASCADE',
+    'bookings': 'CASCADE',
+}
+
+
+def _member_fk_name(inspector, table_name):
+    for fk in inspector.get_foreign_keys(table_name):
+        if fk['referred_table'] == 'members':
+            return fk['name'] or f'fk_{table_name}_member_pk_members'
+    return None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    for table_name in HISTORY_TABLES:
+        name = _member_fk_name(inspector, table_name)
+        if name:
+            with op.batch_alter_table(table_name, naming_convention=NAMING_CONVENTION) as batch_op:
+                batch_op.drop_constraint(name, type_='foreignkey')
+
+    if bind.dialect.name == 'sqlite':
+        # Server databases never reuse identity/sequence values; SQLite needs AUTOINCREMENT
+        with op.batch_alter_table('members', recreate='always',
+                                  table_kwargs={'sqlite_autoincrement': True}):
+            pass
+        highest = bind.execute(sa.text(
+            'SELECT MAX(id) FROM (SELECT MAX(id) AS id FROM members '
+            'UNION ALL SELECT MAX(member_pk) FROM members_archive)')).scalar()
+        if highest:
+            bind.execute(sa.text("DELETE FROM sqlite_sequence WHERE name = 'members'"))
+            bind.execute(sa.text("INSERT INTO sqlite_sequence (name, seq) VALUES ('members', :seq)"),
+                         {'seq': highest})
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        with op.batch_alter_table('members', recreate='always',
+                                  table_kwargs={'sqlite_autoincrement': False}):
+            pass
+
+    for table_name, ondelete in HISTORY_TABLES.items():
+        # Rows of archived members would violate the restored foreign keys
+        orphaned = f'{table_name}.member_pk NOT IN (SELECT id FROM members)'
+        if ondelete == 'SET NULL':
+            bind.execute(sa.text(f'UPDATE {table_name} SET member_pk = NULL WHERE {orphaned}'))
+        else:
+            bind.execute(sa.text(f'DELETE FROM {table_name} WHERE {orphaned}'))
+        with op.batch_alter_table(table_name) as batch_op:
+            batch_op.create_foreign_key(f'fk_{table_name}_member_pk_members', 'members',
+                                        ['member_pk'], ['id'], ondelete=ondelete)
@@ -0,0 +1,27 @@
+"""case-insensitive index on member emails
+
+The CSV import matches existing members on lower(email); this expression
+index keeps that lookup off a full scan of members.
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18 17:00:00
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0011'
+down_revision = '0010'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_members_email_lower', 'members', [sa.text('lower(email)')])
+
+
+def downgrade():
+    op.drop_index('ix_members_email_lower', table_name='members')
@@ -22,6 +22,25 @@ class User(db.Model):
 class Member(db.Model):
     """Member model for gym members"""
     __tablename__ = 'members'
+    __table_args__ = (
+        # Keyset pagination and "recent members" (ORDER BY created_at DESC, id DESC)
+        db.Index('ix_members_created_at_id', 'created_at', 'id'),
+        # Listing filtered by status, newest first
+        db.Index('ix_members_status_created_at', 'status', 'created_at', 'id'),
+        # Expiry lookups by status (e.g. active members expiring this week)
+        db.Index('ix_members_status_expiry_date', 'status', 'expiry_date'),
+        # Date range scans: "expiring between X and Y", "joined this month"
+        db.Index('ix_members_expiry_date', 'expiry_date'),
+        db.Index('ix_members_join_date', 'join_date'),
+        # Revenue by period
+        db.Index('ix_members_payment_date', 'payment_date'),
+        # Dashboard counts by status and plan (covering index for the GROUP BY)
+        db.Index('ix_members_status_membership_type', 'status', 'membership_type'),
+        # Case-insensitive email matching (CSV import)
+        db.Index('ix_members_email_lower', db.text('lower(email)')),
+        # Archived members' ids stay with their history, so SQLite must never hand them out again
+        {'sqlite_autoincrement': True},
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     member_id = db.Column(db.String(20), unique=True, nullable=False)  # M001, M002, etc.
@@ -29,20 +48,20 @@ class Member(db.Model):
     last_name = db.Column(db.String(50), nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
     phone = db.Column(db.String(20), nullable=False)
-    dob = db.Column(db.String(20))  # Date of birth
+    dob = db.Column(db.Date)  # Date of birth
     gender = db.Column(db.String(10))  # male, female, other
     address = db.Column(db.Text)
     membership_type = db.Column(db.String(50), nullable=False)  # basic, standard, premium
     amount = db.Column(db.Float, nullable=False)
-    join_date = db.Column(db.String(20), nullable=False)
-    expiry_date = db.Column(db.String(20), nullable=False)
+    join_date = db.Column(db.Date, nullable=False)
+    expiry_date = db.Column(db.Date, nullable=False)
     status = db.Column(db.String(20), nullable=False, default='active')  # active, inactive, expired
     
     # Payment fields
     payment_status = db.Column(db.String(20), default='pending')  # pending, paid, failed
     payment_method = db.Column(db.String(50))  # cash, card, bkash, sslcommerz, etc.
     transaction_id = db.Column(db.String(100))
-    payment_date = db.Column(db.String(20))
+    payment_date = db.Column(db.Date)
     
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -54,6 +73,12 @@ class Member(db.Model):
 class PendingRegistration(db.Model):
     """Pending registration model for new member applications"""
     __tablename__ = 'pending_registrations'
+    __table_args__ = (
+        db.Index('ix_pending_registrations_registration_date', 'registration_date'),
+        # Admin queue (list and count): only rows still waiting, however many decided rows pile up
+        db.Index('ix_pending_registrations_pending', 'id',
+                 sqlite_where=db.text("status = 'pending'"), postgresql_where=db.text("status = 'pending'")),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     registration_id = db.Column(db.String(20), unique=True, nullable=False)  # REG001, REG002, etc.
@@ -65,20 +90,94 @@ class PendingRegistration(db.Model):
     gender = db.Column(db.String(10))
     address = db.Column(db.Text)
     membership_type = db.Column(db.String(50), nullable=False)  # basic, standard, premium
-    registration_date = db.Column(db.String(20), nullable=False)
+    registration_date = db.Column(db.Date, nullable=False)
     status = db.Column(db.String(20), nullable=False, default='pending')  # pending, approved, rejected
     
     def __repr__(self):
         return f'<PendingRegistration {self.registration_id} - {self.first_name} {self.last_name}>'
 
 
+class ArchivedMember(db.Model):
+    """Member moved out of the members table by archive.py (deleted, or expired long ago)"""
+    __tablename__ = 'members_archive'
+    __table_args__ = (
+        db.Index('ix_members_archive_member_pk', 'member_pk'),
+        db.Index('ix_members_archive_email', 'email'),
+        db.Index('ix_members_archive_archived_at', 'archived_at'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    member_pk = db.Column(db.Integer, nullable=False)  # members.id it had, still referenced by payments and check-ins
+    member_id = db.Column(db.String(20), unique=True, nullable=False)
+    first_name = db.Column(db.String(50), nullable=False)
+    last_name = db.Column(db.String(50), nullable=False)
+    email = db.Column(db.String(120), nullable=False)  # Not unique: the address may join (and leave) again
+    phone = db.Column(db.String(20), nullable=False)
+    dob = db.Column(db.Date)
+    gender = db.Column(db.String(10))
+    address = db.Column(db.Text)
+    membership_type = db.Column(db.String(50), nullable=False)
+    amount = db.Column(db.Float, nullable=False)
+    join_date = db.Column(db.Date, nullable=False)
+    expiry_date = db.Column(db.Date, nullable=False)
+    status = db.Column(db.String(20), nullable=False)  # Status when archived
+    payment_status = db.Column(db.String(20))
+    payment_method = db.Column(db.String(50))
+    transaction_id = db.Column(db.String(100))
+    payment_date = db.Column(db.Date)
+    created_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime)
+    
+    # The member's login, removed with the member and recreated on restore
+    username = db.Column(db.String(80))
+    password_hash = db.Column(db.String(255))
+    
+    archive_reason = db.Column(db.String(20), nullable=False)  # deleted, expired
+    archived_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<ArchivedMember {self.member_id} ({self.archive_reason})>'
+
+
+class ArchivedRegistration(db.Model):
+    """Approved or rejected registration moved out of pending_registrations by archive.py"""
+    __tablename__ = 'pending_registrations_archive'
+    __table_args__ = (
+        db.Index('ix_pending_registrations_archive_email', 'email'),
+        db.Index('ix_pending_registrations_archive_archived_at', 'archived_at'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    registration_id = db.Column(db.String(20), unique=True, nullable=False)
+    first_name = db.Column(db.String(50), nullable=False)
+    last_name = db.Column(db.String(50), nullable=False)
+    email = db.Column(db.String(120), nullable=False)
+    phone = db.Column(db.String(20), nullable=False)
+    dob = db.Column(db.String(20))
+    gender = db.Column(db.String(10))
+    address = db.Column(db.Text)
+    membership_type = db.Column(db.String(50), nullable=False)
+    registration_date = db.Column(db.Date, nullable=False)
+    status = db.Column(db.String(20), nullable=False)  # approved, rejected
+    archived_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<ArchivedRegistration {self.registration_id} ({self.status})>'
+
+
 class PasswordResetToken(db.Model):
-    """Password reset token model"""
+    """Password reset token model (only the SHA-256 of the emailed token is stored)"""
     __tablename__ = 'password_reset_tokens'
+    __table_args__ = (
+        # Dropping a user's older tokens when a new one is issued
+        db.Index('ix_password_reset_tokens_user_id_used', 'user_id', 'used'),
+        # Purge of expired tokens
+        db.Index('ix_password_reset_tokens_expires_at', 'expires_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
-    token = db.Column(db.String(100), unique=True, nullable=False)
+    token_hash = db.Column(db.String(64), unique=True, nullable=False)
     expires_at = db.Column(db.DateTime, nullable=False)
     used = db.Column(db.Boolean, default=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -86,4 +185,197 @@ class PasswordResetToken(db.Model):
     user = db.relationship('User', backref=db.backref('reset_tokens', lazy=True))
     
     def __repr__(self):
-        return f'<PasswordResetToken {self.token[:10]}...>'
+        return f'<PasswordResetToken {self.token_hash[:10]}...>'
+
+
+class OutboxEmail(db.Model):
+    """Outbound email waiting to be delivered by the mail worker"""
+    __tablename__ = 'email_outbox'
+    __table_args__ = (
+        # Worker claim query: due rows by status
+        db.Index('ix_email_outbox_status_next_attempt', 'status', 'next_attempt_at'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    recipient = db.Column(db.String(120), nullable=False)
+    subject = db.Column(db.String(255), nullable=False)
+    html = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending, sending, sent, dead
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    last_error = db.Column(db.Text)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime)
+    
+    def __repr__(self):
+        return f'<OutboxEmail {self.id} to {self.recipient} ({self.status})>'
+
+
+class IdSequence(db.Model):
+    """Counter used to hand out member and registration IDs without scanning their tables"""
+    __tablename__ = 'id_sequences'
+    
+    name = db.Column(db.String(50), primary_key=True)  # member, registration
+    next_value = db.Column(db.Integer, nullable=False, default=1)
+    
+    def __repr__(self):
+        return f'<IdSequence {self.name}={self.next_value}>'
+
+
+class ExpiryReminder(db.Model):
+    """Record of an expiry reminder sent for one membership period"""
+    __tablename__ = 'expiry_reminders'
+    __table_args__ = (
+        # One reminder per member per expiry date, so re-running the job is a no-op
+        db.UniqueConstraint('member_pk', 'expiry_date', name='uq_expiry_reminders_member_expiry'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    member_pk = db.Column(db.Integer, nullable=False)  # members.id or members_archive.member_pk
+    expiry_date = db.Column(db.Date, nullable=False)
+    sent_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<ExpiryReminder member={self.member_pk} expiry={self.expiry_date}>'
+
+
+class Payment(db.Model):
+    """One payment in the ledger (never overwritten, refunds are their own rows)"""
+    __tablename__ = 'payments'
+    __table_args__ = (
+        # Payment history per member
+        db.Index('ix_payments_member_paid_at', 'member_pk', 'paid_at'),
+        # Reconciliation window scans per gateway
+        db.Index('ix_payments_gateway_paid_at', 'gateway', 'paid_at'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    transaction_id = db.Column(db.String(100), unique=True, nullable=False)  # Gateway transaction ID (idempotency key)
+    member_pk = db.Column(db.Integer)  # members.id or members_archive.member_pk, no FK so archiving keeps it
+    gateway = db.Column(db.String(30), nullable=False)  # bkash, sslcommerz, cash, card
+    amount = db.Column(db.Float, nullable=False)
+    currency = db.Column(db.String(3), nullable=False, default='BDT')
+    status = db.Column(db.String(20), nullable=False, default='completed')  # completed, failed, refunded
+    paid_at = db.Column(db.DateTime, nullable=False)
+    
+    # Set by the settlement reconciliation job
+    reconciliation_status = db.Column(db.String(20), nullable=False, default='unreconciled')  # unreconciled, matched, mismatch, unsettled
+    reconciled_at = db.Column(db.DateTime)
+    
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<Payment {self.transaction_id} {self.amount} {self.currency} ({self.status})>'
+
+
+class Plan(db.Model):
+    """Membership plan with its price and duration (read through plans.get_plans())"""
+    __tablename__ = 'plans'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    code = db.Column(db.String(20), unique=True, nullable=False)  # basic, standard, premium
+    name = db.Column(db.String(50), unique=True, nullable=False)  # Stored in Member.membership_type
+    price = db.Column(db.Float, nullable=False)
+    duration_days = db.Column(db.Integer, nullable=False)
+    active = db.Column(db.Boolean, nullable=False, default=True)  # Inactive plans are kept for existing members
+    sort_order = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<Plan {self.code} {self.price} / {self.duration_days} days>'
+
+
+class CheckIn(db.Model):
+    """One front-desk scan (written in batches by checkins.CheckInBuffer)"""
+    __tablename__ = 'checkins'
+    __table_args__ = (
+        # Visit history per member
+        db.Index('ix_checkins_member_checked_in_at', 'member_pk', 'checked_in_at'),
+        db.Index('ix_checkins_checked_in_at', 'checked_in_at'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    member_pk = db.Column(db.Integer, nullable=False)  # members.id or members_archive.member_pk
+    checked_in_at = db.Column(db.DateTime, nullable=False)  # Gym local time
+    device = db.Column(db.String(50))  # Scanner that sent the check-in
+    
+    def __repr__(self):
+        return f'<CheckIn member={self.member_pk} at={self.checked_in_at}>'
+
+
+class CheckInHour(db.Model):
+    """Check-ins per hour, kept up to date as check-ins are flushed"""
+    __tablename__ = 'checkin_hours'
+    
+    hour = db.Column(db.DateTime, primary_key=True)  # Start of the hour, gym local time
+    checkins = db.Column(db.Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<CheckInHour {self.hour} {self.checkins}>'
+
+
+class Trainer(db.Model):
+    """Gym trainer"""
+    __tablename__ = 'trainers'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    email = db.Column(db.String(120), unique=True, nullable=False)
+    phone = db.Column(db.String(20))
+    specialty = db.Column(db.String(100))
+    experience_years = db.Column(db.Integer)
+    status = db.Column(db.String(20), nullable=False, default='active')  # active, inactive
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<Trainer {self.name}>'
+
+
+class ClassSession(db.Model):
+    """One scheduled class; booked_count is only changed by conditional UPDATEs in scheduling.py"""
+    __tablename__ = 'class_sessions'
+    __table_args__ = (
+        # Weekly schedule and per-trainer timetables
+        db.Index('ix_class_sessions_starts_at', 'starts_at'),
+        db.Index('ix_class_sessions_trainer_starts_at', 'trainer_id', 'starts_at'),
+        # Last line of defence against overbooking
+        db.CheckConstraint('booked_count >= 0 AND booked_count <= capacity', name='ck_class_sessions_booked_count'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    title = db.Column(db.String(100), nullable=False)
+    trainer_id = db.Column(db.Integer, db.ForeignKey('trainers.id', ondelete='SET NULL'))
+    room = db.Column(db.String(50))
+    starts_at = db.Column(db.DateTime, nullable=False)  # Gym local time
+    ends_at = db.Column(db.DateTime, nullable=False)
+    capacity = db.Column(db.Integer, nullable=False)
+    booked_count = db.Column(db.Integer, nullable=False, default=0)
+    status = db.Column(db.String(20), nullable=False, default='scheduled')  # scheduled, cancelled
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    trainer = db.relationship('Trainer', backref=db.backref('class_sessions', lazy=True))
+    
+    def __repr__(self):
+        return f'<ClassSession {self.title} {self.starts_at} {self.booked_count}/{self.capacity}>'
+
+
+class Booking(db.Model):
+    """A member's place in a class session (cancelled bookings are kept and can be re-booked)"""
+    __tablename__ = 'bookings'
+    __table_args__ = (
+        # One booking row per member per session
+        db.UniqueConstraint('session_id', 'member_pk', name='uq_bookings_session_member'),
+        # A member's upcoming bookings
+        db.Index('ix_bookings_member_pk_status', 'member_pk', 'status'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    session_id = db.Column(db.Integer, db.ForeignKey('class_sessions.id', ondelete='CASCADE'), nullable=False)
+    member_pk = db.Column(db.Integer, nullable=False)  # members.id or members_archive.member_pk
+    status = db.Column(db.String(20), nullable=False, default='booked')  # booked, cancelled
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    cancelled_at = db.Column(db.DateTime)
+    
+    def __repr__(self):
+        return f'<Booking session={self.session_id} member={self.member_pk} ({self.status})>'
@@ -0,0 +1,115 @@
+import base64
+import json
+from datetime import datetime
+
+from cache import QueryCache
+from models import db, Member
+
+# Member listing pages and the dashboard's recent members as plain dicts,
+# dropped by any commit that writes to members
+_member_pages = QueryCache('member_pages', models=[Member])
+
+LISTED_FIELDS = ('member_id', 'first_name', 'last_name', 'email', 'phone', 'join_date', 'membership_type',
+                 'amount', 'expiry_date', 'status')
+
+
+class KeysetPage:
+    """One page of a keyset (cursor) paginated query"""
+
+    def __init__(self, items, next_cursor, page_size):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.page_size = page_size
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def encode_cursor(created_at, row_id):
+    """Encode the (created_at, id) position of a row as an opaque URL-safe cursor"""
+    payload = json.dumps([created_at.isoformat() if created_at else None, row_id])
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by encode_cursor, returns None if it is malformed"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        created_at = datetime.fromisoformat(created_at) if created_at else None
+        return created_at, int(row_id)
+    except (ValueError, TypeError):
+        return None
+
+
+def clamp_page_size(page_size, default, maximum):
+    """Parse a requested page size and keep it within 1..maximum"""
+    try:
+        page_size = int(page_size)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(page_size, maximum))
+
+
+def paginate_members(query=None, cursor=None, page_size=25):
+    """Return the next page of members, newest first.
+
+    Uses a (created_at, id) keyset instead of OFFSET so every page costs the
+    same index range scan no matter how deep the user has scrolled.
+    """
+    if query is None:
+        query = Member.query
+
+    position = decode_cursor(cursor)
+    if position:
+        created_at, row_id = position
+        query = query.filter(
+            db.or_(
+                Member.created_at < created_at,
+                db.and_(Member.created_at == created_at, Member.id < row_id)
+            )
+        )
+
+    # Fetch one extra row to know whether another page exists
+    rows = query.order_by(Member.created_at.desc(), Member.id.desc()).limit(page_size + 1).all()
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+
+    return KeysetPage(rows, next_cursor, page_size)
+
+
+def _listed(member):
+    return {field: getattr(member, field) for field in LISTED_FIELDS}
+
+
+def cached_member_page(status=None, cursor=None, page_size=25):
+    """paginate_members() for the members page, optionally filtered by status, from the query cache"""
+    def load():
+        query = Member.query.filter_by(status=status) if status else Member.query
+        page = paginate_members(query, cursor=cursor, page_size=page_size)
+        return KeysetPage([_listed(member) for member in page.items], page.next_cursor, page_size)
+    return _member_pages.get_or_load(repr(('page', status, cursor, page_size)), load)
+
+
+def cached_recent_members(limit=5):
+    """recent_members() as plain dicts, from the query cache"""
+    return _member_pages.get_or_load(repr(('recent', limit)),
+                                     lambda: [_listed(member) for member in recent_members(limit)])
+
+
+def recent_members(limit=5):
+    """Return the most recently created members (ORDER BY created_at DESC LIMIT n)"""
+    return Member.query.order_by(Member.created_at.desc(), Member.id.desc()).limit(limit).all()
@@ -0,0 +1,390 @@
+import csv
+import math
+import time
+from datetime import datetime, time as dt_time, timedelta
+
+from sqlalchemy import and_, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+
+from dates import parse_date
+from models import db, Member, Payment
+
+GATEWAYS = ('bkash', 'sslcommerz', 'cash', 'card')
+PAYMENT_STATUSES = ('completed', 'failed', 'refunded')
+
+# Header names used by the gateways' merchant settlement exports, mapped to
+# the fields reconciliation needs. Matching is case-insensitive.
+SETTLEMENT_COLUMNS = {
+    'bkash': {
+        'transaction_id': ('trxid', 'transaction id', 'trx id'),
+        'amount': ('amount', 'transaction amount'),
+        'status': ('status', 'transaction status'),
+        'settled_at': ('date time', 'transaction date', 'date'),
+    },
+    'sslcommerz': {
+        'transaction_id': ('tran_id', 'transaction id', 'bank_tran_id'),
+        'amount': ('amount', 'store_amount', 'currency_amount'),
+        'status': ('status', 'transaction status'),
+        'settled_at': ('tran_date', 'transaction date', 'date'),
+    },
+}
+
+# Gateway status words mapped onto the ledger's statuses
+_STATUS_ALIASES = {
+    'completed': 'completed', 'complete': 'completed', 'success': 'completed', 'successful': 'completed',
+    'valid': 'completed', 'validated': 'completed', 'settled': 'completed', 'paid': 'completed',
+    'failed': 'failed', 'failure': 'failed', 'cancelled': 'failed', 'canceled': 'failed',
+    'expired': 'failed', 'unattempted': 'failed',
+    'refunded': 'refunded', 'refund': 'refunded', 'reversed': 'refunded',
+}
+
+REPORT_COLUMNS = ['transaction_id', 'issue', 'ledger_amount', 'settlement_amount',
+                  'ledger_status', 'settlement_status', 'line']
+
+_DATETIME_FORMATS = ('%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M',
+                     '%d/%m/%Y %H:%M:%S', '%d-%m-%Y %H:%M:%S', '%d/%m/%Y %I:%M:%S %p')
+
+
+def parse_datetime(value):
+    """Parse a gateway timestamp (or a plain date, as midnight), None if it can't be read"""
+    if value is None or isinstance(value, datetime):
+        return value
+    value = str(value).strip()
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '')).replace(tzinfo=None)
+    except ValueError:
+        pass
+    for fmt in _DATETIME_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    day = parse_date(value)
+    return datetime.combine(day, dt_time()) if day else None
+
+
+def normalize_status(value):
+    return _STATUS_ALIASES.get((value or '').strip().lower())
+
+
+def _amount(value):
+    amount = float(value)
+    # float() accepts 'nan' and 'inf', which would poison the ledger and reconciliation sums
+    if not math.isfinite(amount):
+        raise ValueError(f'amount {value!r} is not a finite number')
+    return round(amount, 2)
+
+
+def validate_payment(data):
+    """Clean one payment from the API into Payment column values, raises ValueError with the reason"""
+    if not isinstance(data, dict):
+        raise ValueError('payment must be an object')
+
+    transaction_id = str(data.get('transaction_id') or '').strip()
+    if not transaction_id:
+        raise ValueError('missing transaction_id')
+    if len(transaction_id) > 100:
+        raise ValueError('transaction_id longer than 100 characters')
+
+    gateway = str(data.get('gateway') or '').strip().lower()
+    if gateway not in GATEWAYS:
+        raise ValueError(f"gateway must be one of: {', '.join(GATEWAYS)}")
+
+    try:
+        amount = _amount(data.get('amount'))
+    except (TypeError, ValueError):
+        raise ValueError(f"invalid amount {data.get('amount')!r}")
+    if amount <= 0:
+        raise ValueError('amount must be positive')
+
+    status = normalize_status(data.get('status') or 'completed')
+    if status is None:
+        raise ValueError(f"invalid status {data.get('status')!r}")
+
+    paid_at = parse_datetime(data.get('paid_at')) if data.get('paid_at') else datetime.utcnow()
+    if paid_at is None:
+        raise ValueError(f"invalid paid_at {data.get('paid_at')!r}")
+
+    return {
+        'transaction_id': transaction_id,
+        'member_id': str(data.get('member_id') or '').strip() or None,
+        'gateway': gateway,
+        'amount': amount,
+        'currency': str(data.get('currency') or 'BDT').strip().upper()[:3],
+        'status': status,
+        'paid_at': paid_at,
+    }
+
+
+def _same_payment(values, existing):
+    return existing.gateway == values['gateway'] and _amount(existing.amount) == values['amount'] \
+        and existing.status == values['status']
+
+
+def _update_member_payments(payments):
+    """Point each member's latest-payment columns at the newest completed payment in `payments`"""
+    latest = {}
+    for values in payments:
+        if values['member_pk'] and values['status'] == 'completed':
+            current = latest.get(values['member_pk'])
+            if current is None or values['paid_at'] > current['paid_at']:
+                latest[values['member_pk']] = values
+    if not latest:
+        return
+
+    current_dates = dict(db.session.execute(
+        select(Member.id, Member.payment_date).where(Member.id.in_(list(latest)))
+    ).all())
+    now = datetime.utcnow()
+    updates = [
+        {'id': member_pk, 'payment_status': 'paid', 'payment_method': values['gateway'],
+         'transaction_id': values['transaction_id'], 'payment_date': values['paid_at'].date(),
+         'updated_at': now}
+        for member_pk, values in latest.items()
+        if member_pk in current_dates
+        and (current_dates[member_pk] is None or values['paid_at'].date() >= current_dates[member_pk])
+    ]
+    if updates:
+        db.session.execute(update(Member), updates)
+
+
+def _write_payments(chunk):
+    """Insert the new payments in one chunk of (index, values), returns {index: (result, transaction_id)}"""
+    results = {}
+    by_transaction = {}
+    for index, values in chunk:
+        first = by_transaction.get(values['transaction_id'])
+        if first is None:
+            by_transaction[values['transaction_id']] = (index, values)
+        else:
+            # Repeated within the same request: same idempotency rules as a stored row
+            same = all(first[1][key] == values[key] for key in ('gateway', 'amount', 'status'))
+            results[index] = ('duplicate' if same else 'conflict', values['transaction_id'])
+
+    existing = {payment.transaction_id: payment for payment in db.session.execute(
+        select(Payment.transaction_id, Payment.gateway, Payment.amount, Payment.status)
+        .where(Payment.transaction_id.in_(list(by_transaction)))
+    ).all()}
+
+    member_ids = {values['member_id'] for _, values in by_transaction.values() if values['member_id']}
+    member_pks = dict(db.session.execute(
+        select(Member.member_id, Member.id).where(Member.member_id.in_(list(member_ids)))
+    ).all()) if member_ids else {}
+
+    now = datetime.utcnow()
+    inserts = []
+    for transaction_id, (index, values) in by_transaction.items():
+        if transaction_id in existing:
+            same = _same_payment(values, existing[transaction_id])
+            results[index] = ('duplicate' if same else 'conflict', transaction_id)
+            continue
+        if values['member_id'] and values['member_id'] not in member_pks:
+            results[index] = ('invalid', f"unknown member_id {values['member_id']!r}")
+            continue
+        row = {key: value for key, value in values.items() if key != 'member_id'}
+        row.update(member_pk=member_pks.get(values['member_id']), reconciliation_status='unreconciled',
+                   created_at=now)
+        inserts.append(row)
+        results[index] = ('created', transaction_id)
+
+    if inserts:
+        db.session.execute(insert(Payment), inserts)
+        _update_member_payments(inserts)
+    db.session.commit()
+    return results
+
+
+def record_payments(items, chunk_size=500):
+    """Add payments to the ledger, idempotent on transaction_id.
+
+    Returns one (result, detail) per item, in order. result is 'created',
+    'duplicate' (already recorded with the same gateway, amount and
+    status), 'conflict' (recorded with different values, left unchanged) or
+    'invalid' (detail is the reason). Each chunk is checked with one IN
+    query and written with one executemany; a chunk that loses an insert
+    race with another writer is rolled back and checked again.
+    """
+    results = [None] * len(items)
+    valid = []
+    for index, data in enumerate(items):
+        try:
+            valid.append((index, validate_payment(data)))
+        except ValueError as e:
+            results[index] = ('invalid', str(e))
+
+    for start in range(0, len(valid), chunk_size):
+        chunk = valid[start:start + chunk_size]
+        try:
+            written = _write_payments(chunk)
+        except IntegrityError:
+            db.session.rollback()
+            written = _write_payments(chunk)
+        for index, result in written.items():
+            results[index] = result
+    return results
+
+
+def _settlement_fields(fieldnames, gateway):
+    """Map settlement header names onto fields, detecting the gateway when it isn't given"""
+    headers = {name.strip().lower(): name for name in fieldnames if name}
+    candidates = [gateway] if gateway else list(SETTLEMENT_COLUMNS)
+    for candidate in candidates:
+        if candidate not in SETTLEMENT_COLUMNS:
+            raise ValueError(f"no settlement format for gateway {candidate!r}")
+        fields = {}
+        for field, aliases in SETTLEMENT_COLUMNS[candidate].items():
+            fields[field] = next((headers[alias] for alias in aliases if alias in headers), None)
+        if fields['transaction_id'] and fields['amount']:
+            return candidate, fields
+    raise ValueError('settlement file needs a transaction ID and an amount column')
+
+
+def read_settlements(text_stream, gateway=None):
+    """Load a gateway settlement CSV into {transaction_id: settlement}.
+
+    This is the build side of the reconciliation hash join; it holds one
+    small dict per settled transaction. Returns (gateway, settlements, rejects).
+    """
+    reader = csv.DictReader(text_stream)
+    gateway, fields = _settlement_fields(reader.fieldnames or [], gateway)
+
+    settlements = {}
+    rejects = []
+    for row in reader:
+        transaction_id = (row.get(fields['transaction_id']) or '').strip()
+        try:
+            amount = _amount(row.get(fields['amount']))
+        except (TypeError, ValueError):
+            amount = None
+        if not transaction_id or amount is None:
+            rejects.append({'transaction_id': transaction_id, 'issue': 'unreadable_row', 'line': reader.line_num})
+            continue
+        raw_status = row.get(fields['status']) if fields['status'] else None
+        settlements[transaction_id] = {
+            'amount': amount,
+            'status': normalize_status(raw_status) or (raw_status or 'completed').strip().lower(),
+            'settled_at': parse_datetime(row.get(fields['settled_at'])) if fields['settled_at'] else None,
+            'line': reader.line_num,
+        }
+    return gateway, settlements, rejects
+
+
+def _compare(payment, settlement):
+    """Reconciliation status and report issue (or None) for a ledger payment found in the settlement"""
+    if _amount(payment.amount) != settlement['amount']:
+        return 'mismatch', 'amount_mismatch'
+    if payment.status != settlement['status']:
+        return 'mismatch', 'status_mismatch'
+    return 'matched', None
+
+
+def reconcile_settlements(text_stream, gateway=None, report=None, chunk_size=1000, window_days=1):
+    """Match a gateway settlement file against the payments ledger.
+
+    The settlement file is loaded into a dict keyed on transaction ID, then
+    the gateway's ledger payments over the file's date range (widened back
+    by `window_days` for settlement lag) are read in keyset-paginated
+    chunks of `chunk_size` and probed against it, so the whole file costs
+    one range scan instead of a query per row. Settled transactions not
+    seen in the scan are looked up with chunked IN queries. Ledger rows get
+    a reconciliation_status of matched or mismatch, written back with
+    executemany after each chunk. A completed payment absent from the file
+    is marked unsettled only if it was paid within the file's own dates and
+    no earlier file has matched it; the wider window only finds matches.
+    Every discrepancy is written to `report` (a text stream) as CSV.
+    Returns a summary dict.
+    """
+    start = time.perf_counter()
+    gateway, settlements, unreadable = read_settlements(text_stream, gateway)
+    now = datetime.utcnow()
+
+    summary = {'gateway': gateway, 'settlements': len(settlements) + len(unreadable), 'matched': 0,
+               'amount_mismatch': 0, 'status_mismatch': 0, 'missing_in_ledger': 0,
+               'missing_in_settlement': 0, 'unreadable_rows': len(unreadable)}
+
+    writer = None
+    if report is not None:
+        writer = csv.DictWriter(report, fieldnames=REPORT_COLUMNS, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(unreadable)
+
+    updates = []
+
+    def flush(force=False):
+        if updates and (force or len(updates) >= chunk_size):
+            db.session.execute(update(Payment), updates)
+            del updates[:]
+
+    def record(payment, settlement, issue_override=None):
+        if settlement is None:
+            status, issue = 'unsettled', issue_override
+        else:
+            status, issue = _compare(payment, settlement)
+        updates.append({'id': payment.id, 'reconciliation_status': status, 'reconciled_at': now})
+        summary[issue or 'matched'] += 1
+        if issue and writer is not None:
+            writer.writerow({
+                'transaction_id': payment.transaction_id, 'issue': issue,
+                'ledger_amount': payment.amount, 'ledger_status': payment.status,
+                'settlement_amount': settlement['amount'] if settlement else '',
+                'settlement_status': settlement['status'] if settlement else '',
+                'line': settlement['line'] if settlement else '',
+            })
+        flush()
+
+    columns = (Payment.id, Payment.transaction_id, Payment.amount, Payment.status, Payment.paid_at,
+               Payment.reconciliation_status)
+    seen = set()
+    settled_dates = [s['settled_at'] for s in settlements.values() if s['settled_at']]
+    if settled_dates:
+        file_start = datetime.combine(min(settled_dates).date(), dt_time())
+        window_start = file_start - timedelta(days=window_days)
+        window_end = datetime.combine(max(settled_dates).date() + timedelta(days=1), dt_time())
+        query = select(*columns) \
+            .where(Payment.gateway == gateway, Payment.paid_at >= window_start, Payment.paid_at < window_end) \
+            .order_by(Payment.paid_at, Payment.id).limit(chunk_size)
+        last = None
+        while True:
+            # Keyset pages, so each chunk's updates can be written before the next read
+            page = query if last is None else query.where(or_(
+                Payment.paid_at > last.paid_at, and_(Payment.paid_at == last.paid_at, Payment.id > last.id)))
+            chunk = db.session.execute(page).all()
+            if not chunk:
+                break
+            last = chunk[-1]
+            for payment in chunk:
+                settlement = settlements.get(payment.transaction_id)
+                if settlement is not None:
+                    seen.add(payment.transaction_id)
+                    record(payment, settlement)
+                elif payment.status == 'completed' and payment.paid_at >= file_start \
+                        and payment.reconciliation_status not in ('matched', 'mismatch'):
+                    record(payment, None, 'missing_in_settlement')
+            flush(force=True)
+
+    # Settled transactions outside the scanned window (or files without dates)
+    remaining = [transaction_id for transaction_id in settlements if transaction_id not in seen]
+    for offset in range(0, len(remaining), chunk_size):
+        batch = remaining[offset:offset + chunk_size]
+        found = db.session.execute(select(*columns).where(Payment.transaction_id.in_(batch))).all()
+        for payment in found:
+            seen.add(payment.transaction_id)
+            record(payment, settlements[payment.transaction_id])
+        for transaction_id in batch:
+            if transaction_id not in seen:
+                settlement = settlements[transaction_id]
+                summary['missing_in_ledger'] += 1
+                if writer is not None:
+                    writer.writerow({'transaction_id': transaction_id, 'issue': 'missing_in_ledger',
+                                     'settlement_amount': settlement['amount'],
+                                     'settlement_status': settlement['status'], 'line': settlement['line']})
+
+    flush(force=True)
+    db.session.commit()
+
+    elapsed = time.perf_counter() - start
+    summary['seconds'] = round(elapsed, 3)
+    summary['rows_per_second'] = round(summary['settlements'] / elapsed, 1) if elapsed else None
+    return summary
@@ -0,0 +1,66 @@
+from flask import current_app
+
+from cache import TTLCache, invalidate_on_commit
+from models import db, Plan
+
+# Plans created by init_db.py and migration 0005, matching the old hard-coded pricing
+DEFAULT_PLANS = [
+    {'code': 'basic', 'name': 'Basic Plan', 'price': 2500, 'duration_days': 30, 'sort_order': 1},
+    {'code': 'standard', 'name': 'Standard Plan', 'price': 4500, 'duration_days': 30, 'sort_order': 2},
+    {'code': 'premium', 'name': 'Premium Plan', 'price': 7500, 'duration_days': 365, 'sort_order': 3},
+]
+
+# The whole plans table, loaded on first use. Dropped on any commit that
+# writes to plans; PLAN_CACHE_TTL only bounds staleness across worker processes.
+_plan_cache = TTLCache(ttl=300, maxsize=1)
+invalidate_on_commit(Plan, _plan_cache.clear)
+
+
+def _plan_key(value):
+    """'Basic Plan', 'basic plan' and 'basic' all name the same plan"""
+    key = (value or '').strip().lower()
+    return key[:-5].strip() if key.endswith(' plan') else key
+
+
+def _load_plans():
+    plans = []
+    for plan in Plan.query.order_by(Plan.sort_order, Plan.id).all():
+        plans.append({
+            'id': plan.id,
+            'code': plan.code,
+            'name': plan.name,
+            'price': plan.price,
+            'duration_days': plan.duration_days,
+            'active': plan.active
+        })
+    by_key = {}
+    for plan in plans:
+        by_key[_plan_key(plan['code'])] = plan
+        by_key[_plan_key(plan['name'])] = plan
+    return plans, by_key
+
+
+def _cached_plans():
+    ttl = current_app.config['PLAN_CACHE_TTL']
+    if not ttl:
+        return _load_plans()
+    return _plan_cache.get_or_set('plans', _load_plans, ttl=ttl)
+
+
+def get_plans(include_inactive=False):
+    """All plans in display order, from the in-process cache (treat the dicts as read-only)"""
+    plans = _cached_plans()[0]
+    return plans if include_inactive else [plan for plan in plans if plan['active']]
+
+
+def get_plan(value):
+    """Look up a plan by code or name (case-insensitive, ' Plan' optional), None if unknown"""
+    return _cached_plans()[1].get(_plan_key(value))
+
+
+def seed_default_plans():
+    """Add any of DEFAULT_PLANS that are missing, returns how many were added. The caller commits."""
+    existing = {code for (code,) in db.session.query(Plan.code)}
+    added = [Plan(**values) for values in DEFAULT_PLANS if values['code'] not in existing]
+    db.session.add_all(added)
+    return len(added)
@@ -0,0 +1,59 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class MemoryBucketStore:
+    """Token buckets kept in this process's memory.
+
+    Each worker process has its own buckets, so the effective limit is the
+    configured one times the number of workers. Least recently used keys are
+    dropped beyond maxsize (a dropped key simply starts again with a full
+    bucket). Any object with the same take() method can be plugged in with
+    set_store(), e.g. one backed by a shared cache server.
+    """
+
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, refill_per_second, now):
+        """Take one token from key's bucket, returns (allowed, retry_after_seconds)"""
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * refill_per_second)
+
+            if tokens >= 1:
+                tokens -= 1
+                allowed, retry_after = True, 0.0
+            else:
+                allowed, retry_after = False, (1 - tokens) / refill_per_second
+
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+            return allowed, retry_after
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class RateLimiter:
+    """Token-bucket rate limiter on top of a pluggable bucket store"""
+
+    def __init__(self, store=None):
+        self.store = store or MemoryBucketStore()
+
+    def set_store(self, store):
+        self.store = store
+
+    def hit(self, key, capacity, per_minute):
+        """Count one attempt against key.
+
+        Allows bursts of up to `capacity` attempts, refilled at `per_minute`
+        attempts per minute. Returns (allowed, retry_after_seconds).
+        """
+        return self.store.take(key, capacity, per_minute / 60.0, time.monotonic())
@@ -0,0 +1,134 @@
+from datetime import date, timedelta
+
+from sqlalchemy import insert, func, select
+
+from auth import hash_password
+from cache import QueryCache
+from models import db, User, Member, PendingRegistration
+from dates import parse_date
+from plans import get_plan
+from search import index_members
+from sequences import next_member_ids
+
+DEFAULT_MEMBER_PASSWORD = 'member123'
+
+# Pending registration count and list for the admin pages, dropped by any
+# commit that writes to pending_registrations (new, approved or rejected)
+_pending_queries = QueryCache('pending_registrations', models=[PendingRegistration])
+
+PENDING_FIELDS = ('registration_id', 'first_name', 'last_name', 'email', 'phone', 'dob', 'gender',
+                  'address', 'membership_type', 'registration_date')
+
+
+def pending_count():
+    """Number of registrations waiting for approval (cached)"""
+    return _pending_queries.get_or_load('count', lambda: db.session.execute(
+        select(func.count()).select_from(PendingRegistration).where(PendingRegistration.status == 'pending')
+    ).scalar())
+
+
+def pending_registration_rows():
+    """Pending registrations as plain dicts of the listed fields, oldest first (cached)"""
+    def load():
+        columns = [getattr(PendingRegistration, field) for field in PENDING_FIELDS]
+        rows = db.session.execute(
+            select(*columns).where(PendingRegistration.status == 'pending').order_by(PendingRegistration.id)
+        )
+        return [dict(row._mapping) for row in rows]
+    return _pending_queries.get_or_load('rows', load)
+
+
+def _unique_usernames(emails):
+    """Derive a login username from each email, avoiding existing and in-batch clashes"""
+    bases = [email.split('@')[0] for email in emails]
+    taken = {row.username for row in db.session.query(User.username).filter(User.username.in_(set(bases)))}
+
+    usernames = []
+    for base in bases:
+        username = base
+        if username in taken:
+            # Only look up suffixed variants for the (rare) bases that clash
+            pattern = base.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '\\_%'
+            taken.update(row.username for row in db.session.query(User.username)
+                         .filter(User.username.like(pattern, escape='\\')))
+            suffix = 2
+            while f'{base}_{suffix}' in taken:
+                suffix += 1
+            username = f'{base}_{suffix}'
+        taken.add(username)
+        usernames.append(username)
+    return usernames
+
+
+def approve_registrations(registrations):
+    """Approve pending registrations as one set of bulk writes.
+
+    Member IDs are reserved for the whole batch in one step, the default
+    password is hashed once, members and users are inserted with executemany
+    and the registrations are flipped with a single UPDATE. The caller
+    commits. Price and expiry come from the cached plans; raises ValueError
+    before writing anything if a registration's plan is unknown. Returns a
+    list of dicts (member fields plus 'username') for the approval emails.
+    """
+    if not registrations:
+        return []
+
+    plans = [get_plan(reg.membership_type) for reg in registrations]
+    unknown = sorted({reg.membership_type for reg, plan in zip(registrations, plans) if plan is None})
+    if unknown:
+        raise ValueError(f"unknown membership plan: {', '.join(unknown)}")
+
+    join_date = date.today()
+    member_ids = next_member_ids(len(registrations))
+    password_hash = hash_password(DEFAULT_MEMBER_PASSWORD)
+    usernames = _unique_usernames([reg.email for reg in registrations])
+
+    member_rows = []
+    user_rows = []
+    for registration, plan, member_id, username in zip(registrations, plans, member_ids, usernames):
+        expiry_date = join_date + timedelta(days=plan['duration_days'])
+
+        member_rows.append({
+            'member_id': member_id,
+            'first_name': registration.first_name,
+            'last_name': registration.last_name,
+            'email': registration.email,
+            'phone': registration.phone,
+            'dob': parse_date(registration.dob),
+            'gender': registration.gender,
+            'address': registration.address,
+            'membership_type': plan['name'],
+            'amount': plan['price'],
+            'join_date': join_date,
+            'expiry_date': expiry_date,
+            'status': 'active',
+            'payment_status': 'pending'
+        })
+        user_rows.append({
+            'username': username,
+            'email': registration.email,
+            'password_hash': password_hash,
+            'role': 'member',
+            'name': f'{registration.first_name} {registration.last_name}'
+        })
+
+    db.session.execute(insert(Member), member_rows)
+    db.session.execute(insert(User), user_rows)
+    PendingRegistration.query.filter(
+        PendingRegistration.id.in_([reg.id for reg in registrations])
+    ).update({'status': 'approved'}, synchronize_session=False)
+
+    # Bulk inserts skip the ORM events that maintain the search index
+    index_members([row['member_id'] for row in member_rows])
+
+    return [dict(row, username=username) for row, username in zip(member_rows, usernames)]
+
+
+def reject_registrations(registration_ids):
+    """Reject pending registrations with a single UPDATE, returns the row count"""
+    if not registration_ids:
+        return 0
+    return PendingRegistration.query.filter(
+        PendingRegistration.registration_id.in_(registration_ids),
+        PendingRegistration.status == 'pending'
+    ).update({'status': 'rejected'}, synchronize_session=False)
@@ -0,0 +1,89 @@
+import time
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import select, insert, exists
+
+from email_templates import render_email_batch
+from mailer import enqueue_emails
+from models import db, Member, ExpiryReminder
+
+REMINDER_SUBJECT = 'Your GymFit Membership is Expiring Soon'
+
+
+def expire_lapsed_memberships(today=None):
+    """Mark every active membership whose expiry date has passed as expired.
+
+    One set-based UPDATE, returns the number of members changed.
+    """
+    today = today or date.today()
+    return Member.query.filter(
+        Member.status == 'active',
+        Member.expiry_date < today
+    ).update({'status': 'expired', 'updated_at': datetime.utcnow()}, synchronize_session=False)
+
+
+def send_expiry_reminders(renewal_url, days=7, chunk_size=500, today=None):
+    """Queue reminder emails for active members expiring within `days` days.
+
+    Members are read `chunk_size` at a time. Each chunk is rendered and
+    queued as a batch, recorded in expiry_reminders and committed, so the
+    write lock is held for one chunk at a time. Members already reminded for
+    their current expiry date are skipped in the query itself, so the next
+    chunk picks up where the last one stopped, and running the job again
+    (e.g. after an interruption) sends nothing twice. The emails are sent by
+    `mail-worker`. Returns a dict of counts and timings.
+    """
+    today = today or date.today()
+    year = datetime.now().year
+    start = time.perf_counter()
+
+    expired = expire_lapsed_memberships(today)
+    db.session.commit()
+    expire_seconds = time.perf_counter() - start
+
+    already_reminded = exists().where(
+        ExpiryReminder.member_pk == Member.id,
+        ExpiryReminder.expiry_date == Member.expiry_date
+    )
+    stmt = select(Member).where(
+        Member.status == 'active',
+        Member.expiry_date >= today,
+        Member.expiry_date <= today + timedelta(days=days),
+        ~already_reminded
+    ).order_by(Member.expiry_date, Member.id).limit(chunk_size)
+
+    reminded = 0
+    while True:
+        chunk = db.session.execute(stmt).scalars().all()
+        if not chunk:
+            break
+        htmls = render_email_batch('email/expiry_reminder.html', [{
+            'first_name': member.first_name,
+            'last_name': member.last_name,
+            'member_id': member.member_id,
+            'membership_type': member.membership_type,
+            'join_date': member.join_date,
+            'expiry_date': member.expiry_date,
+            'days_remaining': (member.expiry_date - today).days,
+            'renewal_url': renewal_url,
+            'year': year
+        } for member in chunk])
+
+        enqueue_emails(REMINDER_SUBJECT, [(member.email, html) for member, html in zip(chunk, htmls)],
+                       start_worker=False)
+        db.session.execute(insert(ExpiryReminder), [
+            {'member_pk': member.id, 'expiry_date': member.expiry_date} for member in chunk
+        ])
+        db.session.commit()
+        # Committed members are not needed again; keep the identity map to one chunk
+        db.session.expunge_all()
+        reminded += len(chunk)
+
+    remind_seconds = time.perf_counter() - start - expire_seconds
+    return {
+        'expired': expired,
+        'expire_seconds': expire_seconds,
+        'reminded': reminded,
+        'remind_seconds': remind_seconds,
+        'rows_per_second': reminded / remind_seconds if remind_seconds else 0
+    }
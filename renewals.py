@@ -0,0 +1,115 @@
+import secrets
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import insert, select, update
+
+from models import db, Member, Payment
+from payments import GATEWAYS
+from plans import get_plan
+
+# Members looked up per IN query
+_LOOKUP_CHUNK = 500
+
+
+def _transaction_id(member_id, paid_at):
+    """Ledger ID for a renewal paid without a gateway transaction (cash at the desk)"""
+    return f"REN-{member_id}-{paid_at.strftime('%Y%m%d%H%M%S')}-{secrets.token_hex(3)}"
+
+
+def renew_memberships(member_ids, plan=None, gateway='cash', transaction_ids=None, paid_at=None):
+    """Renew one or many memberships as a set of bulk writes.
+
+    Each membership is extended by its plan's duration (or `plan`'s, which
+    also switches the member to that plan) from its current expiry date, or
+    from today if it has already lapsed, and charged the plan price. The
+    members are read with chunked IN queries, updated with one executemany
+    and the payments are added to the ledger with another; plan prices come
+    from the plan cache. `transaction_ids` maps member IDs to gateway
+    transaction IDs; a renewal whose transaction is already in the ledger is
+    skipped, so retries are safe. The caller commits.
+
+    Returns one dict per requested member ID with a 'result' of 'renewed',
+    'duplicate', 'not_found' or 'invalid'.
+    """
+    gateway = (gateway or 'cash').lower()
+    if gateway not in GATEWAYS:
+        raise ValueError(f"gateway must be one of: {', '.join(GATEWAYS)}")
+    override = None
+    if plan:
+        override = get_plan(plan)
+        if override is None or not override['active']:
+            raise ValueError(f'unknown plan {plan!r}')
+
+    transaction_ids = transaction_ids or {}
+    paid_at = paid_at or datetime.utcnow()
+    today = date.today()
+    member_ids = list(dict.fromkeys(member_ids))
+
+    members = {}
+    for start in range(0, len(member_ids), _LOOKUP_CHUNK):
+        chunk = member_ids[start:start + _LOOKUP_CHUNK]
+        for row in db.session.execute(
+            select(Member.id, Member.member_id, Member.membership_type, Member.expiry_date)
+            .where(Member.member_id.in_(chunk))
+        ):
+            members[row.member_id] = row
+
+    given = [transaction_ids[member_id] for member_id in member_ids if transaction_ids.get(member_id)]
+    recorded = set()
+    for start in range(0, len(given), _LOOKUP_CHUNK):
+        recorded.update(db.session.execute(
+            select(Payment.transaction_id).where(Payment.transaction_id.in_(given[start:start + _LOOKUP_CHUNK]))
+        ).scalars())
+
+    results = []
+    member_updates = []
+    payment_rows = []
+    for member_id in member_ids:
+        member = members.get(member_id)
+        if member is None:
+            results.append({'member_id': member_id, 'result': 'not_found'})
+            continue
+        plan_info = override or get_plan(member.membership_type)
+        if plan_info is None:
+            results.append({'member_id': member_id, 'result': 'invalid',
+                            'error': f'unknown plan {member.membership_type!r}'})
+            continue
+        transaction_id = transaction_ids.get(member_id) or _transaction_id(member_id, paid_at)
+        if transaction_id in recorded:
+            results.append({'member_id': member_id, 'result': 'duplicate', 'transaction_id': transaction_id})
+            continue
+        recorded.add(transaction_id)
+
+        starts = member.expiry_date if member.expiry_date and member.expiry_date >= today else today
+        expiry_date = starts + timedelta(days=plan_info['duration_days'])
+        member_updates.append({
+            'id': member.id,
+            'membership_type': plan_info['name'],
+            'amount': plan_info['price'],
+            'expiry_date': expiry_date,
+            'status': 'active',
+            'payment_status': 'paid',
+            'payment_method': gateway,
+            'transaction_id': transaction_id,
+            'payment_date': paid_at.date(),
+            'updated_at': paid_at
+        })
+        payment_rows.append({
+            'transaction_id': transaction_id,
+            'member_pk': member.id,
+            'gateway': gateway,
+            'amount': plan_info['price'],
+            'currency': 'BDT',
+            'status': 'completed',
+            'paid_at': paid_at,
+            'reconciliation_status': 'unreconciled',
+            'created_at': paid_at
+        })
+        results.append({'member_id': member_id, 'result': 'renewed', 'plan': plan_info['name'],
+                        'amount': plan_info['price'], 'expiry_date': expiry_date.isoformat(),
+                        'transaction_id': transaction_id})
+
+    if member_updates:
+        db.session.execute(update(Member), member_updates)
+        db.session.execute(insert(Payment), payment_rows)
+    return results
@@ -0,0 +1,66 @@
+import hashlib
+import secrets
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, select
+
+from models import db, PasswordResetToken
+
+
+def hash_token(token):
+    """SHA-256 of a reset token; tokens are random, so no salt or slow hash is needed"""
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+
+def issue_reset_token(user_id, ttl_minutes=60):
+    """Create a reset token for a user and drop their older ones.
+
+    Returns the token to email; only its hash is stored. At most one token
+    per user exists afterwards, so repeated forgot-password requests don't
+    grow the table. The caller commits.
+    """
+    db.session.execute(delete(PasswordResetToken).where(PasswordResetToken.user_id == user_id))
+    token = secrets.token_urlsafe(32)
+    db.session.add(PasswordResetToken(
+        user_id=user_id,
+        token_hash=hash_token(token),
+        expires_at=datetime.utcnow() + timedelta(minutes=ttl_minutes),
+        used=False
+    ))
+    return token
+
+
+def find_reset_token(token):
+    """Unused token row for an emailed token (possibly expired), or None"""
+    if not token:
+        return None
+    return PasswordResetToken.query.filter_by(token_hash=hash_token(token), used=False).first()
+
+
+def purge_reset_tokens(batch_size=5000, now=None):
+    """Delete expired and used tokens in batches of `batch_size`, committing each batch.
+
+    Expired tokens are found through the expires_at index; used ones (only
+    tokens that were redeemed but haven't expired yet) in a second pass.
+    Short transactions keep the table available to logins and resets while
+    a large backlog is cleared. Returns a dict with the number deleted and
+    the time taken.
+    """
+    now = now or datetime.utcnow()
+    start = time.perf_counter()
+    deleted = 0
+    for condition in (PasswordResetToken.expires_at < now, PasswordResetToken.used.is_(True)):
+        while True:
+            ids = db.session.execute(
+                select(PasswordResetToken.id).where(condition).limit(batch_size)
+            ).scalars().all()
+            if not ids:
+                break
+            db.session.execute(delete(PasswordResetToken).where(PasswordResetToken.id.in_(ids)))
+            db.session.commit()
+            deleted += len(ids)
+
+    elapsed = time.perf_counter() - start
+    return {'deleted': deleted, 'seconds': elapsed,
+            'rows_per_second': deleted / elapsed if elapsed else 0}
@@ -0,0 +1,314 @@
+from datetime import date, datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from cache import TTLCache, invalidate_on_commit
+from models import db, User, Member, Trainer, ClassSession, Booking
+from payments import parse_datetime
+
+# Weekly schedules (sessions joined to trainers and laid out by day), keyed
+# by the Monday of the week. Dropped by any commit that edits sessions or
+# trainers; seat counts are read fresh on every request, see _claim_seat().
+_schedule_cache = TTLCache(ttl=300, maxsize=64)
+invalidate_on_commit(ClassSession, _schedule_cache.clear)
+invalidate_on_commit(Trainer, _schedule_cache.clear)
+
+TRAINER_STATUSES = ('active', 'inactive')
+_sessions = ClassSession.__table__
+
+
+def week_start_for(day):
+    """Monday of the week containing `day`"""
+    return day - timedelta(days=day.weekday())
+
+
+def validate_trainer(data):
+    """Clean trainer fields from the API, raises ValueError with the reason"""
+    if not isinstance(data, dict):
+        raise ValueError('trainer must be an object')
+    name = str(data.get('name') or '').strip()
+    email = str(data.get('email') or '').strip().lower()
+    if not name or not email:
+        raise ValueError('name and email are required')
+    status = str(data.get('status') or 'active').lower()
+    if status not in TRAINER_STATUSES:
+        raise ValueError(f"status must be one of: {', '.join(TRAINER_STATUSES)}")
+    experience = data.get('experience_years')
+    try:
+        experience = int(experience) if experience not in (None, '') else None
+    except (TypeError, ValueError):
+        raise ValueError(f'invalid experience_years {experience!r}')
+    return {
+        'name': name[:100],
+        'email': email[:120],
+        'phone': str(data.get('phone') or '').strip()[:20] or None,
+        'specialty': str(data.get('specialty') or '').strip()[:100] or None,
+        'experience_years': experience,
+        'status': status
+    }
+
+
+def validate_session(data):
+    """Clean class session fields from the API, raises ValueError with the reason"""
+    if not isinstance(data, dict):
+        raise ValueError('class session must be an object')
+    title = str(data.get('title') or '').strip()
+    if not title:
+        raise ValueError('title is required')
+    starts_at = parse_datetime(data.get('starts_at'))
+    if starts_at is None:
+        raise ValueError(f"invalid starts_at {data.get('starts_at')!r}")
+    if data.get('ends_at'):
+        ends_at = parse_datetime(data.get('ends_at'))
+    else:
+        try:
+            ends_at = starts_at + timedelta(minutes=int(data.get('duration_minutes') or 60))
+        except (TypeError, ValueError):
+            raise ValueError(f"invalid duration_minutes {data.get('duration_minutes')!r}")
+    if ends_at is None or ends_at <= starts_at:
+        raise ValueError('ends_at must be after starts_at')
+    try:
+        capacity = int(data.get('capacity'))
+    except (TypeError, ValueError):
+        raise ValueError(f"invalid capacity {data.get('capacity')!r}")
+    if capacity < 1:
+        raise ValueError('capacity must be at least 1')
+    trainer_id = data.get('trainer_id')
+    try:
+        trainer_id = int(trainer_id) if trainer_id not in (None, '') else None
+    except (TypeError, ValueError):
+        raise ValueError(f'invalid trainer_id {trainer_id!r}')
+    return {
+        'title': title[:100],
+        'trainer_id': trainer_id,
+        'room': str(data.get('room') or '').strip()[:50] or None,
+        'starts_at': starts_at,
+        'ends_at': ends_at,
+        'capacity': capacity,
+        'booked_count': 0,
+        'status': 'scheduled'
+    }
+
+
+def create_class_sessions(items):
+    """Validate and insert class sessions with one executemany, returns the count. The caller commits.
+
+    Raises ValueError naming the first invalid item; nothing is written then.
+    """
+    rows = []
+    for index, data in enumerate(items):
+        try:
+            rows.append(dict(validate_session(data), created_at=datetime.utcnow()))
+        except ValueError as e:
+            raise ValueError(f'item {index}: {e}')
+
+    trainer_ids = {row['trainer_id'] for row in rows if row['trainer_id']}
+    if trainer_ids:
+        known = set(db.session.execute(select(Trainer.id).where(Trainer.id.in_(trainer_ids))).scalars())
+        if trainer_ids - known:
+            raise ValueError(f'unknown trainer_id {sorted(trainer_ids - known)[0]}')
+    if rows:
+        db.session.execute(insert(ClassSession), rows)
+    return len(rows)
+
+
+def member_pk_for_user(user_id):
+    """Member row id for a logged-in member's user account (matched on email), or None"""
+    return db.session.execute(
+        select(Member.id).join(User, User.email == Member.email).where(User.id == user_id)
+    ).scalar()
+
+
+def _claim_seat(session_id, now):
+    """Take one seat if the session is open and not full, in the current transaction.
+
+    A single conditional UPDATE: the database re-checks booked_count < capacity
+    while holding the row (or, on SQLite, database) write lock, so concurrent
+    bookings can never overfill a class. Run on the session's connection
+    rather than session.execute() so seat changes don't count as schedule
+    edits and clear the cached weekly view.
+    """
+    result = db.session.connection().execute(
+        _sessions.update()
+        .where(_sessions.c.id == session_id,
+               _sessions.c.status == 'scheduled',
+               _sessions.c.starts_at > now,
+               _sessions.c.booked_count < _sessions.c.capacity)
+        .values(booked_count=_sessions.c.booked_count + 1)
+    )
+    return result.rowcount == 1
+
+
+def _release_seat(session_id):
+    db.session.connection().execute(
+        _sessions.update()
+        .where(_sessions.c.id == session_id, _sessions.c.booked_count > 0)
+        .values(booked_count=_sessions.c.booked_count - 1)
+    )
+
+
+def _refusal(session_id, now):
+    """Why a seat couldn't be claimed: 'not_found', 'closed' or 'full'"""
+    row = db.session.execute(
+        select(ClassSession.status, ClassSession.starts_at).where(ClassSession.id == session_id)
+    ).first()
+    if row is None:
+        return 'not_found'
+    if row.status != 'scheduled' or row.starts_at <= now:
+        return 'closed'
+    return 'full'
+
+
+def book_class(session_id, member_pk, now=None):
+    """Book a member into a class session and commit.
+
+    Returns 'booked', 'already_booked', 'full', 'closed' (cancelled or
+    already started) or 'not_found'. The seat and the booking row are
+    written in one transaction, and a member can hold only one booking per
+    session (unique constraint), so concurrent requests can't overfill a
+    class or double-book a member.
+    """
+    now = now or datetime.now()
+    existing = db.session.execute(
+        select(Booking.id, Booking.status).where(Booking.session_id == session_id, Booking.member_pk == member_pk)
+    ).first()
+    if existing is not None and existing.status == 'booked':
+        return 'already_booked'
+
+    try:
+        if not _claim_seat(session_id, now):
+            db.session.rollback()
+            return _refusal(session_id, now)
+
+        if existing is not None:
+            # Re-booking after a cancellation; another request may have got there first
+            restored = db.session.execute(
+                update(Booking)
+                .where(Booking.id == existing.id, Booking.status == 'cancelled')
+                .values(status='booked', cancelled_at=None, created_at=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            if not restored:
+                db.session.rollback()
+                return 'already_booked'
+        else:
+            db.session.execute(insert(Booking).values(
+                session_id=session_id, member_pk=member_pk, status='booked', created_at=datetime.utcnow()))
+        db.session.commit()
+    except IntegrityError:
+        # A concurrent request booked the same member; the seat claim rolls back with it
+        db.session.rollback()
+        return 'already_booked'
+    return 'booked'
+
+
+def cancel_booking(session_id, member_pk):
+    """Cancel a member's booking and free the seat, returns 'cancelled' or 'not_booked'. Commits."""
+    cancelled = db.session.execute(
+        update(Booking)
+        .where(Booking.session_id == session_id, Booking.member_pk == member_pk, Booking.status == 'booked')
+        .values(status='cancelled', cancelled_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not cancelled:
+        db.session.rollback()
+        return 'not_booked'
+    _release_seat(session_id)
+    db.session.commit()
+    return 'cancelled'
+
+
+def cancel_member_bookings(member_pks, now=None):
+    """Cancel members' bookings for classes that haven't started and free those seats.
+
+    Used when members are archived. `now` is gym local time, like
+    ClassSession.starts_at. Returns the number cancelled; the caller commits.
+    """
+    now = now or datetime.now()
+    bookings = db.session.execute(
+        select(Booking.id, Booking.session_id)
+        .join(ClassSession, ClassSession.id == Booking.session_id)
+        .where(Booking.member_pk.in_(member_pks), Booking.status == 'booked', ClassSession.starts_at > now)
+    ).all()
+    if not bookings:
+        return 0
+    db.session.execute(
+        update(Booking)
+        .where(Booking.id.in_([booking.id for booking in bookings]))
+        .values(status='cancelled', cancelled_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    for booking in bookings:
+        _release_seat(booking.session_id)
+    return len(bookings)
+
+
+def _build_week(week_start):
+    start = datetime.combine(week_start, datetime.min.time())
+    rows = db.session.execute(
+        select(ClassSession.id, ClassSession.title, ClassSession.room, ClassSession.starts_at,
+               ClassSession.ends_at, ClassSession.capacity, ClassSession.status, Trainer.name)
+        .outerjoin(Trainer, Trainer.id == ClassSession.trainer_id)
+        .where(ClassSession.starts_at >= start, ClassSession.starts_at < start + timedelta(days=7))
+        .order_by(ClassSession.starts_at, ClassSession.id)
+    ).all()
+
+    days = [{'date': (week_start + timedelta(days=i)).isoformat(),
+             'weekday': (week_start + timedelta(days=i)).strftime('%A'),
+             'sessions': []} for i in range(7)]
+    for row in rows:
+        days[(row.starts_at.date() - week_start).days]['sessions'].append({
+            'id': row.id,
+            'title': row.title,
+            'trainer': row.name,
+            'room': row.room,
+            'starts_at': row.starts_at.isoformat(),
+            'ends_at': row.ends_at.isoformat(),
+            'time': f"{row.starts_at.strftime('%H:%M')}-{row.ends_at.strftime('%H:%M')}",
+            'capacity': row.capacity,
+            'status': row.status
+        })
+    return {'week_start': week_start.isoformat(), 'days': days}
+
+
+def weekly_schedule(day=None):
+    """Class sessions for the week containing `day`, by weekday, with live seat counts.
+
+    The layout comes from the cache; only (id, booked_count) for the week is
+    read per call, so the numbers of free places are never stale.
+    """
+    week_start = week_start_for(day or date.today())
+    ttl = current_app.config['SCHEDULE_CACHE_TTL']
+    if ttl:
+        view = _schedule_cache.get_or_set(week_start, lambda: _build_week(week_start), ttl=ttl)
+    else:
+        view = _build_week(week_start)
+
+    start = datetime.combine(week_start, datetime.min.time())
+    booked = dict(db.session.execute(
+        select(ClassSession.id, ClassSession.booked_count)
+        .where(ClassSession.starts_at >= start, ClassSession.starts_at < start + timedelta(days=7))
+    ).all())
+
+    days = []
+    for day_view in view['days']:
+        sessions = []
+        for session_view in day_view['sessions']:
+            taken = booked.get(session_view['id'], 0)
+            sessions.append(dict(session_view, booked=taken, spots_left=max(session_view['capacity'] - taken, 0)))
+        days.append(dict(day_view, sessions=sessions))
+    return {'week_start': view['week_start'], 'days': days}
+
+
+def trainer_summaries():
+    """Trainers with the number of classes they have scheduled from today on"""
+    today = datetime.combine(date.today(), datetime.min.time())
+    upcoming = dict(db.session.execute(
+        select(ClassSession.trainer_id, db.func.count(ClassSession.id))
+        .where(ClassSession.starts_at >= today, ClassSession.status == 'scheduled')
+        .group_by(ClassSession.trainer_id)
+    ).all())
+    trainers = Trainer.query.order_by(Trainer.status, Trainer.name).all()
+    return [{'trainer': trainer, 'upcoming_classes': upcoming.get(trainer.id, 0)} for trainer in trainers]
@@ -0,0 +1,218 @@
+import re
+
+from sqlalchemy import event, text, bindparam
+
+from dates import format_date
+from models import db, Member
+
+# FTS5 table mirroring the searchable Member columns, rowid == members.id.
+# '@', '.', '+', '-' and '_' are token characters so emails and phone numbers
+# stay whole tokens and can be prefix matched as typed.
+FTS_TABLE = 'members_fts'
+
+CREATE_FTS_SQL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+    "member_id, name, email, phone, "
+    "tokenize=\"unicode61 tokenchars '@.+-_'\")"
+)
+
+SEARCH_COLUMNS = ('member_id', 'first_name', 'last_name', 'email', 'phone')
+
+# Engines we already checked for FTS5 support, keyed by URL
+_fts_enabled = {}
+
+
+def _is_sqlite(connection):
+    return connection.dialect.name == 'sqlite'
+
+
+def fts_enabled(connection):
+    """Return True if the members FTS table exists on this connection's database"""
+    if not _is_sqlite(connection):
+        return False
+    key = str(connection.engine.url)
+    if key not in _fts_enabled:
+        row = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {'name': FTS_TABLE}
+        ).first()
+        _fts_enabled[key] = row is not None
+    return _fts_enabled[key]
+
+
+def _fts_row(member):
+    return {
+        'rowid': member.id,
+        'member_id': member.member_id,
+        'name': f'{member.first_name} {member.last_name}',
+        'email': member.email,
+        'phone': member.phone,
+    }
+
+
+def _index_member(connection, member):
+    connection.execute(
+        text(f'INSERT INTO {FTS_TABLE} (rowid, member_id, name, email, phone) '
+             'VALUES (:rowid, :member_id, :name, :email, :phone)'),
+        _fts_row(member)
+    )
+
+
+def _unindex_member(connection, member_pk):
+    connection.execute(text(f'DELETE FROM {FTS_TABLE} WHERE rowid = :rowid'), {'rowid': member_pk})
+
+
+# Keep the FTS table in step with Member writes made through the ORM
+@event.listens_for(Member, 'after_insert')
+def _member_inserted(mapper, connection, member):
+    if fts_enabled(connection):
+        _index_member(connection, member)
+
+
+@event.listens_for(Member, 'after_update')
+def _member_updated(mapper, connection, member):
+    if fts_enabled(connection):
+        _unindex_member(connection, member.id)
+        _index_member(connection, member)
+
+
+@event.listens_for(Member, 'after_delete')
+def _member_deleted(mapper, connection, member):
+    if fts_enabled(connection):
+        _unindex_member(connection, member.id)
+
+
+# Create and drop the FTS table alongside the members table on SQLite
+@event.listens_for(Member.__table__, 'after_create')
+def _create_fts_table(target, connection, **kw):
+    if _is_sqlite(connection):
+        connection.execute(text(CREATE_FTS_SQL))
+        _fts_enabled[str(connection.engine.url)] = True
+
+
+@event.listens_for(Member.__table__, 'after_drop')
+def _drop_fts_table(target, connection, **kw):
+    if _is_sqlite(connection):
+        connection.execute(text(f'DROP TABLE IF EXISTS {FTS_TABLE}'))
+        _fts_enabled.pop(str(connection.engine.url), None)
+
+
+def rebuild_search_index():
+    """(Re)create the FTS table and repopulate it from the members table.
+
+    Needed once for databases created before search existed, and after bulk
+    loads that bypass the ORM (Core inserts don't fire mapper events).
+    """
+    connection = db.session.connection()
+    if not _is_sqlite(connection):
+        return 0
+    connection.execute(text(CREATE_FTS_SQL))
+    connection.execute(text(f'DELETE FROM {FTS_TABLE}'))
+    connection.execute(text(
+        f"INSERT INTO {FTS_TABLE} (rowid, member_id, name, email, phone) "
+        "SELECT id, member_id, first_name || ' ' || last_name, email, phone FROM members"
+    ))
+    db.session.commit()
+    _fts_enabled.pop(str(connection.engine.url), None)
+    return Member.query.count()
+
+
+def index_members(member_ids):
+    """(Re)index members written with bulk (Core) inserts or updates"""
+    connection = db.session.connection()
+    if not member_ids or not fts_enabled(connection):
+        return
+    params = {'member_ids': list(member_ids)}
+    connection.execute(
+        text(f"DELETE FROM {FTS_TABLE} WHERE rowid IN "
+             "(SELECT id FROM members WHERE member_id IN :member_ids)").bindparams(
+            bindparam('member_ids', expanding=True)),
+        params
+    )
+    connection.execute(
+        text(f"INSERT INTO {FTS_TABLE} (rowid, member_id, name, email, phone) "
+             "SELECT id, member_id, first_name || ' ' || last_name, email, phone "
+             "FROM members WHERE member_id IN :member_ids").bindparams(
+            bindparam('member_ids', expanding=True)),
+        params
+    )
+
+
+def unindex_members(member_pks):
+    """Drop members removed with bulk (Core) deletes from the search index"""
+    connection = db.session.connection()
+    if not member_pks or not fts_enabled(connection):
+        return
+    connection.execute(
+        text(f"DELETE FROM {FTS_TABLE} WHERE rowid IN :member_pks").bindparams(
+            bindparam('member_pks', expanding=True)),
+        {'member_pks': list(member_pks)}
+    )
+
+
+def _terms(query_string):
+    """Split user input into search terms, dropping FTS syntax characters"""
+    return [t for t in re.split(r'\s+', re.sub(r'["*():^]', ' ', query_string or '')) if t]
+
+
+def _fts_search(terms, limit, offset):
+    # Every term is quoted (so it is never parsed as an FTS operator) and prefix matched
+    match = ' AND '.join('"{}"*'.format(t) for t in terms)
+    rows = db.session.execute(
+        text(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match '
+             'ORDER BY rank LIMIT :limit OFFSET :offset'),
+        {'match': match, 'limit': limit, 'offset': offset}
+    ).fetchall()
+    ids = [row[0] for row in rows]
+    if not ids:
+        return []
+    members = {m.id: m for m in Member.query.filter(Member.id.in_(ids)).all()}
+    return [members[i] for i in ids if i in members]
+
+
+def _like_search(terms, limit, offset):
+    query = Member.query
+    for term in terms:
+        pattern = term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        query = query.filter(db.or_(*[
+            getattr(Member, column).ilike(pattern, escape='\\') for column in SEARCH_COLUMNS
+        ]))
+    return query.order_by(Member.created_at.desc(), Member.id.desc()).limit(limit).offset(offset).all()
+
+
+def search_members(query_string, page=1, per_page=20):
+    """Prefix search members by name, email, phone and member ID.
+
+    Returns (members, has_more). Uses the FTS5 index on SQLite when present
+    and falls back to prefix LIKE matching on other backends.
+    """
+    terms = _terms(query_string)
+    if not terms:
+        return [], False
+
+    page = max(1, page)
+    offset = (page - 1) * per_page
+
+    # Fetch one extra row to know whether another page exists
+    if fts_enabled(db.session.connection()):
+        results = _fts_search(terms, per_page + 1, offset)
+    else:
+        results = _like_search(terms, per_page + 1, offset)
+
+    return results[:per_page], len(results) > per_page
+
+
+def member_result(member):
+    """Serialize a member for search results"""
+    return {
+        'id': member.member_id,
+        'first_name': member.first_name,
+        'last_name': member.last_name,
+        'email': member.email,
+        'phone': member.phone,
+        'membership': member.membership_type,
+        'amount': member.amount,
+        'join_date': format_date(member.join_date),
+        'expiry_date': format_date(member.expiry_date),
+        'status': member.status
+    }
@@ -0,0 +1,140 @@
+import os
+import threading
+
+from flask import current_app
+from sqlalchemy import create_engine, update, select, insert, func, cast
+from sqlalchemy.pool import NullPool
+from sqlalchemy.exc import IntegrityError
+
+from database import install_sqlite_pragmas
+from models import db, Member, PendingRegistration, IdSequence
+
+# Sequence name -> (ID column, prefix). IDs are formatted as prefix + zero padded number.
+SEQUENCES = {
+    'member': (Member.member_id, 'M'),
+    'registration': (PendingRegistration.registration_id, 'REG'),
+}
+
+
+def format_id(name, number):
+    return f'{SEQUENCES[name][1]}{number:03d}'
+
+
+def _existing_max(connection, name):
+    """Highest number already used in the ID column (only read once, when the counter is created)"""
+    column, prefix = SEQUENCES[name]
+    number = cast(func.substr(column, len(prefix) + 1), db.Integer)
+    return connection.execute(select(func.max(number))).scalar() or 0
+
+
+def _sequence_engine():
+    """Engine used only for counter updates.
+
+    Reservations run on their own connections so they commit independently
+    of the request, and on their own pool so a request that already holds a
+    connection from the main pool can never deadlock waiting for a second one.
+    """
+    app = current_app._get_current_object()
+    engine = app.extensions.get('id_sequences_engine')
+    if engine is None:
+        url = db.engine.url
+        if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+            # A second engine would open a different in-memory database
+            engine = db.engine
+        elif url.get_backend_name() == 'sqlite':
+            engine = create_engine(url, poolclass=NullPool,
+                                   connect_args={'timeout': app.config['SQLITE_BUSY_TIMEOUT_MS'] / 1000.0})
+            install_sqlite_pragmas(engine, app.config)
+        else:
+            engine = create_engine(url, pool_size=2, max_overflow=2, pool_pre_ping=True)
+        app.extensions['id_sequences_engine'] = engine
+    return engine
+
+
+def _reserve(name, count):
+    """Atomically reserve `count` numbers from the counter, returns the first one.
+
+    Runs in its own short transaction so the counter row is locked only for
+    the increment itself, not for the rest of the caller's request.
+    """
+    engine = _sequence_engine()
+    while True:
+        with engine.begin() as connection:
+            stmt = update(IdSequence).where(IdSequence.name == name) \
+                .values(next_value=IdSequence.next_value + count)
+
+            if connection.dialect.update_returning:
+                end = connection.execute(stmt.returning(IdSequence.next_value)).scalar()
+            elif connection.execute(stmt).rowcount:
+                # Our UPDATE holds the row lock, so this read sees our own increment
+                end = connection.execute(
+                    select(IdSequence.next_value).where(IdSequence.name == name)
+                ).scalar()
+            else:
+                end = None
+
+            if end is not None:
+                return end - count
+
+        # First use of this sequence: start after the highest existing ID
+        try:
+            with engine.begin() as connection:
+                start = _existing_max(connection, name) + 1
+                connection.execute(insert(IdSequence).values(name=name, next_value=start + count))
+                return start
+        except IntegrityError:
+            # Another worker created the counter first, go round and increment it
+            continue
+
+
+class IdAllocator:
+    """Hands out IDs from blocks reserved in the id_sequences table.
+
+    With ID_BLOCK_SIZE = 1 every ID is one atomic counter update. Larger
+    blocks let each worker process hand out a range of IDs from memory,
+    at the cost of IDs not being issued in strict order across workers.
+    Numbers are never reused, even if the row they were issued for is
+    deleted or the transaction that used them rolls back.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._blocks = {}
+        self._pid = os.getpid()
+
+    def next_numbers(self, name, count, block_size=1):
+        with self._lock:
+            # Never share a reserved block with a forked child (e.g. gunicorn --preload)
+            if self._pid != os.getpid():
+                self._blocks = {}
+                self._pid = os.getpid()
+
+            start, end = self._blocks.get(name, (0, 0))
+            if end - start < count:
+                size = max(count, block_size)
+                start = _reserve(name, size)
+                end = start + size
+
+            self._blocks[name] = (start + count, end)
+            return list(range(start, start + count))
+
+    def reset(self):
+        with self._lock:
+            self._blocks = {}
+
+
+allocator = IdAllocator()
+
+
+def allocate_ids(name, count=1):
+    """Return `count` new formatted IDs for the named sequence"""
+    numbers = allocator.next_numbers(name, count, current_app.config['ID_BLOCK_SIZE'])
+    return [format_id(name, number) for number in numbers]
+
+
+def next_registration_id():
+    return allocate_ids('registration')[0]
+
+
+def next_member_ids(count):
+    return allocate_ids('member', count)
@@ -0,0 +1,146 @@
+from datetime import date, datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import func
+
+from cache import TTLCache, invalidate_on_commit
+from models import db, Member
+
+# Dashboard figures are cached for STATS_CACHE_TTL seconds and dropped as
+# soon as a commit writes to the members table.
+_cache = TTLCache(ttl=60, maxsize=64)
+
+REVENUE_PERIODS = ('week', 'month', 'year')
+
+
+def invalidate_stats():
+    _cache.clear()
+
+
+invalidate_on_commit(Member, invalidate_stats)
+
+
+def _cached(key, loader):
+    return _cache.get_or_set(key, loader, ttl=current_app.config['STATS_CACHE_TTL'])
+
+
+def _month_start(day):
+    return day.replace(day=1)
+
+
+def _previous_month_start(day):
+    return _month_start(_month_start(day) - timedelta(days=1))
+
+
+def _revenue_between(start, end):
+    """Sum of amounts paid from start (inclusive) to end (exclusive)"""
+    return db.session.query(func.coalesce(func.sum(Member.amount), 0)).filter(
+        Member.payment_date >= start,
+        Member.payment_date < end
+    ).scalar()
+
+
+def _compute_summary():
+    today = date.today()
+    month_start = _month_start(today)
+    expiry_window = current_app.config['STATS_EXPIRY_WINDOW_DAYS']
+
+    # One grouped scan gives totals by status and by plan
+    by_status = {}
+    by_plan = {}
+    rows = db.session.query(Member.status, Member.membership_type, func.count(Member.id)) \
+        .group_by(Member.status, Member.membership_type).all()
+    for status, plan, count in rows:
+        by_status[status] = by_status.get(status, 0) + count
+        by_plan[plan] = by_plan.get(plan, 0) + count
+
+    revenue_this_month = _revenue_between(month_start, today + timedelta(days=1))
+    revenue_last_month = _revenue_between(_previous_month_start(today), month_start)
+
+    expiring_soon = Member.query.filter(
+        Member.status == 'active',
+        Member.expiry_date >= today,
+        Member.expiry_date <= today + timedelta(days=expiry_window)
+    ).count()
+
+    new_this_month = Member.query.filter(
+        Member.created_at >= datetime.combine(month_start, datetime.min.time())
+    ).count()
+
+    revenue_change = None
+    if revenue_last_month:
+        revenue_change = round((revenue_this_month - revenue_last_month) * 100.0 / revenue_last_month, 1)
+
+    return {
+        'total_members': sum(by_status.values()),
+        'active_members': by_status.get('active', 0),
+        'members_by_status': by_status,
+        'members_by_plan': by_plan,
+        'new_this_month': new_this_month,
+        'revenue_this_month': revenue_this_month,
+        'revenue_last_month': revenue_last_month,
+        'revenue_change_pct': revenue_change,
+        'expiring_soon': expiring_soon,
+        'expiry_window_days': expiry_window,
+        'generated_at': datetime.utcnow().isoformat()
+    }
+
+
+def dashboard_summary():
+    """Headline dashboard figures (member counts, revenue, upcoming expiries)"""
+    return _cached('summary', _compute_summary)
+
+
+def _month_bucket(column):
+    """YYYY-MM string for a DATE column, in the current database's dialect"""
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        return func.to_char(column, 'YYYY-MM')
+    if dialect in ('mysql', 'mariadb'):
+        return func.date_format(column, '%Y-%m')
+    return func.strftime('%Y-%m', column)
+
+
+def _label(bucket):
+    return bucket.isoformat() if isinstance(bucket, date) else str(bucket)
+
+
+def _compute_revenue(period):
+    today = date.today()
+    if period == 'year':
+        # Last 12 months, one bucket per month (YYYY-MM)
+        start = _month_start(today)
+        for _ in range(11):
+            start = _previous_month_start(start)
+        bucket = _month_bucket(Member.payment_date)
+        labels = []
+        month = start
+        while month <= today:
+            labels.append(month.strftime('%Y-%m'))
+            month = (month + timedelta(days=32)).replace(day=1)
+    else:
+        # Last 7 or 30 days, one bucket per day (YYYY-MM-DD)
+        days = 7 if period == 'week' else 30
+        start = today - timedelta(days=days - 1)
+        bucket = Member.payment_date
+        labels = [(start + timedelta(days=i)).isoformat() for i in range(days)]
+
+    rows = db.session.query(bucket, func.sum(Member.amount)).filter(
+        Member.payment_date >= start,
+        Member.payment_date < today + timedelta(days=1)
+    ).group_by(bucket).all()
+    totals = {_label(label): amount for label, amount in rows}
+
+    points = [{'label': label, 'revenue': totals.get(label, 0)} for label in labels]
+    return {
+        'period': period,
+        'total': sum(point['revenue'] for point in points),
+        'points': points
+    }
+
+
+def revenue_series(period):
+    """Revenue per day (week, month) or per month (year) for the chart filters"""
+    if period not in REVENUE_PERIODS:
+        raise ValueError(f'Unknown period: {period}')
+    return _cached(('revenue', period), lambda: _compute_revenue(period))
@@ -0,0 +1,9 @@
+"""
+WSGI entry point for production servers, e.g.
+
+    gunicorn -w 4 -b 0.0.0.0:8000 wsgi:app
+"""
+
+from app import app
+
+application = app